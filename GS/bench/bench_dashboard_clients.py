@@ -0,0 +1,632 @@
+#!/usr/bin/env python3
+# Teste de carga do dashboard com centenas/milhares de clientes Socket.IO
+# /home/groundstation/projeto_final/GS/bench/bench_dashboard_clients.py
+#
+# Abre clientes Socket.IO sem navegador contra um dashboard local (app.py)
+# que se comportam como a página: inscrição em modo delta (telemetry_frame,
+# como main.js, ou telemetry_update com --encoding full), ack de cada
+# mensagem, telemetry_ack dos quadros, telemetry_resync quando a base falta,
+# telemetry_rendered dos traces e a consulta incremental de /api/history
+# a cada 10 s com cursor e If-None-Match (graphs.js).
+#
+# O número de clientes sobe em degraus (--steps). Em cada degrau são
+# medidos:
+#   - latência de entrega: chegada no cliente - instante da publicação no
+#     servidor ("t" do quadro ou "timestamp" do telemetry_update); os
+#     relógios são os mesmos quando o teste roda na máquina do dashboard
+#   - atualizações perdidas: saltos no seq dos quadros (ou nos ids de trace
+#     do telemetry_update), ou seja, mensagens coalescidas na fila do cliente
+#   - latência e status das consultas de histórico (200/304/503)
+#   - CPU e memória do processo do servidor (--server-pid, via /proc)
+#   - filas do servidor (/api/stats/clients): coalescidas, descartadas, lag
+#
+# Com --feed-rate o próprio teste envia telemetria ao ingest TCP (porta
+# 5000) como um satélite; sem ele, depende de um satélite real ou simulado.
+#
+# Cada cliente é uma conexão WebSocket (websocket-client) com uma thread que
+# processa as mensagens em ordem; os pacotes Socket.IO são os do
+# python-socketio (socketio.packet). O socketio.Client síncrono não serve
+# aqui: ele trata cada mensagem numa thread nova, o que embaralha os anexos
+# binários dos quadros e cria milhares de threads com muitos clientes. Os
+# clientes ficam divididos entre --processes processos (um GIL cada).
+#
+# Uso: python3 bench_dashboard_clients.py [--url http://127.0.0.1:8000]
+#          [--steps 50,100,250,500] [--duration S] [--server-pid PID]
+#          [--feed-rate HZ] [--output arquivo.json]
+
+import argparse
+import heapq
+import json
+import math
+import multiprocessing
+import os
+import random
+import socket
+import struct
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+import requests
+import websocket
+from socketio import packet
+
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT / "GS" / "dashboard"))
+sys.path.insert(0, str(ROOT / "satellite"))
+import protocol  # noqa: E402
+from simulate_logs_updated import simulate_records  # noqa: E402
+
+# Mesmas séries e intervalo do modo "Latest" de graphs.js
+LIVE_SERIES = ("thermal/temperatures.json:internal:processor,power/battery.json:level,"
+               "adcs/attitude.json:roll:pitch:yaw,power/consumption.json:total_watts")
+LIVE_POINTS = 100
+HISTORY_INTERVAL = 10.0
+HISTORY_WORKERS = 16
+
+# Conexões novas por segundo em cada processo
+CONNECT_RATE = 50
+# Espera depois de atingir o número de clientes, antes de medir
+SETTLE_SECONDS = 2.0
+# Pilha das threads dos clientes (cada cliente síncrono usa algumas)
+THREAD_STACK_SIZE = 256 * 1024
+
+# Quadro binário de telemetry_stream: flags, seq, base, t (ms), count
+FRAME_HEADER = struct.Struct("<BIIdH")
+FIELD_HEADER = struct.Struct("<HB")
+_F64 = struct.Struct("<d")
+_U16 = struct.Struct("<H")
+TYPE_NUMBER, TYPE_STRING, TYPE_BOOL, TYPE_NULL, TYPE_JSON, TYPE_DELETE = range(6)
+
+
+def decode_frame(payload, field_ids):
+    """Quadro binário -> o mesmo dicionário dos quadros JSON"""
+    flags, seq, base, t, count = FRAME_HEADER.unpack_from(payload)
+    offset = FRAME_HEADER.size
+    changed, removed = {}, []
+    for _ in range(count):
+        field, value_type = FIELD_HEADER.unpack_from(payload, offset)
+        offset += FIELD_HEADER.size
+        path = field_ids.get(field, str(field))
+        if value_type == TYPE_NUMBER:
+            changed[path] = _F64.unpack_from(payload, offset)[0]
+            offset += 8
+        elif value_type == TYPE_BOOL:
+            changed[path] = bool(payload[offset])
+            offset += 1
+        elif value_type == TYPE_NULL:
+            changed[path] = None
+        elif value_type == TYPE_DELETE:
+            removed.append(path)
+        else:
+            size = _U16.unpack_from(payload, offset)[0]
+            text = bytes(payload[offset + 2:offset + 2 + size]).decode("utf-8")
+            changed[path] = text if value_type == TYPE_STRING else json.loads(text)
+            offset += 2 + size
+    return {"seq": seq, "base": base, "key": bool(flags & 1), "t": t, "set": changed, "del": removed}
+
+
+class Stats:
+    """Contadores e amostras de um processo de clientes"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.latencies = []
+            self.history = []
+            self.history_status = {}
+            self.received = {}
+            self.missed = 0
+            self.resyncs = 0
+            self.disconnects = 0
+            self.errors = 0
+
+    def event(self, name, latency=None, missed=0):
+        with self._lock:
+            self.received[name] = self.received.get(name, 0) + 1
+            if latency is not None:
+                self.latencies.append(latency)
+            self.missed += missed
+
+    def count(self, name, amount=1):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + amount)
+
+    def history_done(self, status, seconds):
+        with self._lock:
+            self.history_status[status] = self.history_status.get(status, 0) + 1
+            if seconds is not None:
+                self.history.append(seconds)
+
+    def report(self):
+        with self._lock:
+            return {"latencies": self.latencies, "history": self.history,
+                    "history_status": dict(self.history_status), "received": dict(self.received),
+                    "missed": self.missed, "resyncs": self.resyncs,
+                    "disconnects": self.disconnects, "errors": self.errors}
+
+
+class SocketIOConnection:
+    """Cliente Socket.IO (Engine.IO 4, só WebSocket) que trata as mensagens em ordem.
+
+    `handlers` mapeia evento -> função; eventos com callback do servidor
+    recebem o ack depois que a função retorna, como no navegador.
+    """
+
+    def __init__(self, url, handlers, on_disconnect=None):
+        self.url = url.replace("http", "ws", 1).rstrip("/") + "/socket.io/?EIO=4&transport=websocket"
+        self.handlers = handlers
+        self.on_disconnect = on_disconnect
+        self.ws = None
+        self.connected = False
+        self._ready = threading.Event()
+        self._lock = threading.Lock()
+
+    def connect(self, timeout=10):
+        self.ws = websocket.create_connection(self.url, timeout=timeout)
+        opcode, data = self.ws.recv_data()
+        if not data.startswith(b"0"):
+            raise ConnectionError(f"Abertura Engine.IO inesperada: {data[:40]!r}")
+        self.ws.settimeout(None)
+        self._send(packet.Packet(packet.CONNECT))
+        threading.Thread(target=self._run, daemon=True).start()
+        if not self._ready.wait(timeout):
+            self.close()
+            raise ConnectionError("Sem resposta ao CONNECT do Socket.IO")
+
+    def emit(self, event, data=None):
+        self._send(packet.Packet(packet.EVENT, [event] if data is None else [event, data]))
+
+    def _send(self, pkt):
+        with self._lock:
+            self.ws.send("4" + pkt.encode())
+
+    def close(self):
+        if self.ws is not None:
+            try:
+                with self._lock:
+                    self.ws.send("41")
+                self.ws.close()
+            except (OSError, websocket.WebSocketException):
+                pass
+
+    def _dispatch(self, pkt):
+        event, *args = pkt.data
+        handler = self.handlers.get(event)
+        if handler is not None:
+            handler(*args)
+        if pkt.id is not None:
+            self._send(packet.Packet(packet.ACK, [], id=pkt.id))
+
+    def _run(self):
+        pending = None  # BINARY_EVENT aguardando os anexos
+        try:
+            while True:
+                opcode, data = self.ws.recv_data()
+                if opcode == websocket.ABNF.OPCODE_BINARY:
+                    if pending is not None and pending.add_attachment(data):
+                        self._dispatch(pending)
+                        pending = None
+                    continue
+                if opcode == websocket.ABNF.OPCODE_CLOSE:
+                    break
+                text = data.decode("utf-8")
+                if text == "2":
+                    with self._lock:
+                        self.ws.send("3")
+                    continue
+                if not text.startswith("4"):
+                    if text.startswith("1"):
+                        break
+                    continue
+                pkt = packet.Packet(encoded_packet=text[1:])
+                if pkt.packet_type == packet.CONNECT:
+                    self.connected = True
+                    self._ready.set()
+                    handler = self.handlers.get("connect")
+                    if handler is not None:
+                        handler()
+                elif pkt.packet_type in (packet.BINARY_EVENT, packet.BINARY_ACK):
+                    pending = pkt
+                elif pkt.packet_type == packet.EVENT:
+                    self._dispatch(pkt)
+                elif pkt.packet_type in (packet.DISCONNECT, packet.CONNECT_ERROR):
+                    break
+        except (OSError, websocket.WebSocketException):
+            pass
+        finally:
+            self.connected = False
+            self._ready.set()
+            if self.on_disconnect is not None:
+                self.on_disconnect()
+
+
+class DashboardClient:
+    """Um operador: as mesmas inscrições e respostas de main.js e graphs.js"""
+
+    def __init__(self, url, encoding, stats):
+        self.url = url
+        self.encoding = encoding
+        self.stats = stats
+        self.field_ids = {}
+        self.known = set()      # seqs que podem servir de base
+        self.last_seq = None
+        self.last_trace = None
+        self.cursor = ""
+        self.etag = None
+        self.closed = False
+        self.connection = SocketIOConnection(url, {
+            "connect": self._on_connect,
+            "status": lambda status: stats.event("status"),
+            "telemetry_update": self._on_update,
+            "telemetry_fields": self._on_fields,
+            "telemetry_frame": self._on_frame,
+            "command_status": lambda status: stats.event("command_status")
+        }, on_disconnect=self._on_disconnect)
+
+    def connect(self):
+        self.connection.connect()
+
+    def close(self):
+        self.closed = True
+        self.connection.close()
+
+    def _on_connect(self):
+        self.known.clear()
+        self.last_seq = None
+        if self.encoding != "full":
+            self.connection.emit("telemetry_subscribe", {"encoding": self.encoding})
+
+    def _on_disconnect(self):
+        if not self.closed:
+            self.stats.count("disconnects")
+
+    def _rendered(self, trace):
+        # acknowledgeRender: um telemetry_rendered por trace novo
+        if trace is None or (self.last_trace is not None and trace <= self.last_trace):
+            return 0
+        missed = 0 if self.last_trace is None else int(trace) - int(self.last_trace) - 1
+        self.last_trace = trace
+        self.connection.emit("telemetry_rendered", {"trace": int(trace), "render_ms": 0})
+        return missed
+
+    def _on_update(self, data):
+        now = time.time()
+        latency = None
+        try:
+            latency = now - datetime.fromisoformat(data["timestamp"]).timestamp()
+        except (KeyError, TypeError, ValueError):
+            pass
+        missed = self._rendered(data.get("trace"))
+        self.stats.event("telemetry_update", latency, missed)
+
+    def _on_fields(self, fields):
+        self.field_ids.update({int(field): path for field, path in fields.items()})
+        self.stats.event("telemetry_fields")
+
+    def _on_frame(self, payload):
+        now = time.time()
+        frame = payload if isinstance(payload, dict) else decode_frame(payload, self.field_ids)
+        missed = 0
+        if self.last_seq is not None and frame["seq"] > self.last_seq + 1:
+            missed = frame["seq"] - self.last_seq - 1
+        if not frame["key"] and frame["base"] not in self.known:
+            # Base desconhecida: pede um keyframe, como main.js
+            self.stats.count("resyncs")
+            self.connection.emit("telemetry_resync")
+            self.stats.event("telemetry_frame", now - frame["t"] / 1000, missed)
+            return
+        oldest = frame["seq"] if frame["key"] else frame["base"]
+        self.known = {seq for seq in self.known if seq >= oldest}
+        self.known.add(frame["seq"])
+        self.last_seq = max(self.last_seq or 0, frame["seq"])
+        self.connection.emit("telemetry_ack", {"seq": frame["seq"]})
+        self._rendered(frame["set"].get("trace"))
+        self.stats.event("telemetry_frame", now - frame["t"] / 1000, missed)
+
+    def poll_history(self, session):
+        """fetchLiveSeries: séries desde o último cursor, com If-None-Match"""
+        params = {"series": LIVE_SERIES, "limit": LIVE_POINTS}
+        if self.cursor:
+            params["since"] = self.cursor
+        headers = {"If-None-Match": self.etag} if self.etag else {}
+        start = time.perf_counter()
+        try:
+            response = session.get(f"{self.url}/api/history", params=params, headers=headers, timeout=30)
+        except requests.RequestException:
+            self.stats.history_done("error", None)
+            return
+        elapsed = time.perf_counter() - start
+        if response.status_code == 200:
+            self.etag = response.headers.get("ETag")
+            self.cursor = response.json()["cursor"]
+        self.stats.history_done(str(response.status_code), elapsed)
+
+
+class HistoryPoller:
+    """Agenda a consulta de histórico de cada cliente a cada HISTORY_INTERVAL"""
+
+    def __init__(self, workers=HISTORY_WORKERS, interval=HISTORY_INTERVAL):
+        self.interval = interval
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.local = threading.local()
+        self.queue = []
+        self.cond = threading.Condition()
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def add(self, client):
+        with self.cond:
+            # Fase aleatória: os clientes não consultam todos no mesmo instante
+            heapq.heappush(self.queue, (time.monotonic() + random.uniform(0, self.interval), id(client), client))
+            self.cond.notify()
+
+    def _session(self):
+        session = getattr(self.local, "session", None)
+        if session is None:
+            session = self.local.session = requests.Session()
+        return session
+
+    def _poll(self, client):
+        if client.connection.connected:
+            client.poll_history(self._session())
+
+    def _run(self):
+        while True:
+            with self.cond:
+                while not self.queue or self.queue[0][0] > time.monotonic():
+                    self.cond.wait(None if not self.queue else self.queue[0][0] - time.monotonic())
+                due, key, client = heapq.heappop(self.queue)
+                if not client.closed:
+                    heapq.heappush(self.queue, (due + self.interval, key, client))
+            if not client.closed:
+                self.executor.submit(self._poll, client)
+
+
+def client_process(conn, url, encoding, history):
+    """Processo com uma parte dos clientes; recebe comandos do processo principal"""
+    threading.stack_size(THREAD_STACK_SIZE)
+    stats = Stats()
+    poller = HistoryPoller() if history else None
+    clients = []
+    failures = 0
+    while True:
+        command, argument = conn.recv()
+        if command == "scale":
+            while len(clients) > argument:
+                clients.pop().close()
+            while len(clients) < argument:
+                client = DashboardClient(url, encoding, stats)
+                try:
+                    client.connect()
+                except Exception:
+                    failures += 1
+                    stats.count("errors")
+                    time.sleep(1.0 / CONNECT_RATE)
+                    continue
+                clients.append(client)
+                if poller:
+                    poller.add(client)
+                time.sleep(1.0 / CONNECT_RATE)
+            conn.send({"clients": sum(1 for c in clients if c.connection.connected), "failures": failures})
+        elif command == "reset":
+            stats.reset()
+            conn.send(True)
+        elif command == "report":
+            conn.send(stats.report())
+        elif command == "stop":
+            for client in clients:
+                client.close()
+            conn.send(True)
+            return
+
+
+class Feeder(threading.Thread):
+    """Satélite simulado no ingest TCP: TelemetryData a `rate` Hz e heartbeats a cada 1 s"""
+
+    def __init__(self, address, rate, seed=1):
+        super().__init__(name="feeder", daemon=True)
+        self.address = address
+        self.rate = rate
+        self.rng = random.Random(seed)
+        self.sent = 0
+        self.stopped = threading.Event()
+
+    def run(self):
+        sock = socket.create_connection(self.address)
+        # Respostas do ingest (heartbeats) lidas e descartadas
+        threading.Thread(target=lambda: [None for _ in iter(lambda: sock.recv(65536), b"")],
+                         daemon=True).start()
+        start = time.monotonic()
+        orbit_phase = 0.0
+        next_heartbeat = start
+        while not self.stopped.is_set():
+            now = time.monotonic()
+            if now >= next_heartbeat:
+                tick = int((now - start) * 1000) % 2 ** 32
+                sock.sendall(protocol.encode_frame(protocol.MSG_TYPE_HEARTBEAT, 0, protocol.HEARTBEAT.pack(tick)))
+                next_heartbeat += 1.0
+            orbit_phase = (orbit_phase + 0.01) % (2 * math.pi)
+            records = {(c, f): data for c, f, data in simulate_records(self.sent + 1, orbit_phase, self.rng)}
+            attitude = records[("adcs", "attitude.json")]
+            payload = protocol.TELEMETRY_DATA.pack(
+                int((now - start) * 1000) % 2 ** 32,
+                records[("thermal", "temperatures.json")]["internal"],
+                records[("power", "consumption.json")]["total_watts"],
+                records[("power", "battery.json")]["level"],
+                attitude["roll"], attitude["pitch"], attitude["yaw"], 1)
+            sock.sendall(protocol.encode_frame(protocol.MSG_TYPE_TELEMETRY_DATA, 0, payload))
+            self.sent += 1
+            self.stopped.wait(max(0.0, start + self.sent / self.rate - time.monotonic()))
+        sock.close()
+
+
+def process_usage(pid):
+    """(segundos de CPU, RSS em MiB) do processo `pid` pelo /proc"""
+    with open(f"/proc/{pid}/stat") as f:
+        fields = f.read().rsplit(")", 1)[1].split()
+    cpu = (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+    with open(f"/proc/{pid}/statm") as f:
+        rss = int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    return cpu, rss
+
+
+def percentiles(samples, scale=1000.0):
+    """p50/p90/p99/max em ms"""
+    if not samples:
+        return {"count": 0, "p50_ms": None, "p90_ms": None, "p99_ms": None, "max_ms": None}
+    ordered = sorted(samples)
+
+    def at(fraction):
+        return round(ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] * scale, 2)
+
+    return {"count": len(ordered), "p50_ms": at(0.50), "p90_ms": at(0.90),
+            "p99_ms": at(0.99), "max_ms": round(ordered[-1] * scale, 2)}
+
+
+def server_queues(url):
+    """Totais das filas dos clientes no servidor (/api/stats/clients)"""
+    try:
+        outboxes = requests.get(f"{url}/api/stats/clients", timeout=10).json()
+    except (requests.RequestException, ValueError):
+        return None
+    totals = {"clients": len(outboxes), "stalled": 0, "max_lag": 0.0}
+    for name in ("sent", "acked", "coalesced", "dropped", "pending", "in_flight"):
+        totals[name] = sum(outbox[name] for outbox in outboxes.values())
+    for outbox in outboxes.values():
+        totals["stalled"] += bool(outbox["stalled"])
+        totals["max_lag"] = max(totals["max_lag"], outbox["lag"])
+    return totals
+
+
+def broadcast(workers, command, argument=None):
+    for conn, _ in workers:
+        conn.send((command, argument))
+    return [conn.recv() for conn, _ in workers]
+
+
+def run_step(workers, target, args):
+    """Um degrau: leva os processos a `target` clientes e mede por `duration` segundos"""
+    share = [target // len(workers) + (i < target % len(workers)) for i in range(len(workers))]
+    for (conn, _), count in zip(workers, share):
+        conn.send(("scale", count))
+    scaled = [conn.recv() for conn, _ in workers]
+    time.sleep(SETTLE_SECONDS)
+
+    broadcast(workers, "reset")
+    usage_start = process_usage(args.server_pid) if args.server_pid else None
+    start = time.monotonic()
+    time.sleep(args.duration)
+    reports = broadcast(workers, "report")
+    wall = time.monotonic() - start
+    usage_end = process_usage(args.server_pid) if args.server_pid else None
+
+    latencies, history, received, history_status = [], [], {}, {}
+    totals = {"missed": 0, "resyncs": 0, "disconnects": 0, "errors": 0}
+    for report in reports:
+        latencies.extend(report["latencies"])
+        history.extend(report["history"])
+        for name, count in report["received"].items():
+            received[name] = received.get(name, 0) + count
+        for status, count in report["history_status"].items():
+            history_status[status] = history_status.get(status, 0) + count
+        for name in totals:
+            totals[name] += report[name]
+    updates = received.get("telemetry_frame", 0) + received.get("telemetry_update", 0)
+
+    result = {
+        "clients": sum(s["clients"] for s in scaled),
+        "target": target,
+        "connect_failures": sum(s["failures"] for s in scaled),
+        "seconds": round(wall, 2),
+        "updates": updates,
+        "updates_per_client_s": round(updates / max(1, target) / wall, 3),
+        "missed": totals["missed"],
+        "missed_percent": round(100 * totals["missed"] / max(1, updates + totals["missed"]), 2),
+        "resyncs": totals["resyncs"],
+        "disconnects": totals["disconnects"],
+        "delivery": percentiles(latencies),
+        "history": {**percentiles(history), "status": history_status},
+        "received": received,
+        "server_queues": server_queues(args.url),
+        "server": None
+    }
+    if usage_start and usage_end:
+        result["server"] = {"cpu_percent": round(100 * (usage_end[0] - usage_start[0]) / wall, 1),
+                            "rss_mb": round(usage_end[1], 1)}
+    return result
+
+
+def print_step(result):
+    delivery, history = result["delivery"], result["history"]
+    server = result["server"]
+    print(f"\n{result['clients']}/{result['target']} clientes ({result['connect_failures']} falhas de conexão), "
+          f"{result['updates']} atualizações, {result['missed']} perdidas ({result['missed_percent']}%), "
+          f"{result['resyncs']} resyncs, {result['disconnects']} desconexões")
+    print(f"  entrega (ms):   p50 {delivery['p50_ms']}  p90 {delivery['p90_ms']}  "
+          f"p99 {delivery['p99_ms']}  max {delivery['max_ms']}")
+    print(f"  histórico (ms): p50 {history['p50_ms']}  p99 {history['p99_ms']}  status {history['status']}")
+    if server:
+        print(f"  servidor: CPU {server['cpu_percent']}%, RSS {server['rss_mb']} MiB")
+    queues = result["server_queues"]
+    if queues:
+        print(f"  filas: {queues['coalesced']} coalescidas, {queues['dropped']} descartadas, "
+              f"{queues['stalled']} clientes travados, lag máx. {queues['max_lag']} s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Teste de carga Socket.IO do dashboard")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--steps", default="50,100,250,500", help="número de clientes em cada degrau")
+    parser.add_argument("--duration", type=float, default=30.0, help="segundos medidos por degrau")
+    parser.add_argument("--processes", type=int, default=max(1, min(8, (os.cpu_count() or 2) // 2)))
+    parser.add_argument("--encoding", choices=("binary", "json", "full"), default="binary",
+                        help="binary/json: modo delta (main.js usa binary); full: telemetry_update")
+    parser.add_argument("--no-history", action="store_true", help="não consulta /api/history")
+    parser.add_argument("--server-pid", type=int, help="PID do app.py, para CPU e memória")
+    parser.add_argument("--feed-rate", type=float, default=0.0,
+                        help="envia telemetria ao ingest nesta taxa (Hz); 0 = não envia")
+    parser.add_argument("--ingest", default="127.0.0.1:5000", help="endereço do ingest TCP")
+    parser.add_argument("--output", help="grava os resultados em JSON")
+    args = parser.parse_args()
+    steps = [int(step) for step in args.steps.split(",")]
+
+    feeder = None
+    if args.feed_rate > 0:
+        host, port = args.ingest.rsplit(":", 1)
+        feeder = Feeder((host, int(port)), args.feed_rate)
+        feeder.start()
+
+    context = multiprocessing.get_context("spawn")
+    workers = []
+    for _ in range(args.processes):
+        parent, child = context.Pipe()
+        process = context.Process(target=client_process, daemon=True,
+                                  args=(child, args.url, args.encoding, not args.no_history))
+        process.start()
+        workers.append((parent, process))
+
+    results = {"created": datetime.now().isoformat(), "args": vars(args), "steps": []}
+    try:
+        for target in steps:
+            result = run_step(workers, target, args)
+            results["steps"].append(result)
+            print_step(result)
+    finally:
+        broadcast(workers, "stop")
+        if feeder:
+            feeder.stopped.set()
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResultados gravados em {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# Micro-benchmark do decodificador de mensagens do protocolo (protocol.FrameDecoder)
+# /home/groundstation/projeto_final/GS/bench/bench_frame_decoder.py
+#
+# Gera um stream com mensagens de telemetria e heartbeats, entrega-o ao
+# decodificador em pedaços do tamanho de segmentos TCP e mede mensagens/s e
+# MB/s. Opcionalmente corrompe bytes para medir o custo da ressincronização.
+#
+# Uso: python3 bench_frame_decoder.py [--frames N] [--chunk BYTES] [--corrupt FRAÇÃO]
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "dashboard"))
+import protocol  # noqa: E402
+
+
+def build_stream(n_frames, seed=1):
+    """Stream com telemetria (TelemetryPacket e TelemetryData) e heartbeats"""
+    rng = random.Random(seed)
+    parts = []
+    for i in range(n_frames):
+        kind = i % 4
+        if kind == 3:
+            parts.append(protocol.encode_frame(protocol.MSG_TYPE_HEARTBEAT))
+        elif kind == 2:
+            payload = protocol.TELEMETRY_DATA.pack(i, 20 + rng.random(), 100.0, 90.0,
+                                                   rng.random(), rng.random(), rng.random(), 1)
+            parts.append(protocol.encode_frame(protocol.MSG_TYPE_TELEMETRY_DATA, 0, payload))
+        else:
+            payload = protocol.TELEMETRY_PACKET.pack(i, 20 + rng.random(), 100.0, 90.0, True)
+            parts.append(protocol.encode_frame(protocol.MSG_TYPE_TELEMETRY_DATA,
+                                               protocol.FLAG_REQUIRES_ACK, payload))
+    return b"".join(parts)
+
+
+def corrupt(stream, fraction, seed=2):
+    data = bytearray(stream)
+    rng = random.Random(seed)
+    for _ in range(int(len(data) * fraction)):
+        data[rng.randrange(len(data))] ^= 1 << rng.randrange(8)
+    return bytes(data)
+
+
+def run(stream, chunk, repeat):
+    chunks = [stream[i:i + chunk] for i in range(0, len(stream), chunk)]
+    best = None
+    for _ in range(repeat):
+        decoder = protocol.FrameDecoder()
+        frames = 0
+        start = time.perf_counter()
+        for piece in chunks:
+            frames += len(decoder.feed(piece))
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best[0]:
+            best = (elapsed, frames, decoder)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do FrameDecoder")
+    parser.add_argument("--frames", type=int, default=200000)
+    parser.add_argument("--chunk", type=int, default=1460, help="bytes por leitura (MSS TCP)")
+    parser.add_argument("--corrupt", type=float, default=0.0, help="fração de bytes corrompidos")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    stream = build_stream(args.frames)
+    if args.corrupt:
+        stream = corrupt(stream, args.corrupt)
+
+    elapsed, frames, decoder = run(stream, args.chunk, args.repeat)
+    fps = frames / elapsed
+    print(f"Mensagens: {frames} ({decoder.frames} válidas, {decoder.crc_errors} CRC inválido, "
+          f"{decoder.skipped_bytes} bytes descartados)")
+    print(f"Tempo: {elapsed:.3f} s")
+    print(f"Vazão: {fps:,.0f} mensagens/s, {len(stream) / elapsed / 1e6:.2f} MB/s")
+    # Cada satélite envia 1 telemetria/s e 1 heartbeat/s (comm_task)
+    print(f"Capacidade estimada: ~{fps / 2:,.0f} satélites a 1 Hz")
+
+
+if __name__ == "__main__":
+    main()
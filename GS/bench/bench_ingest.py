@@ -0,0 +1,383 @@
+#!/usr/bin/env python3
+# Benchmark do caminho de ingest com telemetria sintética em alta taxa
+# /home/groundstation/projeto_final/GS/bench/bench_ingest.py
+#
+# Sobe o IngestServer real numa porta local e conecta N satélites simulados
+# (cada um identificado por MSG_TYPE_HELLO, satélites 1..N) que enviam mensagens TelemetryPacket (process_qemu_output.TELEMETRY_FORMAT)
+# com a física de simulate_logs_updated.simulate_records, na taxa total
+# pedida, e heartbeats a cada segundo. Cada amostra percorre as etapas do
+# dashboard:
+#
+#   frame   - FrameDecoder.feed de cada leitura do socket
+#   decode  - decode_telemetry dos dados de cada TelemetryPacket
+#   derive  - telemetry_records (StreamProcessor)
+#   persist - TelemetryLog.append de cada registro no log do satélite
+#   emit    - hot store, agregados e TelemetryStream.publish aos clientes
+#             simulados (forward_ingest), numa thread à parte como o hub
+#
+# Com --shards N, frame/decode/derive/persist rodam nos processos de shard
+# do ingest (ingest_shards.ShardPool) e as durações voltam no resultado de
+# cada leitura. Para cada taxa são medidos vazão, p50/p99 por etapa, a
+# latência do envio ao fim do emit, CPU do processo e RSS. O resultado vai para um JSON que
+# pode ser comparado com uma execução anterior (--compare).
+#
+# Uso: python3 bench_ingest.py [--rates 1,100,1000,5000] [--satellites N]
+#                              [--duration S] [--shards N] [--output arquivo.json]
+#                              [--compare base.json]
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import queue
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from time import perf_counter
+
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT / "GS" / "dashboard"))
+sys.path.insert(0, str(ROOT / "satellite"))
+import ingest_server  # noqa: E402
+import protocol  # noqa: E402
+from hot_store import HotStore  # noqa: E402
+from ingest_shards import ShardPool  # noqa: E402
+from process_qemu_output import TELEMETRY_FORMAT  # noqa: E402
+from rollups import RollupStore  # noqa: E402
+from simulate_logs_updated import simulate_records  # noqa: E402
+from telemetry_stream import TelemetryStream  # noqa: E402
+
+STAGES = ("frame", "decode", "derive", "persist", "emit")
+
+# Tempo máximo (s) para o pipeline esvaziar depois do último envio
+DRAIN_TIMEOUT = 30.0
+# Regressão: p99 ou vazão pior que a base além desta fração
+DEFAULT_TOLERANCE = 0.25
+
+assert protocol.TELEMETRY_PACKET.format == TELEMETRY_FORMAT
+
+
+class Recorder:
+    """Durações de uma etapa; tem o observe() dos histogramas de metrics"""
+
+    def __init__(self):
+        self.samples = []
+
+    def observe(self, seconds):
+        self.samples.append(seconds)
+
+
+def percentile(ordered, fraction):
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def summarize(samples, wall):
+    """Contagem, vazão da etapa isolada, percentis (µs) e ocupação no intervalo"""
+    if not samples:
+        return {"count": 0, "throughput": None, "p50_us": None, "p99_us": None,
+                "max_us": None, "busy_percent": 0.0}
+    ordered = sorted(samples)
+    busy = sum(ordered)
+    return {
+        "count": len(ordered),
+        "throughput": round(len(ordered) / busy, 1) if busy else None,
+        "p50_us": round(percentile(ordered, 0.50) * 1e6, 1),
+        "p99_us": round(percentile(ordered, 0.99) * 1e6, 1),
+        "max_us": round(ordered[-1] * 1e6, 1),
+        "busy_percent": round(100 * busy / wall, 1)
+    }
+
+
+def rss_mb():
+    """RSS atual (Linux: /proc/self/statm) em MiB"""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return round(pages * os.sysconf("SC_PAGE_SIZE") / 2 ** 20, 1)
+    except OSError:
+        return None
+
+
+def cpu_seconds():
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+class Pipeline:
+    """As etapas do dashboard depois do ingest, com as durações de cada uma"""
+
+    def __init__(self, logs_dir, clients):
+        self.hot_store = HotStore(logs_dir)
+        self.rollups = RollupStore(logs_dir, hot=self.hot_store)
+        self.state = {}
+        self.queue = queue.SimpleQueue()
+        self.sent_at = {}
+        self.reset()
+        self.stream = TelemetryStream(self._emit)
+        for i in range(clients):
+            self.stream.subscribe(f"client-{i}", "binary" if i % 2 else "json")
+        threading.Thread(target=self._forward, name="bench-emit", daemon=True).start()
+
+    def reset(self):
+        self.frame = Recorder()
+        self.decode = Recorder()
+        self.derive = Recorder()
+        self.persist = Recorder()
+        self.emit = Recorder()
+        self.end_to_end = Recorder()
+        self.processed = 0
+        self.emitted_bytes = 0
+        # As etapas do ingest_server registram nos histogramas do módulo
+        ingest_server.DECODE_STREAM = self.frame
+        ingest_server.DECODE_TELEMETRY = self.decode
+        ingest_server.DERIVE_SECONDS = self.derive
+        ingest_server.PERSIST_SECONDS = self.persist
+
+    def _emit(self, event, data, sid):
+        # O que o Socket.IO faria: serializar o evento (anexos binários seguem como estão)
+        self.emitted_bytes += len(data) if isinstance(data, bytes) else len(json.dumps(data))
+        if event == "telemetry_frame":
+            # Cliente rápido: confirma o quadro na hora e passa a receber deltas
+            self.stream.ack(sid, self.stream.seq)
+
+    def on_telemetry(self, satellite, peer, records, trace=None):
+        """Recebe os registros já gravados, como on_ingest_telemetry (thread do ingest)"""
+        latest = {(category, filename): entry for category, filename, entry in records}
+        # O uptime derivado é o tick do pacote: identifica a amostra enviada
+        tick = next(data for c, f, data in records if (c, f) == ("system", "status.json"))["uptime"]
+        self.queue.put((peer, tick, latest))
+
+    def _forward(self):
+        # Como forward_ingest: guarda no hot store e nos agregados e publica
+        while True:
+            peer, tick, latest = self.queue.get()
+            start = perf_counter()
+            for (category, filename), record in latest.items():
+                if self.hot_store.append(category, filename, record):
+                    self.rollups.add(category, filename, record)
+                self.state.setdefault(category, {})[filename] = record
+            self.stream.publish(self.state)
+            done = perf_counter()
+            self.emit.observe(done - start)
+            sent = self.sent_at.pop((peer[1], tick), None)
+            if sent is not None:
+                self.end_to_end.observe(done - sent)
+            self.processed += 1
+
+
+class Satellite:
+    """Conexão de um satélite simulado que envia telemetria a `rate` Hz"""
+
+    def __init__(self, index, rate, pipeline, seed):
+        self.index = index
+        self.rate = rate
+        self.pipeline = pipeline
+        self.rng = random.Random(seed)
+        self.counter = 0
+        self.orbit_phase = self.rng.uniform(0, 2 * math.pi)
+        self.sent = 0
+
+    def packet(self):
+        """Próxima amostra como mensagem TelemetryPacket (tick = número da amostra)"""
+        self.counter += 1
+        self.orbit_phase = (self.orbit_phase + 0.01) % (2 * math.pi)
+        records = {(c, f): data for c, f, data in simulate_records(self.counter, self.orbit_phase, self.rng)}
+        payload = protocol.TELEMETRY_PACKET.pack(
+            self.counter,
+            records[("thermal", "temperatures.json")]["internal"],
+            records[("power", "consumption.json")]["total_watts"],
+            records[("power", "battery.json")]["level"],
+            records[("system", "status.json")]["mode"] == "nominal")
+        return protocol.encode_frame(protocol.MSG_TYPE_TELEMETRY_DATA, 0, payload)
+
+    async def run(self, port, duration):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(protocol.encode_hello(self.index + 1))
+        local_port = writer.get_extra_info("sockname")[1]
+        drain = asyncio.ensure_future(self._discard(reader))
+        start = perf_counter()
+        next_heartbeat = start
+        try:
+            while True:
+                now = perf_counter()
+                elapsed = now - start
+                if elapsed >= duration:
+                    break
+                if now >= next_heartbeat:
+                    tick = int(elapsed * 1000) % 2 ** 32
+                    writer.write(protocol.encode_frame(protocol.MSG_TYPE_HEARTBEAT, 0,
+                                                       protocol.HEARTBEAT.pack(tick)))
+                    next_heartbeat += 1.0
+                # Envia de uma vez as amostras vencidas (taxas acima da resolução do sleep)
+                due = int(elapsed * self.rate) + 1 - self.sent
+                if due > 0:
+                    frames = []
+                    for _ in range(due):
+                        frames.append(self.packet())
+                        self.pipeline.sent_at[(local_port, self.counter)] = perf_counter()
+                    writer.write(b"".join(frames))
+                    self.sent += due
+                    await writer.drain()
+                await asyncio.sleep(max(0.001, min(1.0 / self.rate, 0.05)))
+        finally:
+            drain.cancel()
+            writer.close()
+
+    @staticmethod
+    async def _discard(reader):
+        # Respostas do ingest (heartbeats, erros) são lidas e descartadas
+        while await reader.read(65536):
+            pass
+
+
+async def drive(port, rate, satellites, duration, pipeline, seed):
+    fleet = [Satellite(i, rate / satellites, pipeline, seed + i) for i in range(satellites)]
+    await asyncio.gather(*(s.run(port, duration) for s in fleet))
+    return sum(s.sent for s in fleet)
+
+
+def run_step(port, rate, args, pipeline):
+    """Uma taxa: envia por `duration` segundos e espera o pipeline esvaziar"""
+    pipeline.reset()
+    pipeline.sent_at.clear()
+    cpu_start, wall_start = cpu_seconds(), perf_counter()
+    sent = asyncio.run(drive(port, rate, args.satellites, args.duration, pipeline, args.seed))
+    deadline = perf_counter() + DRAIN_TIMEOUT
+    while pipeline.processed < sent and perf_counter() < deadline:
+        time.sleep(0.01)
+    wall = perf_counter() - wall_start
+    cpu = cpu_seconds() - cpu_start
+
+    stages = {stage: summarize(getattr(pipeline, stage).samples, wall) for stage in STAGES}
+    return {
+        "rate": rate,
+        "satellites": args.satellites,
+        "duration": args.duration,
+        "sent": sent,
+        "processed": pipeline.processed,
+        "achieved_rate": round(pipeline.processed / wall, 1),
+        "emitted_bytes": pipeline.emitted_bytes,
+        "wall_seconds": round(wall, 3),
+        "cpu_percent": round(100 * cpu / wall, 1),
+        "rss_mb": rss_mb(),
+        "rss_peak_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "stages": stages,
+        # Do envio pelo satélite ao fim do emit: só os percentis fazem sentido
+        "end_to_end": {key: value for key, value in summarize(pipeline.end_to_end.samples, wall).items()
+                       if key not in ("throughput", "busy_percent")}
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "-C", str(ROOT), "rev-parse", "--short", "HEAD"],
+                              capture_output=True, text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def compare(results, baseline, tolerance):
+    """Regressões de p99 e vazão em relação à base, nas taxas presentes nas duas.
+
+    Retorna o número de execuções comparadas e a lista de regressões.
+    """
+    previous = {(run["rate"], run["satellites"]): run for run in baseline["runs"]}
+    regressions = []
+    compared = 0
+    for run in results["runs"]:
+        base = previous.get((run["rate"], run["satellites"]))
+        if base is None:
+            continue
+        compared += 1
+        for stage in STAGES + ("end_to_end",):
+            new = run["stages"][stage] if stage in STAGES else run[stage]
+            old = base["stages"][stage] if stage in STAGES else base[stage]
+            if new["p99_us"] and old["p99_us"] and new["p99_us"] > old["p99_us"] * (1 + tolerance):
+                regressions.append(f"{run['rate']:g}/s {stage}: p99 {old['p99_us']} -> {new['p99_us']} µs")
+            if (stage in STAGES and new["throughput"] and old["throughput"]
+                    and new["throughput"] < old["throughput"] * (1 - tolerance)):
+                regressions.append(f"{run['rate']:g}/s {stage}: vazão {old['throughput']} -> "
+                                   f"{new['throughput']} /s")
+        if run["achieved_rate"] < base["achieved_rate"] * (1 - tolerance):
+            regressions.append(f"{run['rate']:g}/s: taxa atingida {base['achieved_rate']} -> "
+                               f"{run['achieved_rate']} /s")
+    return compared, regressions
+
+
+def print_step(run):
+    print(f"\n{run['rate']:g} pacotes/s, {run['satellites']} satélites: {run['processed']}/{run['sent']} "
+          f"processados ({run['achieved_rate']:g}/s), CPU {run['cpu_percent']}%, RSS {run['rss_mb']} MiB")
+    print(f"  {'etapa':<10}{'vazão/s':>12}{'p50 µs':>10}{'p99 µs':>10}{'ocupação':>10}")
+    for stage, values in list(run["stages"].items()) + [("end_to_end", run["end_to_end"])]:
+        throughput = "--" if values.get("throughput") is None else f"{values['throughput']:,.0f}"
+        p50 = "--" if values["p50_us"] is None else f"{values['p50_us']:,.0f}"
+        p99 = "--" if values["p99_us"] is None else f"{values['p99_us']:,.0f}"
+        busy = f"{values['busy_percent']}%" if stage in STAGES else ""
+        print(f"  {stage:<10}{throughput:>12}{p50:>10}{p99:>10}{busy:>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do caminho de ingest da GS")
+    parser.add_argument("--rates", default="1,10,100,1000",
+                        help="taxas totais em pacotes/s, separadas por vírgula")
+    parser.add_argument("--satellites", type=int, default=4)
+    parser.add_argument("--duration", type=float, default=10.0, help="segundos por taxa")
+    parser.add_argument("--clients", type=int, default=4, help="clientes do dashboard em modo delta")
+    parser.add_argument("--shards", type=int, default=0,
+                        help="processos de shard do ingest (0 = tudo na thread do ingest)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="grava os resultados em JSON")
+    parser.add_argument("--compare", help="JSON de uma execução anterior para detectar regressões")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    args = parser.parse_args()
+    rates = [float(rate) for rate in args.rates.split(",")]
+
+    with tempfile.TemporaryDirectory(prefix="bench_ingest_") as logs_dir:
+        pipeline = Pipeline(Path(logs_dir), args.clients)
+        shards = ShardPool(args.shards, logs_dir) if args.shards > 0 else None
+        server = ingest_server.IngestServer(pipeline.on_telemetry, host="127.0.0.1", port=0,
+                                            logs_dir=Path(logs_dir), shards=shards)
+        server.start_in_thread()
+        port = server._server.sockets[0].getsockname()[1]
+
+        results = {
+            "created": datetime.now().isoformat(),
+            "revision": git_revision(),
+            "host": {"python": platform.python_version(), "machine": platform.machine(),
+                     "system": platform.platform(), "cpus": os.cpu_count()},
+            "args": vars(args),
+            "runs": []
+        }
+        for rate in rates:
+            run = run_step(port, rate, args, pipeline)
+            results["runs"].append(run)
+            print_step(run)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResultados gravados em {args.output}")
+    if args.compare:
+        with open(args.compare) as f:
+            compared, regressions = compare(results, json.load(f), args.tolerance)
+        if not compared:
+            print("\nNenhuma taxa/número de satélites em comum com a base")
+        elif regressions:
+            print("\nRegressões:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        else:
+            print(f"\nSem regressões em relação à base ({compared} taxas comparadas)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,138 +1,881 @@
-from flask import Flask, render_template
-from flask_socketio import SocketIO, emit
+from flask import Flask, Response, render_template, request
+from flask_socketio import SocketIO, emit, join_room
+import hashlib
 import json
 import eventlet
+from eventlet.hubs import trampoline
+from eventlet.timeout import Timeout
 from datetime import datetime
 from pathlib import Path
 import os
+import re
+import threading
 import time
+from time import perf_counter
+
+import fleet
+import capture
+import metrics
+from channel_rooms import ChannelRooms
+from client_outbox import ClientOutboxes
+from fleet import DEFAULT_SATELLITE, Fleet, parse_satellite, satellite_room
+from hot_store import HotStore
+from hub_bridge import HubQueue
+from ingest_server import IngestServer
+from ingest_shards import ShardPool
+from latency_trace import LatencyTracer
+from link_monitor import LinkMonitor
+from log_cache import ParsedLogCache
+from log_watcher import create_log_watcher
+from rollups import DEFAULT_MAX_POINTS, RollupStore, get_field, parse_time
+from telemetry_stream import TelemetryStream
+from worker_pool import PoolBusy, PoolTimeout, WorkerPool
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'secret!'
 socketio = SocketIO(app, async_mode='eventlet')
 
-# Caminho para os logs do satélite
+# Métricas dos caminhos quentes do hub (as do ingest ficam em ingest_server)
+READ_LOG_FILE_SECONDS = metrics.Histogram(
+    "gs_read_log_file_seconds", "Leitura do registro mais recente de um stream (read_log_file)")
+EMIT_SECONDS = metrics.Histogram(
+    "gs_socket_emit_seconds", "Duração de socketio.emit por evento", ("event",))
+CLIENTS_CONNECTED = metrics.Gauge("gs_clients_connected", "Clientes Socket.IO conectados")
+QUEUE_DEPTH = metrics.Gauge("gs_queue_depth", "Itens aguardando em cada fila", ("queue",))
+HUB_LAG_SECONDS = metrics.Histogram(
+    "gs_hub_lag_seconds", "Atraso do hub do eventlet em acordar uma greenlet após o sleep")
+LINK_UP = metrics.Gauge("gs_link_up", "1 se o enlace com o satélite está ativo", ("satellite",))
+
+# Período da medição do atraso do hub
+HUB_LAG_INTERVAL = 0.5
+
+# Caminho para os logs dos satélites (o padrão na raiz, os demais em
+# satellites/<id>/, ver fleet.py)
 LOGS_DIR = Path("/home/groundstation/projeto_final/GS/logs")
 
-# Store satellite state
-satellite_state = {
-    'connected': False,
-    'last_telemetry': None,
-    'last_log_check': datetime.now().timestamp(),
-    'adcs_status': None,
-    'power_status': None
+# Processos que decodificam, derivam e gravam a telemetria do ingest, com os
+# satélites divididos entre eles; um núcleo fica para o dashboard (0 = tudo
+# na thread do ingest)
+INGEST_SHARDS = min(4, (os.cpu_count() or 1) - 1)
+
+# Diretório onde gravar uma captura dos bytes recebidos pelo ingest (uma por
+# execução, reproduzível com capture.py replay); None desativa
+CAPTURE_DIR = None
+
+# Cache dos logs interpretados do satélite padrão (só relê quando o arquivo muda)
+log_cache = ParsedLogCache(LOGS_DIR, max_entries=32, tail_size=100)
+
+# Telemetria recebida (e já gravada) pelo ingest TCP, até o hub do eventlet
+ingest_queue = HubQueue()
+
+# Latência de cada amostra do ingest, do tick do satélite ao desenho no
+# navegador (confirmado com telemetry_rendered)
+latency_tracer = LatencyTracer()
+client_connected_at = {}
+
+# Andamento dos telecomandos (sent/acked/error/timeout), da thread do ingest
+# até o hub, para ser enviado ao cliente que emitiu o comando
+command_queue = HubQueue()
+
+# Toda telemetria sai por filas por cliente: o valor mais recente de cada
+# chave vence e só algumas mensagens ficam sem ack, então um cliente lento
+# não acumula envios nem atrasa os demais
+def timed_emit(event, data, **kwargs):
+    """socketio.emit com a duração registrada em gs_socket_emit_seconds"""
+    start = perf_counter()
+    socketio.emit(event, data, **kwargs)
+    EMIT_SECONDS.labels(event).observe(perf_counter() - start)
+
+outboxes = ClientOutboxes(
+    lambda sid, event, data, callback: timed_emit(event, data, to=sid, callback=callback))
+
+# Stream de log -> caminho no dicionário de telemetria enviado aos clientes
+TELEMETRY_CHANNELS = {
+    ('adcs', 'attitude.json'): ('adcs', 'attitude'),
+    ('adcs', 'magnetometer.json'): ('adcs', 'magnetometer'),
+    ('power', 'battery.json'): ('power', 'battery'),
+    ('power', 'solar_panels.json'): ('power', 'solar'),
+    ('power', 'consumption.json'): ('power', 'consumption'),
+    ('thermal', 'temperatures.json'): ('thermal',),
+    ('communication', 'radio.json'): ('communication',),
+    ('system', 'status.json'): ('system',)
 }
 
-def read_log_file(category, filename):
-    """Lê um arquivo de log JSON com histórico"""
-    try:
-        filepath = LOGS_DIR / category / filename
-        if filepath.exists():
-            with open(filepath, 'r') as f:
-                logs = json.load(f)
-                if isinstance(logs, list) and logs:
-                    # Retorna a entrada mais recente por padrão
-                    return logs[-1]  # Último item do array
-                return logs
+# Tempo máximo de espera por mudanças nos logs
+LOG_WAIT_TIMEOUT = 5.0
+
+# Leitura de logs, JSON e consultas de histórico rodam em threads, fora do
+# hub; o carregamento inicial dos streams pode ler muitos segmentos
+worker_pool = WorkerPool()
+LOAD_TIMEOUT = 300.0
+
+# Consultas incrementais de histórico (since): registros por série
+HISTORY_LIMIT = 100
+MAX_HISTORY_LIMIT = 1000
+# Nome de categoria ou arquivo aceito em `series` (sem separadores nem "..")
+STREAM_NAME = re.compile(r"^[\w-][\w.-]*$")
+
+# Transições do enlace de cada satélite acordam a task monitor_link
+link_events = HubQueue()
+
+class Satellite:
+    """Armazenamento, estado e clientes de um satélite da constelação"""
+
+    def __init__(self, satellite_id):
+        self.id = satellite_id
+        self.logs_dir = fleet.satellite_logs_dir(LOGS_DIR, satellite_id)
+
+        # Amostras recentes de cada stream em memória (colunas NumPy): servem o
+        # histórico e os valores atuais sem acessar o disco
+        self.hot_store = HotStore(self.logs_dir)
+        # Agregados de 1 s / 1 min / 1 h para as consultas de histórico por intervalo
+        self.rollups = RollupStore(self.logs_dir, hot=self.hot_store)
+        # Serializa a entrada de registros no hot store e nos agregados, que pode
+        # vir do hub (ingest) e do pool (logs alterados) ao mesmo tempo
+        self.store_lock = threading.Lock()
+
+        # Estado do enlace, atualizado pelo ingest e pelos registros novos nos logs
+        self.link_monitor = LinkMonitor(notify=lambda: link_events.put(satellite_id))
+        LINK_UP.labels(str(satellite_id)).set_function(lambda: int(self.link_monitor.connected))
+        self.last_telemetry = None
+
+        # Clientes em modo delta recebem telemetry_frame com só os campos alterados
+        # desde o último quadro confirmado; os demais (full_telemetry_clients)
+        # continuam recebendo telemetry_update
+        self.full_telemetry_clients = set()
+        self.telemetry_stream = TelemetryStream(
+            lambda event, data, sid: outboxes.put(sid, event, event, data,
+                                                  merge=merge_fields if event == 'telemetry_fields' else None))
+
+        # Clientes inscritos por canal ("adcs.attitude", "thermal", ...) e faixa de
+        # taxa recebem channel_update só dos canais escolhidos, na taxa escolhida
+        self.channel_rooms = ChannelRooms(
+            ('.'.join(path) for path in TELEMETRY_CHANNELS.values()),
+            lambda sid, channel, event, data: outboxes.put(sid, ('channel', channel), event, data))
+
+# Satélites conhecidos: os que têm logs e os que se conectarem ao ingest
+satellites = Fleet(Satellite)
+for satellite_id in fleet.list_satellites(LOGS_DIR):
+    satellites.get(satellite_id)
+
+# Satélite acompanhado por cada cliente Socket.IO (sid -> Satellite)
+client_satellites = {}
+
+def read_log_file(satellite, category, filename):
+    """Registro mais recente de um stream de log (do hot store)"""
+    start = perf_counter()
+    try:
+        return satellite.hot_store.latest(category, filename)
     except Exception as e:
-        print(f"Erro ao ler {filepath}: {e}")
+        print(f"Erro ao ler {category}/{filename}: {e}")
+    finally:
+        READ_LOG_FILE_SECONDS.observe(perf_counter() - start)
     return None
 
-def get_log_history(category, filename, limit=50):
-    """Obtém histórico completo de um arquivo de log"""
-    try:
-        filepath = LOGS_DIR / category / filename
-        if filepath.exists():
-            with open(filepath, 'r') as f:
-                logs = json.load(f)
-                if isinstance(logs, list):
-                    # Limitar o número de entradas retornadas
-                    return logs[-limit:] if len(logs) > limit else logs
-                # Se não for uma lista, retorna como item único
-                return [logs]
+def get_log_history(satellite, category, filename, limit=50):
+    """Obtém os últimos `limit` registros de um stream de log (do hot store)"""
+    try:
+        return satellite.hot_store.tail(category, filename, limit)
     except Exception as e:
-        print(f"Erro ao ler histórico de {filepath}: {e}")
+        print(f"Erro ao ler histórico de {category}/{filename}: {e}")
     return []
 
-def check_for_signal():
-    """Verifica se há comunicação com o satélite recentemente"""
-    radio_log = read_log_file("communication", "radio.json")
-    if radio_log and "timestamp" in radio_log:
+def store_records(satellite, category, filename, records, contiguous=False):
+    """Coloca os registros novos no hot store e nos agregados (executa no worker_pool).
+
+    `records` são os últimos registros do stream (ou, com `contiguous`, os
+    que acabaram de chegar, em ordem); retorna os que ainda não estavam no
+    hot store.
+    """
+    with satellite.store_lock:
+        if contiguous:
+            added = [record for record in records
+                     if satellite.hot_store.append(category, filename, record)]
+        else:
+            added = satellite.hot_store.extend(category, filename, records)
+        for record in added:
+            satellite.rollups.add(category, filename, record)
+    return added
+
+def read_changed_logs(satellite, changed):
+    """Lê o final dos logs alterados e guarda os registros novos (executa no worker_pool).
+
+    Retorna o registro mais recente de cada stream de telemetria alterado e
+    o total de registros novos.
+    """
+    latest = {}
+    new_records = 0
+    for key in changed:
+        added = store_records(satellite, *key, log_cache.tail(*key, log_cache.tail_size))
+        new_records += len(added)
+        if added and key in TELEMETRY_CHANNELS:
+            latest[key] = added[-1]
+    return latest, new_records
+
+def parse_series(text):
+    """'categoria/arquivo[:campo:campo],...' -> [(categoria, arquivo, campos)]"""
+    series = []
+    for item in text.split(','):
+        name, *fields = item.strip().split(':')
+        category, _, filename = name.partition('/')
+        if not (STREAM_NAME.match(category) and STREAM_NAME.match(filename)):
+            raise ValueError(f"série inválida: {item}")
+        series.append((category, filename, fields))
+    return series
+
+def parse_cursor(text, count):
+    """Cursor de uma consulta incremental: um epoch por série (vazio = sem cursor)"""
+    if not text:
+        return [None] * count
+    parts = text.split(',')
+    if len(parts) != count:
+        raise ValueError("cursor não corresponde às séries")
+    return [parse_time(part) if part else None for part in parts]
+
+def format_cursor(cursors):
+    return ','.join('' if cursor is None else repr(cursor) for cursor in cursors)
+
+def project(record, fields):
+    """Só o timestamp e os campos pedidos de um registro (todos, sem campos)"""
+    if not fields:
+        return record
+    projected = {'timestamp': record.get('timestamp')}
+    for field in fields:
+        value = get_field(record, field)
+        if value is not None:
+            projected[field] = value
+    return projected
+
+def incremental_history_json(satellite, series, cursors, limit):
+    """Registros novos de cada série desde o seu cursor, em JSON (executa no worker_pool)"""
+    result, next_cursors = {}, []
+    for (category, filename, fields), after in zip(series, cursors):
+        records, cursor = satellite.hot_store.since(category, filename, after, limit)
+        result[f"{category}/{filename}"] = [project(record, fields) for record in records]
+        next_cursors.append(cursor)
+    return json.dumps({'cursor': format_cursor(next_cursors), 'series': result})
+
+def since_history_json(satellite, category, filename, after, limit):
+    """Registros de um stream posteriores a `after`, em JSON (executa no worker_pool)"""
+    records, cursor = satellite.hot_store.since(category, filename, after, limit)
+    return json.dumps({'cursor': format_cursor([cursor]), 'points': records})
+
+def recent_history_json(satellite, category, filename):
+    """Últimos 100 registros de um stream, em JSON (executa no worker_pool)"""
+    return json.dumps(get_log_history(satellite, category, filename, limit=100))
+
+def range_history_json(satellite, category, filename, start, end, max_points, field):
+    """Histórico de um intervalo reduzido com LTTB, em JSON (executa no worker_pool)"""
+    return json.dumps(satellite.rollups.query(category, filename, start, end, max_points, field))
+
+def link_status(satellite, transition=None):
+    """Evento 'status' enviado aos clientes de um satélite"""
+    link_monitor = satellite.link_monitor
+    status = {'satellite': satellite.id, 'connected': link_monitor.connected,
+              'link': link_monitor.stats()}
+    if transition is not None:
+        status['transition'] = transition
+    return status
+
+def fleet_summary():
+    """Evento 'fleet': estado do enlace e clientes de cada satélite conhecido"""
+    clients = {}
+    for satellite in list(client_satellites.values()):
+        clients[satellite.id] = clients.get(satellite.id, 0) + 1
+    return {str(satellite.id): {'state': satellite.link_monitor.state,
+                                'last_frame': satellite.link_monitor.stats()['last_frame'],
+                                'clients': clients.get(satellite.id, 0)}
+            for satellite in satellites}
+
+def get_channel(telemetry, path):
+    """Valor no caminho `path` do dicionário de telemetria"""
+    for key in path:
+        telemetry = telemetry.get(key) if isinstance(telemetry, dict) else None
+    return telemetry
+
+def set_channel(telemetry, path, value):
+    """Coloca `value` no caminho `path` do dicionário de telemetria"""
+    node = telemetry
+    for key in path[:-1]:
+        node = node.setdefault(key, {})
+    node[path[-1]] = value
+
+def collect_telemetry(satellite, streams=None):
+    """Monta a telemetria dos streams indicados (todos, se None)"""
+    telemetry = {'timestamp': datetime.now().isoformat()}
+    for key, path in TELEMETRY_CHANNELS.items():
+        if streams is None or key in streams:
+            set_channel(telemetry, path, read_log_file(satellite, *key))
+    return telemetry
+
+def publish_channels(satellite, records, trace=None):
+    """Atualiza o estado com os registros recebidos e envia só os que mudaram.
+
+    `records` mapeia (categoria, arquivo) -> registro mais recente. Um mesmo
+    registro pode chegar pelo ingest TCP e pelo observador de logs; só a
+    primeira chegada é enviada aos clientes. Com `trace`, o envio leva o id
+    do trace para o navegador confirmar o desenho.
+    """
+    if satellite.last_telemetry is None:
+        satellite.last_telemetry = {}
+    state = satellite.last_telemetry
+
+    update = {}
+    for key, record in records.items():
+        path = TELEMETRY_CHANNELS.get(key)
+        if path is None or record == get_channel(state, path):
+            continue
+        set_channel(update, path, record)
+        set_channel(state, path, record)
+        satellite.channel_rooms.publish('.'.join(path), record)
+
+    if update:
+        update['timestamp'] = state['timestamp'] = datetime.now().isoformat()
+        if trace is not None:
+            update['trace'] = state['trace'] = latency_tracer.publish(trace)
+        else:
+            state.pop('trace', None)
+        send_full_telemetry(satellite, update)
+        satellite.telemetry_stream.publish(state)
+
+def merge_fields(pending, fields):
+    """Combina anúncios de ids de campos ainda não enviados"""
+    return {**pending, **fields}
+
+def merge_telemetry_update(pending, update):
+    """Combina dois telemetry_update parciais; o registro mais recente de cada canal vence"""
+    merged = {'timestamp': update.get('timestamp', pending.get('timestamp'))}
+    if 'trace' in update:
+        merged['trace'] = update['trace']
+    for path in TELEMETRY_CHANNELS.values():
+        record = get_channel(update, path)
+        if record is None:
+            record = get_channel(pending, path)
+        if record is not None:
+            set_channel(merged, path, record)
+    return merged
+
+def send_full_telemetry(satellite, update):
+    """Envia um telemetry_update aos clientes do satélite que recebem a telemetria completa"""
+    for sid in satellite.full_telemetry_clients:
+        outboxes.put(sid, 'telemetry_update', 'telemetry_update', update, merge=merge_telemetry_update)
+
+def wait_for_log_changes(watcher, timeout):
+    """Bloqueia (sem ocupar o hub) até algum log mudar ou `timeout` expirar"""
+    fd = watcher.fileno()
+    if fd is None:
+        eventlet.sleep(min(timeout, watcher.poll_interval))
+    else:
         try:
-            log_time = datetime.fromisoformat(radio_log["timestamp"])
-            now = datetime.now()
-            time_diff = (now - log_time).total_seconds()
-            return time_diff < 30  # Considera conectado se o log tiver menos de 30 segundos
-        except (ValueError, TypeError) as e:
-            print(f"Erro ao analisar timestamp: {e}")
-    return False
+            trampoline(fd, read=True, timeout=timeout)
+        except Timeout:
+            pass
+    return watcher.read_changes()
+
+def preload_satellite(satellite):
+    """Carrega do disco o hot store e os agregados dos streams de telemetria (executa no worker_pool).
+
+    Assim o primeiro registro de cada stream não paga a leitura do histórico.
+    """
+    for key in TELEMETRY_CHANNELS:
+        satellite.hot_store.channel(*key)
+        satellite.rollups.load(*key)
+    return collect_telemetry(satellite)
+
+def load_satellite(satellite):
+    """Carrega os streams de um satélite e publica o estado inicial"""
+    satellite.last_telemetry = worker_pool.run(preload_satellite, satellite,
+                                               timeout=LOAD_TIMEOUT, reserved=True)
+    satellite.telemetry_stream.publish(satellite.last_telemetry)
+    for path in TELEMETRY_CHANNELS.values():
+        record = get_channel(satellite.last_telemetry, path)
+        if record is not None:
+            satellite.channel_rooms.publish('.'.join(path), record)
 
 def gather_telemetry():
-    """Background task que coleta telemetria dos logs e envia ao cliente"""
+    """Background task que envia aos clientes só os subsistemas cujos logs mudaram.
+
+    Observa os logs do satélite padrão (enviados por SSH); os demais satélites
+    só recebem telemetria pelo ingest.
+    """
+    satellite = satellites.get(DEFAULT_SATELLITE)
+    watcher = create_log_watcher(LOGS_DIR)
+    # Satélites ainda por carregar e logs alterados ainda não lidos: voltam a
+    # ser tentados depois de um erro
+    unloaded = list(satellites)
+    changed = set()
+
     while True:
         try:
-            # Verificar se há comunicação recente com o satélite
-            connected = check_for_signal()
-            if satellite_state['connected'] != connected:
-                satellite_state['connected'] = connected
-                socketio.emit('status', {'connected': connected})
-            
-            # Coletar dados dos diferentes subsistemas
-            telemetry = {
-                'timestamp': datetime.now().isoformat(),
-                'adcs': {
-                    'attitude': read_log_file('adcs', 'attitude.json'),
-                    'magnetometer': read_log_file('adcs', 'magnetometer.json')
-                },
-                'power': {
-                    'battery': read_log_file('power', 'battery.json'),
-                    'solar': read_log_file('power', 'solar_panels.json'),
-                    'consumption': read_log_file('power', 'consumption.json')
-                },
-                'thermal': read_log_file('thermal', 'temperatures.json'),
-                'communication': read_log_file('communication', 'radio.json'),
-                'system': read_log_file('system', 'status.json')
-            }
-            
-            satellite_state['last_telemetry'] = telemetry
-            socketio.emit('telemetry_update', telemetry)
-            
+            while unloaded:
+                load_satellite(unloaded[0])
+                unloaded.pop(0)
+
+            changed |= wait_for_log_changes(watcher, LOG_WAIT_TIMEOUT)
+
+            # Registros novos (lidos do final do log) vão para o hot store e os agregados
+            latest, new_records = (worker_pool.run(read_changed_logs, satellite, changed, reserved=True)
+                                   if changed else ({}, 0))
+            changed = set()
+
+            # Registros que não vieram pelo ingest TCP (ex.: logs enviados por SSH)
+            # também mostram que o enlace está ativo
+            if new_records:
+                satellite.link_monitor.frames_received(new_records)
+
+            # Enviar apenas os subsistemas alterados
+            if latest:
+                publish_channels(satellite, latest)
+
         except Exception as e:
             print(f"Erro ao coletar telemetria: {e}")
-        finally:
-            eventlet.sleep(1)  # Atualiza a cada segundo
+            eventlet.sleep(1)  # Evita spam de erros
+
+def monitor_link():
+    """Background task que envia aos clientes as transições do enlace assim que ocorrem"""
+    while True:
+        try:
+            deadlines = [deadline for deadline in (s.link_monitor.next_deadline() for s in satellites)
+                         if deadline is not None]
+            try:
+                trampoline(link_events.fileno(), read=True, timeout=min(deadlines, default=None))
+            except Timeout:
+                pass
+            link_events.drain()
+            changed = False
+            for satellite in satellites:
+                for transition in satellite.link_monitor.check():
+                    changed = True
+                    print(f"Enlace do satélite {satellite.id}: {transition['previous']} -> "
+                          f"{transition['state']} ({transition['reason']})")
+                    timed_emit('status', link_status(satellite, transition),
+                               to=satellite_room(satellite.id))
+            if changed:
+                timed_emit('fleet', fleet_summary())
+        except Exception as e:
+            print(f"Erro ao monitorar o enlace: {e}")
+            eventlet.sleep(1)
+
+def flush_channel_rooms():
+    """Background task que envia as salas de canal quando o período de cada faixa vence"""
+    while True:
+        try:
+            delay = min((satellite.channel_rooms.flush() for satellite in satellites), default=1)
+        except Exception as e:
+            print(f"Erro ao enviar canais: {e}")
+            delay = 1
+        eventlet.sleep(delay)
+
+def monitor_outboxes():
+    """Background task que detecta clientes que pararam de confirmar as mensagens"""
+    while True:
+        eventlet.sleep(1)
+        for sid in outboxes.check():
+            print(f"Cliente {sid} travado: {outboxes.outboxes[sid].lag():.1f} s sem ack")
+
+def on_ingest_telemetry(satellite_id, peer, records, trace=None):
+    """Recebe a telemetria já gravada pelo serviço de ingest (executa na thread do ingest)"""
+    latest = {(category, filename): entry for category, filename, entry in records}
+    ingest_queue.put((satellite_id, latest, trace))
+
+def store_ingest(batch):
+    """Guarda um lote da telemetria do ingest no hot store e nos agregados (executa no worker_pool).
+
+    Retorna (satélite, registros novos, trace) de cada amostra do lote.
+    """
+    stored = []
+    for satellite, latest, trace in batch:
+        fresh = {key: record for key, record in latest.items()
+                 if store_records(satellite, *key, [record], contiguous=True)}
+        stored.append((satellite, fresh, trace))
+    return stored
+
+def forward_ingest():
+    """Background task que envia aos clientes a telemetria recebida pelo ingest"""
+    while True:
+        try:
+            trampoline(ingest_queue.fileno(), read=True)
+            batch = [(satellites.get(satellite_id), latest, trace)
+                     for satellite_id, latest, trace in ingest_queue.drain()]
+            if not batch:
+                continue
+            # Os locks do hot store e dos agregados podem estar com uma thread
+            # do pool que lê o disco: a gravação vai para o pool, não para o hub
+            for satellite, fresh, trace in worker_pool.run(store_ingest, batch, reserved=True):
+                publish_channels(satellite, fresh, trace)
+        except Exception as e:
+            print(f"Erro ao encaminhar telemetria do ingest: {e}")
+            eventlet.sleep(1)  # Evita spam de erros
+
+def measure_hub_lag():
+    """Background task que mede quanto o hub atrasa para acordar uma greenlet"""
+    while True:
+        start = perf_counter()
+        eventlet.sleep(HUB_LAG_INTERVAL)
+        HUB_LAG_SECONDS.observe(max(0.0, perf_counter() - start - HUB_LAG_INTERVAL))
+
+def on_command_result(command, status):
+    """Andamento de um telecomando (executa na thread do ingest)"""
+    update = {'id': command.id, 'command': command.name, **status}
+    if command.plan_indices is not None:
+        update['plan_indices'] = command.plan_indices
+    command_queue.put((command.sid, update))
+
+def forward_command_status():
+    """Background task que envia o andamento de cada telecomando ao cliente que o emitiu"""
+    while True:
+        try:
+            trampoline(command_queue.fileno(), read=True)
+            for sid, status in command_queue.drain():
+                timed_emit('command_status', status, to=sid)
+        except Exception as e:
+            print(f"Erro ao encaminhar status de comandos: {e}")
+            eventlet.sleep(1)
+
+# Serviço de ingest TCP dos satélites (porta 5000); grava a telemetria nos
+# logs de cada satélite e também envia os telecomandos
+ingest_server = IngestServer(on_ingest_telemetry, on_command_result,
+                             links=lambda satellite_id: satellites.get(satellite_id).link_monitor,
+                             tracer=latency_tracer, logs_dir=LOGS_DIR,
+                             shards=ShardPool(INGEST_SHARDS, LOGS_DIR) if INGEST_SHARDS > 0 else None,
+                             capture=(capture.CaptureWriter(capture.new_capture_path(CAPTURE_DIR))
+                                      if CAPTURE_DIR is not None else None))
+
+QUEUE_DEPTH.labels('ingest').set_function(lambda: len(ingest_queue))
+QUEUE_DEPTH.labels('command_status').set_function(lambda: len(command_queue))
+QUEUE_DEPTH.labels('link_events').set_function(lambda: len(link_events))
+QUEUE_DEPTH.labels('command_uplink').set_function(ingest_server.pending_commands)
+QUEUE_DEPTH.labels('client_outbox').set_function(
+    lambda: sum(len(outbox.pending) for outbox in list(outboxes.outboxes.values())))
+QUEUE_DEPTH.labels('client_in_flight').set_function(
+    lambda: sum(len(outbox.in_flight) for outbox in list(outboxes.outboxes.values())))
 
 @app.route('/')
 def index():
     return render_template('index.html')
 
+def request_satellite():
+    """Satélite do parâmetro `satellite` da requisição (padrão: DEFAULT_SATELLITE).
+
+    Levanta ValueError se o parâmetro for inválido e LookupError se o
+    satélite não for conhecido.
+    """
+    satellite_id = parse_satellite(request.args.get('satellite'))
+    satellite = satellites.find(satellite_id)
+    if satellite is None:
+        raise LookupError(f'Satélite desconhecido: {satellite_id}')
+    return satellite
+
+def satellite_error(e):
+    """Resposta de erro de request_satellite"""
+    if isinstance(e, LookupError):
+        return json.dumps({'error': str(e)}), 404
+    return json.dumps({'error': f'Parâmetro inválido: {e}'}), 400
+
+def history_response(satellite, streams, render, *args):
+    """Executa `render(satellite, *args)` no worker_pool e responde com um ETag forte.
+
+    O ETag vem da URL e da versão (amostras recebidas, última) de cada stream
+    no hot store, lida antes da consulta: se o cliente já tem a resposta desta
+    versão (If-None-Match), volta 304 sem consultar nada.
+    """
+    versions = [satellite.hot_store.version(category, filename) for category, filename in streams]
+    etag = None
+    if None not in versions:
+        key = repr((request.full_path, versions)).encode()
+        etag = hashlib.blake2b(key, digest_size=12).hexdigest()
+        if request.if_none_match.contains(etag):
+            response = app.response_class(status=304)
+            response.set_etag(etag)
+            return response
+    try:
+        body = worker_pool.run(render, satellite, *args)
+    except PoolBusy as e:
+        return json.dumps({'error': str(e)}), 503, {'Retry-After': '1'}
+    except PoolTimeout as e:
+        return json.dumps({'error': str(e)}), 504
+    response = app.response_class(body, mimetype='application/json')
+    if etag is not None:
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'no-cache'
+    return response
+
 @app.route('/api/history/<category>/<filename>')
 def get_history(category, filename):
-    """Endpoint para obter histórico de logs para gráficos"""
-    history = get_log_history(category, filename, limit=100)
-    return json.dumps(history)
+    """Endpoint para obter histórico de logs para gráficos.
+
+    Sem parâmetros retorna os últimos 100 registros. Com `since` (cursor:
+    epoch ou ISO 8601) retorna só os registros posteriores e o novo cursor.
+    Com `from`/`to` (epoch ou ISO 8601), `max_points` e `field` retorna o
+    intervalo pedido a partir dos registros brutos ou dos agregados,
+    reduzido com LTTB. Respostas têm ETag (If-None-Match -> 304). `satellite`
+    escolhe o satélite (padrão: 1).
+    """
+    args = request.args
+    streams = [(category, filename)]
+    try:
+        satellite = request_satellite()
+    except (ValueError, LookupError) as e:
+        return satellite_error(e)
+    try:
+        if 'since' in args:
+            after = parse_time(args['since']) if args['since'] else None
+            limit = max(1, min(int(args.get('limit', HISTORY_LIMIT)), MAX_HISTORY_LIMIT))
+            return history_response(satellite, streams, since_history_json, category, filename,
+                                    after, limit)
+        if not any(name in args for name in ('from', 'to', 'max_points')):
+            return history_response(satellite, streams, recent_history_json, category, filename)
+
+        start = parse_time(args.get('from'))
+        end = parse_time(args.get('to'))
+        max_points = int(args.get('max_points', DEFAULT_MAX_POINTS))
+    except ValueError as e:
+        return json.dumps({'error': f'Parâmetro inválido: {e}'}), 400
+    return history_response(satellite, streams, range_history_json, category, filename,
+                            start, end, max_points, args.get('field'))
+
+@app.route('/api/history')
+def get_history_series():
+    """Registros novos de várias séries numa só resposta.
+
+    `series=thermal/temperatures.json:internal,power/battery.json:level`
+    (campos opcionais após ':') e `since` = o `cursor` da resposta anterior
+    (um epoch por série; ausente na primeira consulta). Cada série traz no
+    máximo `limit` registros, os mais recentes. `satellite` escolhe o satélite.
+    """
+    args = request.args
+    try:
+        satellite = request_satellite()
+    except (ValueError, LookupError) as e:
+        return satellite_error(e)
+    try:
+        series = parse_series(args.get('series', ''))
+        cursors = parse_cursor(args.get('since'), len(series))
+        limit = max(1, min(int(args.get('limit', HISTORY_LIMIT)), MAX_HISTORY_LIMIT))
+    except ValueError as e:
+        return json.dumps({'error': f'Parâmetro inválido: {e}'}), 400
+    return history_response(satellite, [(category, filename) for category, filename, _ in series],
+                            incremental_history_json, series, cursors, limit)
+
+@app.route('/metrics')
+def get_metrics():
+    """Contadores, histogramas de latência e gauges no formato do Prometheus"""
+    return Response(metrics.render(), content_type=metrics.CONTENT_TYPE)
+
+@app.route('/api/stats/log_cache')
+def get_log_cache_stats():
+    """Contadores de acerto/falha do cache de logs"""
+    return json.dumps(log_cache.stats())
+
+@app.route('/api/stats/hot_store')
+def get_hot_store_stats():
+    """Amostras e memória do hot store por stream (`satellite` escolhe o satélite)"""
+    try:
+        satellite = request_satellite()
+    except (ValueError, LookupError) as e:
+        return satellite_error(e)
+    return json.dumps(satellite.hot_store.stats())
+
+@app.route('/api/stats/rollups')
+def get_rollup_stats():
+    """Baldes mantidos por stream e nível de agregação (`satellite` escolhe o satélite)"""
+    try:
+        satellite = request_satellite()
+    except (ValueError, LookupError) as e:
+        return satellite_error(e)
+    return json.dumps(satellite.rollups.stats())
+
+@app.route('/api/stats/telemetry_stream')
+def get_telemetry_stream_stats():
+    """Quadros, keyframes e bytes enviados aos clientes em modo delta (`satellite` escolhe o satélite)"""
+    try:
+        satellite = request_satellite()
+    except (ValueError, LookupError) as e:
+        return satellite_error(e)
+    return json.dumps(satellite.telemetry_stream.stats())
+
+@app.route('/api/stats/channel_rooms')
+def get_channel_room_stats():
+    """Clientes, envios e bytes por sala de canal (`satellite` escolhe o satélite)"""
+    try:
+        satellite = request_satellite()
+    except (ValueError, LookupError) as e:
+        return satellite_error(e)
+    return json.dumps(satellite.channel_rooms.stats())
+
+@app.route('/api/stats/link')
+def get_link_stats():
+    """Estado do enlace, cadência de heartbeats, taxas e quedas (`satellite` escolhe o satélite)"""
+    try:
+        satellite = request_satellite()
+    except (ValueError, LookupError) as e:
+        return satellite_error(e)
+    return json.dumps(satellite.link_monitor.stats())
+
+@app.route('/api/stats/latency')
+def get_latency_stats():
+    """Percentis (p50/p99) de cada etapa da telemetria e o offset do relógio do satélite (`satellite` escolhe o satélite)"""
+    try:
+        satellite = request_satellite()
+    except (ValueError, LookupError) as e:
+        return satellite_error(e)
+    return json.dumps(latency_tracer.stats(satellite.id))
+
+@app.route('/api/stats/worker_pool')
+def get_worker_pool_stats():
+    """Tarefas ativas, recusadas e abandonadas do pool de I/O"""
+    return json.dumps(worker_pool.stats())
+
+@app.route('/api/stats/commands')
+def get_command_stats():
+    """Fila, janela e histogramas de tempo até o ACK dos telecomandos, por satélite"""
+    return json.dumps(ingest_server.uplink_stats())
+
+@app.route('/api/stats/ingest')
+def get_ingest_stats():
+    """Conexões do ingest (satélite de cada uma) e estado dos shards"""
+    return json.dumps(ingest_server.stats())
+
+@app.route('/api/fleet')
+def get_fleet():
+    """Satélites conhecidos, estado do enlace e clientes de cada um"""
+    return json.dumps(fleet_summary())
+
+@app.route('/api/stats/clients')
+def get_client_stats():
+    """Fila, mensagens sem ack e atraso (lag) de cada cliente"""
+    return json.dumps(outboxes.stats())
 
 @socketio.on('connect')
-def handle_connect():
-    print('Client connected')
-    emit('status', {'connected': satellite_state['connected']})
-    if satellite_state['last_telemetry']:
-        emit('telemetry_update', satellite_state['last_telemetry'])
+def handle_connect(auth=None):
+    """Conecta o cliente ao satélite escolhido (auth {'satellite': N} ou ?satellite=N)"""
+    value = auth.get('satellite') if isinstance(auth, dict) else None
+    if value is None:
+        value = request.args.get('satellite')
+    try:
+        satellite_id = parse_satellite(value)
+    except (TypeError, ValueError):
+        return False
+    satellite = satellites.find(satellite_id)
+    if satellite is None:
+        return False
+    print(f'Client connected (satélite {satellite.id})')
+    CLIENTS_CONNECTED.inc()
+    client_connected_at[request.sid] = time.time()
+    client_satellites[request.sid] = satellite
+    join_room(satellite_room(satellite.id))
+    satellite.full_telemetry_clients.add(request.sid)
+    emit('status', link_status(satellite))
+    emit('fleet', fleet_summary())
+    if satellite.last_telemetry:
+        emit('telemetry_update', satellite.last_telemetry)
+
+@socketio.on('disconnect')
+def handle_disconnect():
+    satellite = client_satellites.pop(request.sid, None)
+    if satellite is None:
+        return
+    CLIENTS_CONNECTED.dec()
+    client_connected_at.pop(request.sid, None)
+    satellite.full_telemetry_clients.discard(request.sid)
+    satellite.telemetry_stream.unsubscribe(request.sid)
+    satellite.channel_rooms.unsubscribe(request.sid)
+    outboxes.remove(request.sid)
+
+@socketio.on('telemetry_subscribe')
+def handle_telemetry_subscribe(data):
+    """Passa o cliente para o modo delta ({'encoding': 'json' | 'binary'})"""
+    satellite = client_satellites[request.sid]
+    try:
+        satellite.telemetry_stream.subscribe(request.sid, (data or {}).get('encoding', 'json'))
+    except ValueError as e:
+        emit('error', {'error': str(e)})
+        return
+    satellite.full_telemetry_clients.discard(request.sid)
+    satellite.channel_rooms.unsubscribe(request.sid)
+
+@socketio.on('telemetry_channels')
+def handle_telemetry_channels(data):
+    """Inscreve o cliente em canais ({'channels': {'adcs.attitude': 10, 'thermal': 0.2}}).
+
+    Sem canais, o cliente volta a receber a telemetria completa.
+    """
+    satellite = client_satellites[request.sid]
+    channels = (data or {}).get('channels') or {}
+    try:
+        satellite.channel_rooms.subscribe(request.sid, channels)
+    except (ValueError, TypeError, AttributeError) as e:
+        emit('error', {'error': str(e)})
+        return
+    if channels:
+        satellite.telemetry_stream.unsubscribe(request.sid)
+        satellite.full_telemetry_clients.discard(request.sid)
+    else:
+        satellite.full_telemetry_clients.add(request.sid)
+
+@socketio.on('telemetry_ack')
+def handle_telemetry_ack(data):
+    client_satellites[request.sid].telemetry_stream.ack(request.sid, (data or {}).get('seq'))
+
+@socketio.on('telemetry_resync')
+def handle_telemetry_resync():
+    client_satellites[request.sid].telemetry_stream.resync(request.sid)
+
+@socketio.on('telemetry_rendered')
+def handle_telemetry_rendered(data):
+    """O cliente desenhou a amostra ({'trace': id, 'render_ms': recebida -> desenhada})"""
+    data = data or {}
+    try:
+        latency_tracer.render_ack(int(data.get('trace')), float(data.get('render_ms', 0)),
+                                  since=client_connected_at.get(request.sid))
+    except (TypeError, ValueError):
+        pass
 
 @socketio.on('send_command')
 def handle_command(data):
-    # Process and forward command to satellite
-    print(f'Received command: {data}')
-    # Forward to satellite simulation (TCP connection)
-    # TODO: Implement satellite communication
+    """Envia um telecomando ao satélite do cliente; o andamento volta em command_status"""
+    data = data or {}
+    try:
+        command = ingest_server.submit_command(request.sid, data,
+                                               satellite=client_satellites[request.sid].id)
+    except (ValueError, RuntimeError) as e:
+        emit('command_status', {'command': data.get('type'), 'status': 'rejected', 'error': str(e)})
+        return
+    emit('command_status', {'id': command.id, 'command': command.name, 'status': 'queued'})
+
+@socketio.on('send_command_plan')
+def handle_command_plan(data):
+    """Envia um plano ({'commands': [{'type', 'parameters', 'exec_tick'}]}) em lotes"""
+    try:
+        commands = ingest_server.submit_plan(request.sid, (data or {}).get('commands'),
+                                             satellite=client_satellites[request.sid].id)
+    except (ValueError, RuntimeError) as e:
+        emit('command_status', {'command': 'BATCH', 'status': 'rejected', 'error': str(e)})
+        return
+    for command in commands:
+        emit('command_status', {'id': command.id, 'command': command.name, 'status': 'queued',
+                                'plan_indices': command.plan_indices})
 
 @socketio.on('telemetry')
 def handle_telemetry(data):
     # Process telemetry data from satellite
-    satellite_state['last_telemetry'] = data
-    emit('telemetry_update', data, broadcast=True)
+    satellite = client_satellites[request.sid]
+    satellite.last_telemetry = data
+    send_full_telemetry(satellite, data)
+    satellite.telemetry_stream.publish(data)
 
 if __name__ == '__main__':
+    # Inicia o ingest TCP dos satélites (porta 5000) numa thread própria
+    ingest_server.start_in_thread()
+
     # Inicia a tarefa de coleta de telemetria em segundo plano
     socketio.start_background_task(gather_telemetry)
-    socketio.run(app, host='0.0.0.0', port=8000, debug=True)
+    socketio.start_background_task(forward_ingest)
+    socketio.start_background_task(flush_channel_rooms)
+    socketio.start_background_task(monitor_outboxes)
+    socketio.start_background_task(forward_command_status)
+    socketio.start_background_task(monitor_link)
+    socketio.start_background_task(measure_hub_lag)
+    # Sem reloader: ele executaria este bloco duas vezes e o ingest não
+    # conseguiria abrir a porta 5000 no segundo processo
+    socketio.run(app, host='0.0.0.0', port=8000, debug=True, use_reloader=False)
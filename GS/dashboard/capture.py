@@ -0,0 +1,410 @@
+#!/usr/bin/env python3
+# Captura binária dos bytes recebidos pela Ground Station, com índice de tempo
+# /home/groundstation/projeto_final/GS/dashboard/capture.py
+#
+# Uma captura são dois arquivos append-only:
+#   - <nome>.cap: FILE_HEADER seguido de registros RECORD (instante de
+#     recepção, stream, satélite, tipo, tamanho) + os bytes recebidos, sem
+#     nenhuma decodificação;
+#   - <nome>.idx: pares (instante, offset) a cada INDEX_INTERVAL segundos de
+#     captura, para posicionar a reprodução em qualquer instante sem
+#     percorrer o arquivo.
+#
+# O ingest (IngestServer com `capture`) grava cada leitura de cada conexão:
+# stream é o id da conexão, o primeiro registro (KIND_OPEN) traz os bytes
+# desde o início da conexão, incluindo o HELLO, e KIND_CLOSE marca o fim. O
+# processador da saída do QEMU (process_qemu_output.py --capture) grava o
+# hex de cada pacote como KIND_QEMU_HEX.
+#
+# CaptureReader mapeia os arquivos em memória (mmap): capturas de vários GB
+# são percorridas sem serem carregadas, e cada registro é uma fatia do mapa.
+# Um registro final incompleto (captura interrompida) é ignorado, e sem o
+# .idx o índice é reconstruído em memória.
+#
+# Uso pela linha de comando:
+#   python3 capture.py info <arquivo.cap>
+#   python3 capture.py index <arquivo.cap>
+#   python3 capture.py replay <arquivo.cap> [--ingest host:porta] [--speed N|max]
+#                             [--from T] [--to T] [--satellite N ...]
+# T é epoch, ISO 8601 ou +segundos a partir do início da captura.
+
+import argparse
+import math
+import mmap
+import os
+import socket
+import struct
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+import protocol
+from fleet import DEFAULT_SATELLITE
+from rollups import format_time, parse_time
+
+CAPTURE_SUFFIX = ".cap"
+INDEX_SUFFIX = ".idx"
+
+# Cabeçalho do arquivo: assinatura e versão do formato
+FILE_HEADER = struct.Struct("<6sH")
+MAGIC = b"GSCAP\x00"
+VERSION = 1
+
+# Registro: instante (epoch), stream, satélite, tipo, tamanho dos dados
+RECORD = struct.Struct("<dIHBxI")
+
+# Entrada do índice: instante e offset do primeiro registro a partir dele
+INDEX_DTYPE = np.dtype([("time", "<f8"), ("offset", "<u8")])
+
+# Intervalo (s) entre entradas do índice: 16 bytes por segundo de captura
+INDEX_INTERVAL = 1.0
+
+# Tipos de registro
+KIND_OPEN = 1       # primeiros bytes de uma conexão do ingest (inclui o HELLO, se houver)
+KIND_DATA = 2       # uma leitura do socket de uma conexão do ingest
+KIND_CLOSE = 3      # conexão encerrada (sem dados)
+KIND_QEMU_HEX = 4   # hex de um pacote [SAT_TELEMETRY_BEGIN]...[SAT_TELEMETRY_END]
+
+KIND_NAMES = {KIND_OPEN: "open", KIND_DATA: "data", KIND_CLOSE: "close", KIND_QEMU_HEX: "qemu_hex"}
+
+DEFAULT_INGEST = "127.0.0.1:5000"
+
+
+def index_path(path):
+    return Path(path).with_suffix(INDEX_SUFFIX)
+
+
+def new_capture_path(directory, prefix="ingest"):
+    """Caminho de uma nova captura em `directory`, com a data e hora no nome"""
+    return Path(directory) / f"{prefix}-{datetime.now():%Y%m%d-%H%M%S}{CAPTURE_SUFFIX}"
+
+
+class CaptureWriter:
+    """Escritor append-only de uma captura (um único escritor por arquivo).
+
+    Cada `record` custa uma escrita no fim do .cap; o .idx recebe uma
+    entrada por INDEX_INTERVAL segundos. Uma captura existente continua a
+    ser acrescentada.
+    """
+
+    def __init__(self, path, index_interval=INDEX_INTERVAL):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.index_interval = index_interval
+        self._fd = os.open(self.path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        self.offset = os.fstat(self._fd).st_size
+        if self.offset == 0:
+            os.write(self._fd, FILE_HEADER.pack(MAGIC, VERSION))
+            self.offset = FILE_HEADER.size
+        else:
+            with open(self.path, "rb") as f:
+                _check_header(f.read(FILE_HEADER.size), self.path)
+        self._index_fd = os.open(index_path(self.path), os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        self._next_index = -math.inf
+        self.records = 0
+        self.bytes = 0
+
+    def record(self, kind, data=b"", stream=0, satellite=DEFAULT_SATELLITE, when=None):
+        """Acrescenta um registro com os bytes recebidos em `when` (epoch; agora se None)"""
+        if when is None:
+            when = time.time()
+        if when >= self._next_index:
+            # Só instantes crescentes entram no índice (o relógio pode voltar)
+            os.write(self._index_fd, np.array([(when, self.offset)], dtype=INDEX_DTYPE).tobytes())
+            self._next_index = when + self.index_interval
+        size = len(data)
+        os.write(self._fd, RECORD.pack(when, stream & 0xFFFFFFFF, satellite, kind, size) + bytes(data))
+        self.offset += RECORD.size + size
+        self.records += 1
+        self.bytes += size
+
+    def stats(self):
+        return {"path": str(self.path), "records": self.records, "bytes": self.bytes, "size": self.offset}
+
+    def close(self):
+        for fd in (self._fd, self._index_fd):
+            if fd is not None:
+                os.close(fd)
+        self._fd = self._index_fd = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _check_header(header, path):
+    if len(header) < FILE_HEADER.size:
+        raise ValueError(f"{path}: captura sem cabeçalho")
+    magic, version = FILE_HEADER.unpack(header)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"{path}: não é uma captura da GS (versão {VERSION})")
+
+
+class Record:
+    """Um registro da captura; `data` é uma fatia do mmap (válida até fechar o leitor)"""
+
+    __slots__ = ("offset", "time", "stream", "satellite", "kind", "data")
+
+    def __init__(self, offset, when, stream, satellite, kind, data):
+        self.offset = offset
+        self.time = when
+        self.stream = stream
+        self.satellite = satellite
+        self.kind = kind
+        self.data = data
+
+
+class CaptureReader:
+    """Leitura de uma captura mapeada em memória, com busca por instante"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            _check_header(f.read(FILE_HEADER.size), self.path)
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if hasattr(self._mmap, "madvise"):
+            # A reprodução percorre o arquivo em ordem
+            self._mmap.madvise(mmap.MADV_SEQUENTIAL)
+        self._view = memoryview(self._mmap)
+        self.size = len(self._mmap)
+        self.index = self._load_index()
+
+    def _load_index(self):
+        path = index_path(self.path)
+        try:
+            entries = os.path.getsize(path) // INDEX_DTYPE.itemsize
+        except OSError:
+            entries = None
+        if entries:
+            # Uma entrada parcial no fim (captura interrompida) fica de fora
+            return np.memmap(path, dtype=INDEX_DTYPE, mode="r", shape=(entries,))
+        return build_index(self)
+
+    def headers(self, offset=FILE_HEADER.size):
+        """(offset, instante, stream, satélite, tipo, tamanho) de cada registro a partir de `offset`"""
+        unpack = RECORD.unpack_from
+        mm, size = self._mmap, self.size
+        while offset + RECORD.size <= size:
+            when, stream, satellite, kind, length = unpack(mm, offset)
+            if offset + RECORD.size + length > size:
+                break
+            yield offset, when, stream, satellite, kind, length
+            offset += RECORD.size + length
+
+    def offset_at(self, when):
+        """Offset a partir do qual estão os registros de `when` em diante (aproximado pelo índice)"""
+        if when is None or not len(self.index):
+            return FILE_HEADER.size
+        position = int(np.searchsorted(self.index["time"], when, side="right")) - 1
+        return int(self.index["offset"][position]) if position >= 0 else FILE_HEADER.size
+
+    def records(self, start=None, end=None):
+        """Registros com instante em [start, end), a partir da entrada do índice de `start`"""
+        view = self._view
+        for offset, when, stream, satellite, kind, length in self.headers(self.offset_at(start)):
+            if start is not None and when < start:
+                continue
+            if end is not None and when >= end:
+                break
+            data_start = offset + RECORD.size
+            yield Record(offset, when, stream, satellite, kind, view[data_start:data_start + length])
+
+    def time_range(self):
+        """(primeiro, último) instante da captura, ou (None, None) se vazia"""
+        first = last = None
+        for _, when, _, _, _, _ in self.headers():
+            first = when
+            break
+        if first is not None:
+            for _, when, _, _, _, _ in self.headers(self.offset_at(math.inf)):
+                last = when
+        return first, last
+
+    def close(self):
+        try:
+            self._view.release()
+            self._mmap.close()
+        except BufferError:
+            # Ainda há registros em uso: o mapa é liberado pelo coletor de lixo
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def build_index(reader, interval=INDEX_INTERVAL):
+    """Índice de uma captura percorrendo os cabeçalhos dos registros"""
+    entries = []
+    next_index = -math.inf
+    for offset, when, _, _, _, _ in reader.headers():
+        if when >= next_index:
+            entries.append((when, offset))
+            next_index = when + interval
+    return np.array(entries, dtype=INDEX_DTYPE)
+
+
+def _discard(sock):
+    # Respostas do ingest (heartbeats, ACKs) são lidas e descartadas
+    try:
+        while sock.recv(65536):
+            pass
+    except OSError:
+        pass
+
+
+def _close(sock):
+    try:
+        sock.shutdown(socket.SHUT_WR)
+    except OSError:
+        pass
+    sock.close()
+
+
+def replay(reader, address, speed=1.0, start=None, end=None, satellites=None):
+    """Envia os registros de [start, end) ao ingest TCP, `speed` vezes mais rápido que a captura.
+
+    Cada stream capturado volta a ser uma conexão; um stream que começa no
+    meio (busca por instante) recebe antes o HELLO do seu satélite. Os
+    pacotes do QEMU seguem como MSG_TYPE_TELEMETRY_DATA. speed=math.inf
+    envia o mais rápido possível. Retorna um resumo do envio.
+    """
+    connections = {}
+    sent = records = skipped = 0
+    behind = 0.0
+    first = last = None
+    started = time.monotonic()
+    try:
+        for record in reader.records(start, end):
+            if satellites and record.satellite not in satellites:
+                continue
+            if first is None:
+                first = record.time
+            last = record.time
+            if speed != math.inf:
+                delay = started + (record.time - first) / speed - time.monotonic()
+                if delay > 0.001:
+                    time.sleep(delay)
+                else:
+                    behind = max(behind, -delay)
+
+            key = (record.kind == KIND_QEMU_HEX, record.stream)
+            if record.kind == KIND_CLOSE:
+                sock = connections.pop(key, None)
+                if sock is not None:
+                    _close(sock)
+                continue
+            data = record.data
+            if record.kind == KIND_QEMU_HEX:
+                try:
+                    packet = bytes.fromhex(bytes(data).decode("ascii"))
+                except ValueError:
+                    packet = b""
+                if len(packet) != protocol.TELEMETRY_PACKET.size:
+                    skipped += 1
+                    continue
+                data = protocol.encode_frame(protocol.MSG_TYPE_TELEMETRY_DATA, 0, packet)
+
+            sock = connections.get(key)
+            if sock is None:
+                sock = connections[key] = socket.create_connection(address)
+                threading.Thread(target=_discard, args=(sock,), daemon=True).start()
+                if record.kind != KIND_OPEN:
+                    sock.sendall(protocol.encode_hello(record.satellite))
+            sock.sendall(data)
+            records += 1
+            sent += len(data)
+    finally:
+        for sock in connections.values():
+            _close(sock)
+    return {"records": records, "bytes": sent, "skipped": skipped,
+            "elapsed": time.monotonic() - started, "span": 0.0 if first is None else last - first,
+            "max_behind": behind}
+
+
+def resolve_time(value, first):
+    """Instante de --from/--to: epoch, ISO 8601 ou +segundos desde `first`"""
+    if value is None or value == "":
+        return None
+    if value.startswith("+"):
+        return (first or 0.0) + float(value[1:])
+    return parse_time(value)
+
+
+def parse_speed(value):
+    """Fator de velocidade da reprodução ('max' = sem espera)"""
+    if value in ("max", "inf"):
+        return math.inf
+    speed = float(value)
+    if speed <= 0:
+        raise argparse.ArgumentTypeError("a velocidade deve ser positiva")
+    return speed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Capturas binárias do ingest e do QEMU")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_info = sub.add_parser("info", help="resume uma captura")
+    p_info.add_argument("path")
+
+    p_index = sub.add_parser("index", help="reconstrói o índice de tempo de uma captura")
+    p_index.add_argument("path")
+
+    p_replay = sub.add_parser("replay", help="reenvia uma captura ao ingest TCP")
+    p_replay.add_argument("path")
+    p_replay.add_argument("--ingest", default=DEFAULT_INGEST, help="host:porta do ingest TCP")
+    p_replay.add_argument("--speed", type=parse_speed, default=1.0,
+                          help="fator de velocidade (1 = tempo real, max = sem espera)")
+    p_replay.add_argument("--from", dest="start", help="início (epoch, ISO 8601 ou +segundos)")
+    p_replay.add_argument("--to", dest="end", help="fim (epoch, ISO 8601 ou +segundos)")
+    p_replay.add_argument("--satellite", type=int, action="append", help="só estes satélites")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "index":
+        with CaptureReader(args.path) as reader:
+            index = build_index(reader)
+        index.tofile(index_path(args.path))
+        print(f"Índice com {len(index)} entradas gravado em {index_path(args.path)}")
+        return 0
+
+    with CaptureReader(args.path) as reader:
+        first, last = reader.time_range()
+        if args.command == "info":
+            kinds, satellites, streams, records = {}, {}, set(), 0
+            for _, _, stream, satellite, kind, length in reader.headers():
+                name = KIND_NAMES.get(kind, str(kind))
+                kinds[name] = kinds.get(name, 0) + 1
+                satellites[satellite] = satellites.get(satellite, 0) + length
+                streams.add((kind == KIND_QEMU_HEX, stream))
+                records += 1
+            print(f"{args.path}: {reader.size:,} bytes, {records:,} registros, "
+                  f"{len(reader.index)} entradas no índice")
+            if first is not None:
+                print(f"  de {format_time(first)} a {format_time(last)} ({last - first:,.1f} s)")
+            print(f"  tipos: {kinds}")
+            print(f"  streams: {len(streams)}, bytes por satélite: {satellites}")
+            return 0
+
+        host, port = args.ingest.rsplit(":", 1)
+        start = resolve_time(args.start, first)
+        end = resolve_time(args.end, first)
+        summary = replay(reader, (host, int(port)), args.speed, start, end, args.satellite)
+    print(f"{summary['records']:,} registros ({summary['bytes']:,} bytes) reenviados a {args.ingest} "
+          f"em {summary['elapsed']:.2f} s ({summary['span']:,.1f} s capturados); "
+          f"{summary['skipped']} pacotes inválidos, "
+          f"atraso máximo {summary['max_behind'] * 1000:.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,132 @@
+# Inscrição dos clientes por canal de telemetria e faixa de taxa
+# /home/groundstation/projeto_final/GS/dashboard/channel_rooms.py
+#
+# Um cliente escolhe os canais que quer ("adcs.attitude", "thermal", ou um
+# subsistema inteiro como "power") e a taxa de cada um; a taxa é arredondada
+# para uma das RATE_TIERS e o cliente entra na sala "canal@taxa". A cada
+# período da faixa, o valor mais recente de cada canal alterado é
+# serializado uma única vez e entregue a cada membro da sala.
+#
+# O payload vai como bytes (JSON em UTF-8): o python-socketio envia bytes
+# como anexo binário sem codificá-los de novo para cada cliente.
+
+import json
+import time
+
+# Taxas disponíveis (Hz), da mais rápida para a mais lenta
+RATE_TIERS = (10.0, 1.0, 0.2)
+
+
+def room_name(channel, rate):
+    return f"{channel}@{rate:g}"
+
+
+def rate_tier(rate):
+    """Maior faixa que não excede a taxa pedida (a mais lenta, se nenhuma)"""
+    rate = float(rate)
+    if not rate > 0:
+        raise ValueError(f"Taxa inválida: {rate}")
+    for tier in RATE_TIERS:
+        if tier <= rate:
+            return tier
+    return RATE_TIERS[-1]
+
+
+class ChannelRooms:
+    """Salas por canal e faixa de taxa, com envio agrupado por período.
+
+    `send(sid, chave, evento, dados)` entrega a um cliente; a chave é o canal,
+    para a fila do cliente manter só o valor mais recente de cada um.
+    """
+
+    def __init__(self, channels, send):
+        self.channels = tuple(channels)
+        self.send = send
+        self.members = {}    # sala -> sids
+        self.clients = {}    # sid -> salas
+        self.latest = {}     # canal -> registro mais recente
+        self.pending = {tier: {} for tier in RATE_TIERS}  # alterados desde o último envio
+        self.next_flush = {tier: 0.0 for tier in RATE_TIERS}
+        self.sent = {}       # sala -> [envios, bytes]
+
+    def resolve(self, name):
+        """Canais correspondentes a um nome (canal exato ou subsistema)"""
+        matches = [c for c in self.channels if c == name or c.startswith(name + ".")]
+        if not matches:
+            raise ValueError(f"Canal desconhecido: {name}")
+        return matches
+
+    def subscribe(self, sid, requested):
+        """Troca as inscrições de um cliente; `requested` mapeia nome -> taxa (Hz)"""
+        rooms = {}
+        for name, rate in requested.items():
+            tier = rate_tier(rate)
+            for channel in self.resolve(name):
+                # Um canal pedido duas vezes fica com a maior taxa
+                rooms[channel] = max(tier, rooms.get(channel, 0))
+        wanted = {room_name(channel, tier) for channel, tier in rooms.items()}
+
+        current = self.clients.get(sid, set())
+        joined, left = wanted - current, current - wanted
+        for room in left:
+            self._leave(sid, room)
+        for room in joined:
+            self.members.setdefault(room, set()).add(sid)
+        self.clients[sid] = wanted
+
+        # Valor atual dos canais recém-inscritos, só para este cliente
+        for channel, tier in rooms.items():
+            if room_name(channel, tier) in joined and channel in self.latest:
+                self.send(sid, channel, 'channel_update', self._encode(channel, self.latest[channel]))
+
+    def _leave(self, sid, room):
+        members = self.members.get(room)
+        if members is not None:
+            members.discard(sid)
+            if not members:
+                del self.members[room]
+
+    def unsubscribe(self, sid):
+        """Remove o cliente de todas as salas"""
+        for room in self.clients.pop(sid, set()):
+            self._leave(sid, room)
+
+    def publish(self, channel, record):
+        """Registra o valor mais recente de um canal (o último vence até o próximo envio)"""
+        self.latest[channel] = record
+        for tier in RATE_TIERS:
+            if room_name(channel, tier) in self.members:
+                self.pending[tier][channel] = record
+
+    def _encode(self, channel, record):
+        return json.dumps({"channel": channel, "data": record}).encode("utf-8")
+
+    def flush(self, now=None):
+        """Envia as faixas cujo período venceu; retorna os segundos até o próximo"""
+        now = time.monotonic() if now is None else now
+        for tier in RATE_TIERS:
+            if now < self.next_flush[tier]:
+                continue
+            self.next_flush[tier] = now + 1.0 / tier
+            pending, self.pending[tier] = self.pending[tier], {}
+            for channel, record in pending.items():
+                members = self.members.get(room_name(channel, tier))
+                if not members:
+                    continue
+                payload = self._encode(channel, record)
+                for sid in members:
+                    self.send(sid, channel, 'channel_update', payload)
+                counters = self.sent.setdefault(room_name(channel, tier), [0, 0])
+                counters[0] += 1
+                counters[1] += len(payload)
+        return max(0.0, min(self.next_flush.values()) - now)
+
+    def stats(self):
+        return {
+            room: {
+                "clients": len(self.members.get(room, ())),
+                "emits": self.sent.get(room, [0, 0])[0],
+                "bytes": self.sent.get(room, [0, 0])[1]
+            }
+            for room in sorted(set(self.members) | set(self.sent))
+        }
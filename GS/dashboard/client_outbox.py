@@ -0,0 +1,133 @@
+# Filas de envio por cliente Socket.IO, com limite e coalescência
+# /home/groundstation/projeto_final/GS/dashboard/client_outbox.py
+#
+# Cada mensagem de telemetria vai para a fila do cliente com uma chave (o
+# canal ou o evento). Se já houver uma mensagem pendente com a mesma chave,
+# ela é substituída pela nova (o valor mais recente vence) ou combinada com
+# ela por uma função `merge`. A fila tem um número máximo de chaves; além
+# disso a mais antiga é descartada.
+#
+# Só MAX_IN_FLIGHT mensagens ficam sem confirmação ao mesmo tempo: o envio
+# usa o callback de ack do Socket.IO e a próxima mensagem sai quando o
+# cliente confirma a anterior. Um cliente lento acumula no máximo a fila
+# coalescida, sem encher os buffers do engine.io nem atrasar os demais.
+
+import time
+from collections import OrderedDict
+
+MAX_IN_FLIGHT = 4
+MAX_PENDING = 64
+# Sem ack da mensagem mais antiga por mais que isso, o cliente está travado
+STALL_TIMEOUT = 10.0
+
+
+class ClientOutbox:
+    """Fila de envio de um cliente"""
+
+    def __init__(self, sid, send, max_in_flight=MAX_IN_FLIGHT, max_pending=MAX_PENDING):
+        self.sid = sid
+        self.send = send
+        self.max_in_flight = max_in_flight
+        self.max_pending = max_pending
+        self.pending = OrderedDict()  # chave -> (evento, dados)
+        self.in_flight = OrderedDict()  # número do envio -> instante do envio
+        self.next_id = 0
+        self.sent = 0
+        self.acked = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self.last_ack_latency = None
+        self.stalled = False
+
+    def put(self, key, event, data, merge=None):
+        previous = self.pending.get(key)
+        if previous is not None:
+            self.coalesced += 1
+            if merge is not None:
+                # Combinada no lugar da primeira: telemetry_fields continua antes
+                # dos telemetry_frame já na fila que usam os ids novos
+                self.pending[key] = (event, merge(previous[1], data))
+                self.pump()
+                return
+            # Substituída: vai para o fim, depois das chaves de que depende
+            del self.pending[key]
+        elif len(self.pending) >= self.max_pending:
+            self.pending.popitem(last=False)
+            self.dropped += 1
+        self.pending[key] = (event, data)
+        self.pump()
+
+    def pump(self):
+        while self.pending and len(self.in_flight) < self.max_in_flight:
+            _, (event, data) = self.pending.popitem(last=False)
+            send_id = self.next_id
+            self.next_id += 1
+            self.in_flight[send_id] = time.monotonic()
+            self.sent += 1
+            self.send(self.sid, event, data, lambda *args, send_id=send_id: self.ack(send_id))
+
+    def ack(self, send_id):
+        sent_at = self.in_flight.pop(send_id, None)
+        if sent_at is None:
+            return
+        self.acked += 1
+        self.last_ack_latency = time.monotonic() - sent_at
+        self.stalled = False
+        self.pump()
+
+    def lag(self, now=None):
+        """Há quanto tempo a mensagem mais antiga aguarda confirmação"""
+        if not self.in_flight:
+            return 0.0
+        now = time.monotonic() if now is None else now
+        return now - next(iter(self.in_flight.values()))
+
+    def stats(self, now=None):
+        return {
+            "pending": len(self.pending),
+            "in_flight": len(self.in_flight),
+            "lag": round(self.lag(now), 3),
+            "stalled": self.stalled,
+            "sent": self.sent,
+            "acked": self.acked,
+            "coalesced": self.coalesced,
+            "dropped": self.dropped,
+            "ack_latency": self.last_ack_latency
+        }
+
+
+class ClientOutboxes:
+    """Filas de todos os clientes.
+
+    `send(sid, evento, dados, callback)` envia uma mensagem e chama `callback`
+    quando o cliente a confirmar (ex.: socketio.emit com to=sid e callback).
+    """
+
+    def __init__(self, send, stall_timeout=STALL_TIMEOUT, **options):
+        self.send = send
+        self.stall_timeout = stall_timeout
+        self.options = options
+        self.outboxes = {}
+
+    def put(self, sid, key, event, data, merge=None):
+        outbox = self.outboxes.get(sid)
+        if outbox is None:
+            outbox = self.outboxes[sid] = ClientOutbox(sid, self.send, **self.options)
+        outbox.put(key, event, data, merge)
+
+    def remove(self, sid):
+        self.outboxes.pop(sid, None)
+
+    def check(self, now=None):
+        """Marca os clientes travados; retorna os que travaram desde a última verificação"""
+        now = time.monotonic() if now is None else now
+        stalled = []
+        for sid, outbox in self.outboxes.items():
+            if not outbox.stalled and outbox.lag(now) > self.stall_timeout:
+                outbox.stalled = True
+                stalled.append(sid)
+        return stalled
+
+    def stats(self):
+        now = time.monotonic()
+        return {sid: outbox.stats(now) for sid, outbox in self.outboxes.items()}
@@ -0,0 +1,289 @@
+# Envio de telecomandos aos satélites (docs/communication_protocol.md §4.3)
+# /home/groundstation/projeto_final/GS/dashboard/command_uplink.py
+#
+# Os comandos viram mensagens MessageHeader com FLAG_REQUIRES_ACK e são
+# enviados pela conexão do satélite no serviço de ingest. Até WINDOW_SIZE
+# comandos ficam aguardando ACK ao mesmo tempo (janela deslizante); os
+# demais esperam na fila. Sem ACK em ACK_TIMEOUT segundos o comando é
+# reenviado, até MAX_RETRIES vezes, e depois falha com ERR_TIMEOUT.
+#
+# O ACK do firmware traz só o tipo da mensagem confirmada e o ERROR só o
+# código de erro, sem número de sequência. Como o satélite responde na
+# ordem em que recebe (uma conexão TCP), o ACK confirma o comando mais
+# antigo da janela com aquele tipo, e um ERROR logo após um ACK se refere
+# ao comando recém-confirmado. Os números de sequência (ids) são da GS.
+#
+# Um plano de comandos é dividido em lotes MSG_TYPE_CMD_BATCH (vários
+# comandos, cada um com um tick de execução opcional, numa só mensagem);
+# todos os lotes entram na janela juntos, e o plano sobe num único RTT.
+#
+# Os timeouts usam uma timer wheel: agendar e cancelar são O(1) e o loop
+# avança um slot a cada TICK, sem um timer do asyncio por comando.
+#
+# Tudo aqui executa no loop asyncio do ingest; resultados vão ao callback
+# `on_result(comando, status)`.
+
+import itertools
+import time
+from collections import deque
+
+import protocol
+
+WINDOW_SIZE = 8
+ACK_TIMEOUT = 5.0
+MAX_RETRIES = 3
+
+TICK = 0.1
+WHEEL_SLOTS = 64
+
+# Limites (ms) dos baldes do histograma de tempo até o ACK
+RTT_BUCKETS = (50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+# Tamanho máximo de um lote (docs/communication_protocol.md §3.3)
+MAX_BATCH_PAYLOAD = 256 - protocol.HEADER_SIZE
+MAX_BATCH_COMMANDS = 255
+
+_command_ids = itertools.count(1)
+
+
+def encode_command(data):
+    """Comando do dashboard ({'type', 'parameters'}) -> (nome, tipo de mensagem, dados)"""
+    name = str(data.get("type", "")).upper()
+    params = data.get("parameters") or {}
+    if name == "ADCS":
+        try:
+            angles = [float(params.get(axis, 0) or 0) for axis in ("roll", "pitch", "yaw")]
+        except (TypeError, ValueError, AttributeError):
+            raise ValueError("Parâmetros ADCS inválidos")
+        return name, protocol.MSG_TYPE_ADCS_CMD, protocol.ADCS_COMMAND.pack(*angles)
+    if name == "TELEMETRY":
+        return name, protocol.MSG_TYPE_TELEMETRY_REQ, b""
+    raise ValueError(f"Comando não suportado pelo protocolo: {name or data.get('type')}")
+
+
+def plan_batches(plan):
+    """Divide um plano em lotes, na ordem do plano.
+
+    Cada item é um comando do dashboard com `exec_tick` opcional (tick do
+    satélite; 0 ou ausente = imediato). Retorna [(índices no plano, dados do lote)].
+    """
+    if not isinstance(plan, list) or not plan:
+        raise ValueError("Plano de comandos vazio")
+    batches = []
+    indices, entries, size = [], [], protocol.COMMAND_BATCH_HEADER.size
+    for index, item in enumerate(plan):
+        if not isinstance(item, dict):
+            raise ValueError(f"Comando {index} do plano inválido")
+        _, msg_type, params = encode_command(item)
+        try:
+            exec_tick = int(item.get("exec_tick") or 0)
+        except (TypeError, ValueError):
+            raise ValueError(f"exec_tick inválido no comando {index}")
+        if not 0 <= exec_tick < 2 ** 32:
+            raise ValueError(f"exec_tick fora do intervalo no comando {index}")
+        entry_size = protocol.COMMAND_BATCH_ENTRY.size + len(params)
+        if entries and (size + entry_size > MAX_BATCH_PAYLOAD or len(entries) == MAX_BATCH_COMMANDS):
+            batches.append((indices, protocol.encode_command_batch(entries)))
+            indices, entries, size = [], [], protocol.COMMAND_BATCH_HEADER.size
+        indices.append(index)
+        entries.append((msg_type, exec_tick, params))
+        size += entry_size
+    batches.append((indices, protocol.encode_command_batch(entries)))
+    return batches
+
+
+class TimerWheel:
+    """Timer wheel de um nível: slots de `tick` segundos, com voltas para atrasos longos"""
+
+    def __init__(self, tick=TICK, slots=WHEEL_SLOTS):
+        self.tick = tick
+        self.slots = [[] for _ in range(slots)]
+        self.cursor = 0
+
+    def schedule(self, delay, callback):
+        """Agenda `callback` para daqui a `delay` segundos; retorna o timer"""
+        ticks = max(1, round(delay / self.tick))
+        rounds, offset = divmod(ticks - 1, len(self.slots))
+        timer = [rounds, callback]
+        self.slots[(self.cursor + offset) % len(self.slots)].append(timer)
+        return timer
+
+    @staticmethod
+    def cancel(timer):
+        if timer is not None:
+            timer[1] = None
+
+    def advance(self):
+        """Processa o slot atual e avança um tick"""
+        slot = self.slots[self.cursor]
+        self.slots[self.cursor] = waiting = []
+        self.cursor = (self.cursor + 1) % len(self.slots)
+        due = []
+        for timer in slot:
+            if timer[1] is None:
+                continue
+            if timer[0] > 0:
+                timer[0] -= 1
+                waiting.append(timer)
+            else:
+                due.append(timer[1])
+        for callback in due:
+            callback()
+
+
+class Command:
+    __slots__ = ("id", "sid", "name", "msg_type", "frame", "attempts",
+                 "submitted", "sent_at", "timer", "peer", "plan_indices")
+
+    def __init__(self, sid, name, msg_type, payload, plan_indices=None):
+        self.id = next(_command_ids)
+        # Lotes: índices, no plano do cliente, dos comandos contidos
+        self.plan_indices = plan_indices
+        self.sid = sid
+        self.name = name
+        self.msg_type = msg_type
+        self.frame = protocol.encode_frame(msg_type, protocol.FLAG_REQUIRES_ACK, payload)
+        self.attempts = 0
+        self.submitted = time.monotonic()
+        self.sent_at = None
+        self.timer = None
+        self.peer = None
+
+
+class _Link:
+    """Conexão com um satélite e os seus comandos aguardando ACK"""
+
+    def __init__(self, writer):
+        self.writer = writer
+        self.in_flight = []
+        self.last_acked = None  # Comando confirmado pela última mensagem recebida
+
+
+class CommandUplink:
+    def __init__(self, on_result, window=WINDOW_SIZE, timeout=ACK_TIMEOUT,
+                 retries=MAX_RETRIES, wheel=None):
+        self.on_result = on_result
+        self.window = window
+        self.timeout = timeout
+        self.retries = retries
+        self.wheel = wheel or TimerWheel()
+        self.links = {}
+        self.pending = deque()
+        self.counts = {"submitted": 0, "sent": 0, "retransmitted": 0,
+                       "acked": 0, "error": 0, "timeout": 0}
+        self.rtt = {}  # nome do comando -> contagens por balde (+ acima do último)
+
+    def attach(self, peer, writer):
+        self.links[peer] = _Link(writer)
+        self._fill(peer)
+
+    def detach(self, peer):
+        """Conexão perdida: os comandos da janela voltam ao início da fila"""
+        link = self.links.pop(peer, None)
+        if link is None:
+            return
+        for command in reversed(link.in_flight):
+            self.wheel.cancel(command.timer)
+            command.timer = None
+            self.pending.appendleft(command)
+        if link.in_flight:
+            print(f"Conexão com {peer} perdida: {len(link.in_flight)} comando(s) de volta à fila")
+        for other in list(self.links):
+            self._fill(other)
+
+    def submit(self, command):
+        self.counts["submitted"] += 1
+        self.pending.append(command)
+        for peer in list(self.links):
+            self._fill(peer)
+            if not self.pending:
+                break
+
+    def _fill(self, peer):
+        link = self.links[peer]
+        while self.pending and len(link.in_flight) < self.window:
+            command = self.pending.popleft()
+            command.peer = peer
+            link.in_flight.append(command)
+            self._transmit(link, command)
+
+    def _transmit(self, link, command):
+        command.attempts += 1
+        command.sent_at = time.monotonic()
+        link.writer.write(command.frame)
+        if command.attempts == 1:
+            self.counts["sent"] += 1
+            self.on_result(command, {"status": "sent"})
+        else:
+            self.counts["retransmitted"] += 1
+            self.on_result(command, {"status": "retransmitted", "attempt": command.attempts})
+        command.timer = self.wheel.schedule(self.timeout, lambda: self._expired(command))
+
+    def _expired(self, command):
+        link = self.links.get(command.peer)
+        if link is None or command not in link.in_flight:
+            return
+        if command.attempts > self.retries:
+            link.in_flight.remove(command)
+            self.counts["timeout"] += 1
+            self.on_result(command, {"status": "timeout", "error": protocol.ERR_TIMEOUT,
+                                     "attempts": command.attempts})
+            self._fill(command.peer)
+        else:
+            self._transmit(link, command)
+
+    def handle_reply(self, peer, frame):
+        """ACK/ERROR recebido de um satélite; outros tipos limpam a correlação"""
+        link = self.links.get(peer)
+        if link is None:
+            return
+        if frame.type == protocol.MSG_TYPE_ACK and len(frame.payload):
+            acked_type = frame.payload[0]
+            for command in link.in_flight:
+                if command.msg_type == acked_type:
+                    link.in_flight.remove(command)
+                    self.wheel.cancel(command.timer)
+                    link.last_acked = command
+                    self._acked(command)
+                    self._fill(peer)
+                    return
+            link.last_acked = None
+        elif frame.type == protocol.MSG_TYPE_ERROR:
+            command = link.last_acked
+            if command is None and link.in_flight:
+                # ERROR sem ACK antes: atribuído ao comando mais antigo da janela
+                command = link.in_flight.pop(0)
+                self.wheel.cancel(command.timer)
+                self._fill(peer)
+            link.last_acked = None
+            if command is not None:
+                self.counts["error"] += 1
+                code = frame.payload[0] if len(frame.payload) else None
+                self.on_result(command, {"status": "error", "error": code})
+        else:
+            link.last_acked = None
+
+    def _acked(self, command):
+        now = time.monotonic()
+        rtt_ms = (now - command.sent_at) * 1000
+        buckets = self.rtt.setdefault(command.name, [0] * (len(RTT_BUCKETS) + 1))
+        for i, limit in enumerate(RTT_BUCKETS):
+            if rtt_ms <= limit:
+                buckets[i] += 1
+                break
+        else:
+            buckets[-1] += 1
+        self.counts["acked"] += 1
+        self.on_result(command, {"status": "acked", "rtt_ms": round(rtt_ms, 1),
+                                 "total_ms": round((now - command.submitted) * 1000, 1),
+                                 "attempts": command.attempts})
+
+    def stats(self):
+        labels = [f"le_{limit}" for limit in RTT_BUCKETS] + ["inf"]
+        return {
+            "pending": len(self.pending),
+            "in_flight": {str(peer): len(link.in_flight) for peer, link in list(self.links.items())},
+            "window": self.window,
+            "counts": dict(self.counts),
+            "rtt_ms": {name: dict(zip(labels, buckets)) for name, buckets in list(self.rtt.items())}
+        }
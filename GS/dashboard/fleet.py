@@ -0,0 +1,92 @@
+# Constelação de satélites: identificadores e namespaces de cada um
+# /home/groundstation/projeto_final/GS/dashboard/fleet.py
+#
+# Cada satélite é identificado por um número (1-65535) anunciado pela
+# mensagem MSG_TYPE_HELLO no início da conexão com o ingest; conexões sem
+# identificação (o firmware atual) são do DEFAULT_SATELLITE. Os logs do
+# satélite padrão continuam na raiz de LOGS_DIR, onde os envios por SSH os
+# gravam; os dos demais ficam em LOGS_DIR/satellites/<id>/, com as mesmas
+# categorias e streams.
+#
+# Fleet guarda o contexto de cada satélite conhecido (armazenamento, estado,
+# clientes), criado no primeiro uso.
+
+import threading
+from pathlib import Path
+
+DEFAULT_SATELLITE = 1
+MAX_SATELLITE = 0xFFFF
+FLEET_DIR = "satellites"
+
+
+def parse_satellite(value, default=DEFAULT_SATELLITE):
+    """Identificador de satélite de um parâmetro (ausente ou vazio = `default`)"""
+    if value is None or value == "":
+        return default
+    satellite = int(value)
+    if not 1 <= satellite <= MAX_SATELLITE:
+        raise ValueError(f"Satélite inválido: {value}")
+    return satellite
+
+
+def satellite_logs_dir(logs_dir, satellite):
+    """Diretório de logs de um satélite"""
+    if satellite == DEFAULT_SATELLITE:
+        return Path(logs_dir)
+    return Path(logs_dir) / FLEET_DIR / str(satellite)
+
+
+def list_satellites(logs_dir):
+    """Satélites com logs em `logs_dir` (o padrão sempre está na lista)"""
+    satellites = {DEFAULT_SATELLITE}
+    fleet_dir = Path(logs_dir) / FLEET_DIR
+    if fleet_dir.is_dir():
+        for entry in fleet_dir.iterdir():
+            if entry.is_dir() and entry.name.isdigit():
+                try:
+                    satellites.add(parse_satellite(entry.name))
+                except ValueError:
+                    pass
+    return sorted(satellites)
+
+
+def satellite_room(satellite):
+    """Sala Socket.IO dos clientes que acompanham um satélite"""
+    return f"satellite:{satellite}"
+
+
+def shard_of(satellite, shards):
+    """Shard do ingest que processa um satélite (sempre o mesmo)"""
+    return satellite % shards
+
+
+class Fleet:
+    """Contextos dos satélites conhecidos, criados por `create(satélite)` no primeiro uso"""
+
+    def __init__(self, create):
+        self.create = create
+        self._satellites = {}
+        self._lock = threading.Lock()
+
+    def get(self, satellite):
+        """Contexto de um satélite, criado se ainda não existir (qualquer thread)"""
+        context = self._satellites.get(satellite)
+        if context is None:
+            with self._lock:
+                context = self._satellites.get(satellite)
+                if context is None:
+                    context = self._satellites[satellite] = self.create(satellite)
+        return context
+
+    def find(self, satellite):
+        """Contexto de um satélite já conhecido, senão None"""
+        return self._satellites.get(satellite)
+
+    def ids(self):
+        return sorted(self._satellites)
+
+    def __iter__(self):
+        return iter([self._satellites[satellite] for satellite in self.ids()])
+
+    def __len__(self):
+        return len(self._satellites)
@@ -0,0 +1,311 @@
+# Armazenamento em memória (hot tier) dos registros recentes de cada stream
+# /home/groundstation/projeto_final/GS/dashboard/hot_store.py
+#
+# Cada stream (categoria/arquivo) guarda as últimas amostras em arrays NumPy
+# pré-alocados: uma coluna de timestamps (epoch, float64) e uma coluna por
+# campo (float64 para números, objeto para os demais). O número de linhas
+# vem de um orçamento de memória por stream.
+#
+# As colunas têm uma folga de 1/4 da capacidade: as linhas são escritas em
+# sequência e, quando a folga acaba, as `capacity` mais recentes são copiadas
+# para o início. O append continua O(1) amortizado e qualquer janela é uma
+# fatia contígua, entregue como view sem cópia.
+#
+# O store é escrito e consultado pelas threads do worker_pool: as operações
+# em memória ficam sob `lock` (curto) e toda leitura do disco (carregamento
+# inicial, lacunas) acontece fora dele. Consultas longas trabalham sobre uma
+# cópia da janela (`snapshot`), sem segurar o lock. O hub só usa `version`
+# e `stats`, que não tomam o lock.
+
+import threading
+
+import numpy as np
+
+import segment_log
+from rollups import format_time, record_time
+
+DEFAULT_CHANNEL_BUDGET = 1024 * 1024  # 1 MiB por stream
+
+# Orçamentos maiores para streams de alta taxa (ADCS a 10 Hz)
+CHANNEL_BUDGETS = {
+    ("adcs", "attitude.json"): 8 * 1024 * 1024,
+}
+
+
+def flatten(record, prefix=""):
+    """Folhas de um registro como (caminho.com.pontos, valor), sem o timestamp"""
+    for key, value in record.items():
+        if not prefix and key == "timestamp":
+            continue
+        if isinstance(value, dict):
+            yield from flatten(value, f"{prefix}{key}.")
+        else:
+            yield prefix + key, value
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+class ChannelRing:
+    """Últimas amostras de um stream em colunas NumPy.
+
+    Views retornadas por `window` continuam válidas só até o próximo append.
+    """
+
+    def __init__(self, budget_bytes):
+        self.budget_bytes = budget_bytes
+        self.capacity = 0
+        self.start = 0  # Primeira linha válida
+        self.end = 0    # Próxima linha a escrever
+        self.times = None
+        self.columns = {}
+        # Colunas numéricas que até agora só receberam inteiros
+        self.integer = set()
+        self.last_time = None
+        # Quantas amostras já foram descartadas por falta de espaço
+        self.dropped = 0
+        # (amostras já recebidas, timestamp da última), trocado de uma vez a
+        # cada append: pode ser lido sem o lock
+        self.version = (0, None)
+
+    def _allocate(self, fields):
+        # Capacidade pelo orçamento: timestamp + colunas, com a folga de 1/4
+        row_bytes = 8 + 8 * len(fields)
+        self.capacity = max(16, int(self.budget_bytes / (row_bytes * 1.25)))
+        self._length = self.capacity + self.capacity // 4
+        self.times = np.empty(self._length, dtype=np.float64)
+
+    def _column(self, field, value):
+        column = self.columns.get(field)
+        if column is None:
+            if _is_number(value):
+                column = np.full(self._length, np.nan)
+                if isinstance(value, int):
+                    self.integer.add(field)
+            else:
+                column = np.empty(self._length, dtype=object)
+            self.columns[field] = column
+        elif column.dtype != object and not _is_number(value):
+            # Campo que deixou de ser numérico: passa a coluna de objetos
+            column = self.columns[field] = column.astype(object)
+            column[np.isnan(column.astype(np.float64))] = None
+        return column
+
+    def _compact(self):
+        keep = self.end - self.start
+        for array in (self.times, *self.columns.values()):
+            array[:keep] = array[self.start:self.end]
+        self.start, self.end = 0, keep
+
+    def append(self, epoch, record):
+        """Acrescenta uma amostra; ignora as que não são mais recentes que a última"""
+        if self.last_time is not None and epoch <= self.last_time:
+            return False
+        fields = list(flatten(record))
+        if self.times is None:
+            self._allocate(fields)
+        if self.end == self._length:
+            self._compact()
+
+        row = self.end
+        self.times[row] = epoch
+        for column in self.columns.values():
+            column[row] = np.nan if column.dtype != object else None
+        for field, value in fields:
+            self._column(field, value)[row] = value
+            if field in self.integer and not isinstance(value, int):
+                self.integer.discard(field)
+        self.end += 1
+        if self.end - self.start > self.capacity:
+            self.start += 1
+            self.dropped += 1
+        self.last_time = epoch
+        self.version = (self.end - self.start + self.dropped, epoch)
+        return True
+
+    def __len__(self):
+        return self.end - self.start
+
+    def oldest(self):
+        return self.times[self.start] if len(self) else None
+
+    def span(self, start=None, end=None):
+        """Linhas [i, j) com start <= timestamp <= end"""
+        times = self.times[self.start:self.end] if self.times is not None else np.empty(0)
+        i = 0 if start is None else int(np.searchsorted(times, start))
+        j = len(times) if end is None else int(np.searchsorted(times, end, side="right"))
+        return self.start + i, self.start + j
+
+    def window(self, start=None, end=None):
+        """Views (sem cópia) dos timestamps e das colunas no intervalo"""
+        i, j = self.span(start, end)
+        if self.times is None:
+            return np.empty(0), {}
+        return self.times[i:j], {field: column[i:j] for field, column in self.columns.items()}
+
+    def window_copy(self, start=None, end=None):
+        """Anel só com as linhas do intervalo, copiadas (não muda com os appends seguintes)"""
+        i, j = self.span(start, end)
+        copy = ChannelRing(self.budget_bytes)
+        copy.capacity = copy._length = copy.end = j - i
+        copy.times = self.times[i:j].copy() if self.times is not None else np.empty(0)
+        copy.columns = {field: column[i:j].copy() for field, column in self.columns.items()}
+        copy.integer = set(self.integer)
+        copy.last_time = self.last_time
+        copy.dropped = self.dropped
+        return copy
+
+    def rows(self, indices):
+        """Reconstrói os registros das linhas indicadas"""
+        records = []
+        columns = [(field.split("."), column, column.dtype == object, field in self.integer)
+                   for field, column in self.columns.items()]
+        for i in indices:
+            record = {"timestamp": format_time(float(self.times[i]))}
+            for keys, column, is_object, is_integer in columns:
+                value = column[i]
+                if is_object:
+                    if value is None:
+                        continue
+                elif np.isnan(value):
+                    continue
+                else:
+                    value = int(value) if is_integer else float(value)
+                node = record
+                for key in keys[:-1]:
+                    node = node.setdefault(key, {})
+                node[keys[-1]] = value
+            records.append(record)
+        return records
+
+    def nbytes(self):
+        if self.times is None:
+            return 0
+        return self.times.nbytes + sum(column.nbytes for column in list(self.columns.values()))
+
+
+class HotStore:
+    """Hot tier de todos os streams, carregado do disco no primeiro acesso.
+
+    Depois do carregamento inicial, leituras (`latest`, `tail`, `window`) não
+    acessam o sistema de arquivos.
+    """
+
+    def __init__(self, logs_dir, default_budget=DEFAULT_CHANNEL_BUDGET, budgets=None):
+        self.logs_dir = logs_dir
+        self.default_budget = default_budget
+        self.budgets = dict(CHANNEL_BUDGETS if budgets is None else budgets)
+        self._channels = {}
+        self.lock = threading.RLock()
+
+    def channel(self, category, filename):
+        key = (category, filename)
+        ring = self._channels.get(key)
+        if ring is None:
+            # Leitura do disco fora do lock; se outra thread carregou o mesmo
+            # stream enquanto isso, fica o anel dela
+            loaded = ChannelRing(self.budgets.get(key, self.default_budget))
+            for record in segment_log.iter_records(self.logs_dir, category, filename):
+                self._append(loaded, record)
+            with self.lock:
+                ring = self._channels.setdefault(key, loaded)
+        return ring
+
+    def _append(self, ring, record):
+        if not isinstance(record, dict):
+            return False
+        epoch = record_time(record)
+        return epoch is not None and ring.append(epoch, record)
+
+    def append(self, category, filename, record):
+        """Acrescenta um registro recém-chegado; False se já estava no store"""
+        ring = self.channel(category, filename)
+        with self.lock:
+            return self._append(ring, record)
+
+    def extend(self, category, filename, recent):
+        """Acrescenta os registros novos de `recent` (os últimos do stream).
+
+        Se todos forem novos pode haver uma lacuna desde a última atualização:
+        o que faltou é lido do disco. Retorna a lista de registros acrescentados.
+        """
+        key = (category, filename)
+        if key not in self._channels:
+            self.channel(category, filename)
+            return [r for r in recent[-1:] if isinstance(r, dict)]
+        ring = self._channels[key]
+        with self.lock:
+            last_time = ring.last_time
+        if recent and last_time is not None:
+            first = record_time(recent[0]) if isinstance(recent[0], dict) else None
+            if first is not None and first > last_time:
+                # Lacuna lida do disco fora do lock; o que chegar nesse meio
+                # tempo é descartado pelo append (não é mais recente)
+                recent = list(segment_log.iter_range(self.logs_dir, category, filename,
+                                                     start=format_time(last_time)))
+        with self.lock:
+            return [record for record in recent if self._append(ring, record)]
+
+    def latest(self, category, filename):
+        ring = self.channel(category, filename)
+        with self.lock:
+            return ring.rows([ring.end - 1])[0] if len(ring) else None
+
+    def tail(self, category, filename, limit):
+        ring = self.channel(category, filename)
+        if limit <= 0:
+            return []
+        with self.lock:
+            return ring.rows(range(max(ring.start, ring.end - limit), ring.end))
+
+    def since(self, category, filename, after=None, limit=100):
+        """Registros com timestamp posterior a `after` (epoch) e o novo cursor.
+
+        Se houver mais de `limit`, vêm só os mais recentes. O cursor é o
+        timestamp do último registro (ou `after`, se não houver nenhum novo).
+        """
+        ring = self.channel(category, filename)
+        with self.lock:
+            i = ring.start
+            if after is not None and ring.times is not None:
+                i += int(np.searchsorted(ring.times[ring.start:ring.end], after, side="right"))
+            i = max(i, ring.end - limit)
+            if i >= ring.end:
+                return [], after
+            return ring.rows(range(i, ring.end)), float(ring.times[ring.end - 1])
+
+    def version(self, category, filename):
+        """(amostras já recebidas, timestamp da última) de um stream carregado, senão None.
+
+        Não toma o lock nem lê o disco: pode ser chamado no hub.
+        """
+        ring = self._channels.get((category, filename))
+        return None if ring is None else ring.version
+
+    def snapshot(self, category, filename, start=None, end=None):
+        """Cópia das amostras de `start` a `end`, para consultas fora do lock"""
+        ring = self.channel(category, filename)
+        with self.lock:
+            return ring.window_copy(start, end)
+
+    def covers(self, category, filename, start):
+        """Indica se o store tem todas as amostras a partir de `start`"""
+        ring = self.channel(category, filename)
+        # Sem descartes, nada anterior à amostra mais antiga existe em disco
+        with self.lock:
+            return ring.dropped == 0 or (len(ring) > 0 and start >= ring.oldest())
+
+    def stats(self):
+        """Contadores por stream; sem o lock (pode ser chamado no hub)"""
+        channels = list(self._channels.items())
+        return {
+            f"{category}/{filename}": {
+                "samples": len(ring),
+                "capacity": ring.capacity,
+                "fields": len(ring.columns),
+                "bytes": ring.nbytes(),
+                "dropped": ring.dropped
+            }
+            for (category, filename), ring in channels
+        }
@@ -0,0 +1,47 @@
+# Passagem de itens de threads do sistema para o hub do eventlet
+# /home/groundstation/projeto_final/GS/dashboard/hub_bridge.py
+#
+# O hub do eventlet não é thread-safe: uma thread comum (p.ex. o loop asyncio
+# do serviço de ingest) não pode chamar socketio.emit diretamente. Os itens
+# vão para uma deque e um byte é escrito num pipe; a greenlet consumidora
+# espera no descritor de leitura do pipe sem polling.
+
+import os
+from collections import deque
+
+
+class HubQueue:
+    """Fila thread -> hub, com um pipe para acordar o consumidor"""
+
+    def __init__(self):
+        self._items = deque()
+        self._rfd, self._wfd = os.pipe()
+        os.set_blocking(self._rfd, False)
+        os.set_blocking(self._wfd, False)
+
+    def fileno(self):
+        return self._rfd
+
+    def put(self, item):
+        """Enfileira um item (pode ser chamado de qualquer thread)"""
+        self._items.append(item)
+        try:
+            os.write(self._wfd, b"\0")
+        except BlockingIOError:
+            # Pipe cheio: o consumidor já tem um aviso pendente
+            pass
+
+    def drain(self):
+        """Retira todos os itens pendentes (chamado pelo consumidor)"""
+        try:
+            while os.read(self._rfd, 4096):
+                pass
+        except BlockingIOError:
+            pass
+        items = []
+        while self._items:
+            items.append(self._items.popleft())
+        return items
+
+    def __len__(self):
+        return len(self._items)
@@ -0,0 +1,488 @@
+# Serviço de ingest TCP da Ground Station (porta 5000, protocolo MessageHeader)
+# /home/groundstation/projeto_final/GS/dashboard/ingest_server.py
+#
+# Aceita conexões de vários satélites. Cada conexão pertence ao satélite
+# anunciado pela mensagem MSG_TYPE_HELLO inicial (fleet.DEFAULT_SATELLITE
+# sem ela). O stream da conexão passa por um StreamProcessor, que decodifica
+# as mensagens, deriva os registros de log da telemetria (derive_telemetry)
+# e os grava no log segmentado do satélite; a thread do ingest aplica o
+# resultado de cada leitura: responde heartbeats, ACKs e erros, atualiza o
+# enlace do satélite e entrega a telemetria ao callback
+# `on_telemetry(satélite, peer, registros, trace)`, onde registros é a lista
+# de (categoria, arquivo, entrada já gravada) e trace é o Trace da amostra
+# (latency_trace; None sem tracer). Os telecomandos (command_uplink) saem
+# pelas mesmas conexões, com uma fila por satélite.
+#
+# Sem shards o StreamProcessor roda na própria thread do ingest; com um
+# ingest_shards.ShardPool ele roda nos processos dos shards, e a thread do
+# ingest só lê os sockets e aplica os resultados.
+#
+# Com um capture.CaptureWriter, cada leitura de cada conexão é gravada como
+# chegou, antes de qualquer decodificação, para ser reproduzida depois
+# (python3 capture.py replay).
+#
+# Roda num loop asyncio em uma thread própria, para não disputar o hub do
+# eventlet com o dashboard.
+
+import asyncio
+import itertools
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from time import perf_counter
+
+import metrics
+import protocol
+import segment_log
+from capture import KIND_CLOSE, KIND_DATA, KIND_OPEN
+from command_uplink import Command, CommandUplink, TimerWheel, encode_command, plan_batches
+from fleet import DEFAULT_SATELLITE, satellite_logs_dir
+from segment_log import SegmentLogWriter
+
+# A derivação dos canais é a mesma usada pelo processador da saída do QEMU
+SATELLITE_DIR = Path(__file__).resolve().parents[2] / "satellite"
+if str(SATELLITE_DIR) not in sys.path:
+    sys.path.append(str(SATELLITE_DIR))
+from process_qemu_output import derive_telemetry  # noqa: E402
+
+INGEST_HOST = "0.0.0.0"
+INGEST_PORT = 5000
+
+FRAME_DECODE_SECONDS = metrics.Histogram(
+    "gs_frame_decode_seconds",
+    "Decodificação no ingest: mensagens de uma leitura do socket (stream) ou payload TelemetryData (telemetry)",
+    ("step",))
+DERIVE_SECONDS = metrics.Histogram(
+    "gs_telemetry_derive_seconds", "Derivação dos registros de log de uma amostra (telemetry_records)")
+PERSIST_SECONDS = metrics.Histogram(
+    "gs_log_persist_seconds", "Gravação de um registro do ingest no log segmentado")
+FRAMES_TOTAL = metrics.Counter(
+    "gs_ingest_frames_total", "Mensagens recebidas pelo ingest, por tipo (invalid = CRC inválido)", ("type",))
+INGEST_BYTES_TOTAL = metrics.Counter("gs_ingest_bytes_total", "Bytes recebidos pelo ingest")
+DECODE_STREAM = FRAME_DECODE_SECONDS.labels("stream")
+DECODE_TELEMETRY = FRAME_DECODE_SECONDS.labels("telemetry")
+
+# Respostas dos telecomandos, repassadas ao uplink com os dados
+UPLINK_REPLIES = (protocol.MSG_TYPE_ACK, protocol.MSG_TYPE_ERROR)
+
+
+def telemetry_records(sample):
+    """Registros de log (categoria, arquivo, dados) de uma amostra decodificada"""
+    records = derive_telemetry(sample["timestamp"], sample["temperature"], sample["power"],
+                               sample["battery"], sample["adcs_status"])
+    if "attitude" in sample:
+        # TelemetryData traz a atitude medida: substitui a derivada
+        for category, filename, data in records:
+            if (category, filename) == ("adcs", "attitude.json"):
+                data.update(sample["attitude"])
+    return records
+
+
+def identify(data):
+    """Satélite anunciado no início do stream de uma conexão.
+
+    Retorna (satélite, flags do HELLO, bytes consumidos), ou None se ainda
+    faltam bytes para decidir. Sem um HELLO válido no início, o stream é do
+    satélite padrão e nada é consumido.
+    """
+    prefix = protocol.SYNC + bytes((protocol.MSG_TYPE_HELLO,))
+    head = bytes(data[:len(prefix)])
+    if head != prefix[:len(head)]:
+        return DEFAULT_SATELLITE, None, 0
+    if len(data) < protocol.HEADER_SIZE:
+        return None
+    _s1, _s2, _type, flags, length, checksum = protocol.HEADER.unpack_from(data)
+    if length != protocol.HELLO.size:
+        return DEFAULT_SATELLITE, None, 0
+    end = protocol.HEADER_SIZE + length
+    if len(data) < end:
+        return None
+    payload = bytes(data[protocol.HEADER_SIZE:end])
+    satellite = protocol.decode_hello(payload) if protocol.crc16(payload) == checksum else None
+    if satellite is None:
+        return DEFAULT_SATELLITE, None, 0
+    return satellite, flags, end
+
+
+class TelemetryLog:
+    """Logs segmentados dos streams de um satélite, com um escritor por stream"""
+
+    def __init__(self, logs_dir):
+        self.logs_dir = logs_dir
+        self.writers = {}
+
+    def append(self, entries):
+        """Grava as entradas (categoria, arquivo, registro); retorna a duração de cada gravação"""
+        durations = []
+        for category, filename, entry in entries:
+            key = (category, filename)
+            writer = self.writers.get(key)
+            if writer is None:
+                writer = self.writers[key] = SegmentLogWriter(
+                    segment_log.stream_dir(self.logs_dir, category, filename))
+            start = perf_counter()
+            writer.append(entry)
+            durations.append(perf_counter() - start)
+        return durations
+
+
+class ReadResult:
+    """O que uma leitura do socket produziu, para a thread do ingest aplicar.
+
+    `uplink` são (tipo, dados) das mensagens na ordem recebida (os dados só
+    para ACK/ERROR) e `samples` são (tick, entradas, decodificada, gravada),
+    com os instantes em time.time().
+    """
+    __slots__ = ("frames", "heartbeats", "types", "replies", "uplink", "ticks", "samples",
+                 "decode_seconds", "telemetry_seconds", "derive_seconds", "persist_seconds")
+
+    def __init__(self):
+        self.frames = 0
+        self.heartbeats = 0
+        self.types = {}
+        self.replies = []
+        self.uplink = []
+        self.ticks = []
+        self.samples = []
+        self.decode_seconds = 0.0
+        self.telemetry_seconds = []
+        self.derive_seconds = []
+        self.persist_seconds = []
+
+
+class StreamProcessor:
+    """Decodifica o stream de uma conexão e deriva e grava a telemetria.
+
+    Não faz I/O de rede: roda na thread do ingest ou num processo de shard.
+    """
+
+    def __init__(self, log=None):
+        self.decoder = protocol.FrameDecoder()
+        self.log = log
+
+    def feed(self, data):
+        result = ReadResult()
+        start = perf_counter()
+        frames = self.decoder.feed(data)
+        result.decode_seconds = perf_counter() - start
+        result.frames = len(frames)
+        for frame in frames:
+            self._process(frame, result)
+        return result
+
+    def _process(self, frame, result):
+        key = frame.type if frame.valid else "invalid"
+        result.types[key] = result.types.get(key, 0) + 1
+        if not frame.valid:
+            result.replies.append(protocol.encode_frame(
+                protocol.MSG_TYPE_ERROR, payload=bytes((protocol.ERR_INVALID_CHECKSUM,))))
+            return
+
+        # ACK/ERROR dos telecomandos (as demais mensagens encerram a correlação,
+        # então basta uma entrada por sequência delas)
+        if frame.type in UPLINK_REPLIES:
+            result.uplink.append((frame.type, bytes(frame.payload)))
+        elif not result.uplink or result.uplink[-1][0] in UPLINK_REPLIES:
+            result.uplink.append((frame.type, b""))
+
+        if frame.type == protocol.MSG_TYPE_HEARTBEAT:
+            result.heartbeats += 1
+            tick = protocol.decode_heartbeat(frame.payload)
+            if tick is not None:
+                result.ticks.append(tick)
+            result.replies.append(protocol.encode_frame(protocol.MSG_TYPE_HEARTBEAT))
+        elif frame.type == protocol.MSG_TYPE_TELEMETRY_DATA:
+            start = perf_counter()
+            sample = protocol.decode_telemetry(frame.payload)
+            result.telemetry_seconds.append(perf_counter() - start)
+            if sample is None:
+                result.replies.append(protocol.encode_frame(
+                    protocol.MSG_TYPE_ERROR, payload=bytes((protocol.ERR_INVALID_PARAMS,))))
+                return
+            start = perf_counter()
+            records = telemetry_records(sample)
+            result.derive_seconds.append(perf_counter() - start)
+            decoded = time.time()
+            timestamp = datetime.now().isoformat()
+            entries = [(category, filename, {"timestamp": timestamp, **data})
+                       for category, filename, data in records]
+            persisted = None
+            if self.log is not None:
+                result.persist_seconds.extend(self.log.append(entries))
+                persisted = time.time()
+            result.samples.append((sample["timestamp"], entries, decoded, persisted))
+
+        # Como no comm_task do satélite: o ACK carrega o tipo confirmado
+        if frame.flags & protocol.FLAG_REQUIRES_ACK:
+            result.replies.append(protocol.encode_frame(
+                protocol.MSG_TYPE_ACK, payload=bytes((frame.type,))))
+
+
+class _Connection:
+    """Conexão de um satélite já identificado"""
+
+    def __init__(self, connection_id, peer, writer, satellite):
+        self.id = connection_id
+        self.peer = peer
+        self.writer = writer
+        self.satellite = satellite
+        self.link = None
+        self.processor = None  # Sem shards
+        self.shard = None
+
+
+class IngestServer:
+    """Servidor asyncio que recebe as mensagens dos satélites.
+
+    `links(satélite)` retorna o LinkMonitor do satélite, `logs_dir` é a raiz
+    dos logs (sem ele a telemetria não é gravada), `shards` um
+    ingest_shards.ShardPool opcional e `capture` um capture.CaptureWriter
+    opcional para os bytes recebidos.
+    """
+
+    def __init__(self, on_telemetry, on_command_result=None, links=None, tracer=None,
+                 host=INGEST_HOST, port=INGEST_PORT, logs_dir=None, shards=None, capture=None):
+        self.on_telemetry = on_telemetry
+        self.on_command_result = on_command_result or (lambda command, status: None)
+        self.links = links
+        self.tracer = tracer
+        self.host = host
+        self.port = port
+        self.logs_dir = logs_dir
+        self.shards = shards
+        self.capture = capture
+        self.wheel = TimerWheel()
+        self.uplinks = {}
+        self.logs = {}
+        self.connections = {}
+        self._shard_connections = {}
+        self._ids = itertools.count(1)
+        self.loop = None
+        self._server = None
+        self._ready = threading.Event()
+
+    def uplink(self, satellite):
+        """Fila de telecomandos de um satélite (só na thread do ingest)"""
+        uplink = self.uplinks.get(satellite)
+        if uplink is None:
+            uplink = self.uplinks[satellite] = CommandUplink(self.on_command_result, wheel=self.wheel)
+        return uplink
+
+    def _log(self, satellite):
+        if self.logs_dir is None:
+            return None
+        log = self.logs.get(satellite)
+        if log is None:
+            log = self.logs[satellite] = TelemetryLog(satellite_logs_dir(self.logs_dir, satellite))
+        return log
+
+    def _open(self, peer, writer, satellite):
+        connection = _Connection(next(self._ids), peer, writer, satellite)
+        if self.links is not None:
+            connection.link = self.links(satellite)
+        if self.shards is None:
+            connection.processor = StreamProcessor(self._log(satellite))
+        else:
+            connection.shard = self.shards.open(connection.id, satellite)
+            self._shard_connections[connection.id] = connection
+        self.connections[peer] = connection
+        self.uplink(satellite).attach(peer, writer)
+        if connection.link:
+            connection.link.connection_opened(peer)
+        print(f"Satélite {satellite} conectado: {peer}")
+        return connection
+
+    def _close(self, connection):
+        self.connections.pop(connection.peer, None)
+        self.uplink(connection.satellite).detach(connection.peer)
+        if connection.shard is not None:
+            # Sai de _shard_connections quando o shard confirmar (resultados pendentes)
+            self.shards.close(connection.shard, connection.id)
+        if connection.link:
+            connection.link.connection_closed(connection.peer)
+        print(f"Satélite {connection.satellite} desconectado: {connection.peer}")
+
+    def _apply(self, connection, result, received, nbytes):
+        """Aplica o resultado de uma leitura (thread do ingest)"""
+        DECODE_STREAM.observe(result.decode_seconds)
+        for seconds in result.telemetry_seconds:
+            DECODE_TELEMETRY.observe(seconds)
+        for seconds in result.derive_seconds:
+            DERIVE_SECONDS.observe(seconds)
+        for seconds in result.persist_seconds:
+            PERSIST_SECONDS.observe(seconds)
+        for msg_type, count in result.types.items():
+            FRAMES_TOTAL.labels(msg_type).inc(count)
+        if connection.link:
+            connection.link.frames_received(result.frames, nbytes, result.heartbeats)
+
+        uplink = self.uplink(connection.satellite)
+        for msg_type, payload in result.uplink:
+            uplink.handle_reply(connection.peer, protocol.Frame(msg_type, 0, payload, True))
+
+        clock = self.tracer.clock_for(connection.satellite) if self.tracer else None
+        for tick in result.ticks:
+            if clock is not None:
+                clock.observe(tick, received)
+        for tick, entries, decoded, persisted in result.samples:
+            trace = None
+            if self.tracer:
+                trace = self.tracer.start(tick, received, clock=clock, decoded=decoded)
+                if persisted is not None:
+                    self.tracer.persisted(trace, persisted)
+            self.on_telemetry(connection.satellite, connection.peer, entries, trace)
+
+        if result.replies and not connection.writer.is_closing():
+            connection.writer.write(b"".join(result.replies))
+
+    def _shard_result(self, connection_id, received, nbytes, result):
+        # Resultado de um shard (thread do ingest); None confirma o fechamento
+        # e uma mensagem indica que a leitura falhou no shard
+        connection = self._shard_connections.get(connection_id)
+        if connection is None:
+            return
+        if result is None:
+            del self._shard_connections[connection_id]
+            return
+        if isinstance(result, str):
+            print(f"Erro na conexão de ingest {connection.peer}: {result}")
+            connection.writer.close()
+            return
+        self._apply(connection, result, received, nbytes)
+
+    def _shard_lost(self, shard):
+        # O processo do shard terminou: as suas conexões são encerradas
+        for connection in list(self._shard_connections.values()):
+            if connection.shard is shard:
+                del self._shard_connections[connection.id]
+                connection.writer.close()
+
+    async def _send(self, writer, msg_type, flags=0, payload=b""):
+        writer.write(protocol.encode_frame(msg_type, flags, payload))
+        await writer.drain()
+
+    async def _handle_connection(self, reader, writer):
+        peer = writer.get_extra_info("peername")
+        connection = None
+        buffered = b""
+        try:
+            while True:
+                data = await reader.read(65536)
+                if not data:
+                    break
+                received = time.time()
+                INGEST_BYTES_TOTAL.inc(len(data))
+                if connection is None:
+                    # Identificação: o HELLO, se houver, vem antes das demais mensagens
+                    buffered += data
+                    identified = identify(buffered)
+                    if identified is None:
+                        continue
+                    satellite, flags, consumed = identified
+                    connection = self._open(peer, writer, satellite)
+                    if self.capture is not None:
+                        self.capture.record(KIND_OPEN, buffered, connection.id, satellite, received)
+                    if consumed:
+                        FRAMES_TOTAL.labels(protocol.MSG_TYPE_HELLO).inc()
+                        if connection.link:
+                            connection.link.frames_received(1, consumed)
+                        if flags & protocol.FLAG_REQUIRES_ACK:
+                            await self._send(writer, protocol.MSG_TYPE_ACK,
+                                             payload=bytes((protocol.MSG_TYPE_HELLO,)))
+                    data, buffered = buffered[consumed:], b""
+                    if not data:
+                        continue
+                elif self.capture is not None:
+                    self.capture.record(KIND_DATA, data, connection.id, connection.satellite, received)
+                if connection.processor is not None:
+                    self._apply(connection, connection.processor.feed(data), received, len(data))
+                    await writer.drain()
+                else:
+                    await self.shards.feed(connection.shard, connection.id, data, received)
+        except (ConnectionError, asyncio.IncompleteReadError) as e:
+            print(f"Conexão com {peer} perdida: {e}")
+        except Exception as e:
+            print(f"Erro no ingest de {peer}: {e}")
+        finally:
+            if connection is not None:
+                if self.capture is not None:
+                    self.capture.record(KIND_CLOSE, b"", connection.id, connection.satellite)
+                self._close(connection)
+            writer.close()
+
+    async def serve(self):
+        """Aceita conexões até o loop ser encerrado"""
+        self.loop = asyncio.get_running_loop()
+        if self.shards is not None:
+            self.shards.start(self.loop, self._shard_result, self._shard_lost)
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        print(f"Ingest TCP escutando em {self.host}:{self.port}")
+        timers = asyncio.create_task(self._run_timers())
+        self._ready.set()
+        try:
+            async with self._server:
+                await self._server.serve_forever()
+        finally:
+            timers.cancel()
+
+    async def _run_timers(self):
+        # Avança a timer wheel dos telecomandos a cada tick, sem acumular atraso
+        wheel = self.wheel
+        next_tick = self.loop.time()
+        while True:
+            next_tick += wheel.tick
+            await asyncio.sleep(max(0.0, next_tick - self.loop.time()))
+            wheel.advance()
+
+    def _submit(self, satellite, commands):
+        uplink = self.uplink(satellite)
+        for command in commands:
+            uplink.submit(command)
+
+    def submit_command(self, sid, data, satellite=DEFAULT_SATELLITE):
+        """Enfileira um telecomando do cliente `sid` para um satélite (qualquer thread).
+
+        Levanta ValueError para comandos inválidos e RuntimeError se o
+        serviço não estiver rodando.
+        """
+        name, msg_type, payload = encode_command(data)
+        if self.loop is None:
+            raise RuntimeError("Serviço de ingest não iniciado")
+        command = Command(sid, name, msg_type, payload)
+        self.loop.call_soon_threadsafe(self._submit, satellite, [command])
+        return command
+
+    def submit_plan(self, sid, plan, satellite=DEFAULT_SATELLITE):
+        """Enfileira um plano de comandos como lotes MSG_TYPE_CMD_BATCH (qualquer thread)"""
+        batches = plan_batches(plan)
+        if self.loop is None:
+            raise RuntimeError("Serviço de ingest não iniciado")
+        commands = [Command(sid, "BATCH", protocol.MSG_TYPE_CMD_BATCH, payload, indices)
+                    for indices, payload in batches]
+        self.loop.call_soon_threadsafe(self._submit, satellite, commands)
+        return commands
+
+    def pending_commands(self):
+        """Telecomandos aguardando envio, de todos os satélites"""
+        return sum(len(uplink.pending) for uplink in list(self.uplinks.values()))
+
+    def uplink_stats(self):
+        return {str(satellite): uplink.stats() for satellite, uplink in sorted(self.uplinks.items())}
+
+    def stats(self):
+        return {
+            "connections": {str(peer): connection.satellite
+                            for peer, connection in list(self.connections.items())},
+            "shards": self.shards.stats() if self.shards is not None else None,
+            "capture": self.capture.stats() if self.capture is not None else None
+        }
+
+    def start_in_thread(self):
+        """Inicia o servidor numa thread (daemon) com o seu próprio loop asyncio"""
+        thread = threading.Thread(target=asyncio.run, args=(self.serve(),),
+                                  name="ingest-server", daemon=True)
+        thread.start()
+        self._ready.wait(timeout=5)
+        return thread
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+# Processos de decodificação do ingest TCP, um por shard de satélites
+# /home/groundstation/projeto_final/GS/dashboard/ingest_shards.py
+#
+# Com um ShardPool, o IngestServer continua dono das conexões (thread do
+# ingest): identifica o satélite, envia os bytes lidos ao processo do shard
+# fleet.shard_of(satélite) e aplica o resultado de cada leitura (respostas,
+# enlace, telecomandos, entrega ao dashboard). No processo do shard, um
+# StreamProcessor por conexão decodifica as mensagens, deriva os registros
+# e os grava no log do satélite: o trabalho em Python escala entre núcleos
+# sem disputar o GIL do dashboard. Como um satélite fica sempre no mesmo
+# shard, os logs dele têm um único escritor.
+#
+# Cada shard é um subprocesso (este arquivo) ligado por dois pipes com
+# mensagens pickle (multiprocessing.connection); não é um
+# multiprocessing.Process porque o spawn reimportaria o app.py em cada
+# shard. Os envios saem por uma thread por shard, então a thread do ingest
+# nunca bloqueia num pipe cheio; com SHARD_BACKLOG leituras sem resultado,
+# as conexões do shard param de ler do socket até ele alcançar.
+#
+# Um erro ao processar uma leitura (p.ex. OSError ao gravar o log) volta ao
+# ingest como mensagem e encerra só aquela conexão, como sem shards. Se o
+# processo do shard morrer, as conexões dele são encerradas e outro processo
+# é iniciado depois de RESPAWN_DELAY segundos.
+#
+# Uso (pelo ShardPool): python3 ingest_shards.py <fd entrada> <fd saída> [--logs-dir DIR]
+
+import argparse
+import asyncio
+import os
+import queue
+import signal
+import subprocess
+import sys
+import threading
+from multiprocessing.connection import Connection
+from pathlib import Path
+
+from fleet import satellite_logs_dir, shard_of
+from ingest_server import StreamProcessor, TelemetryLog
+
+# Leituras enviadas a um shard e ainda sem resultado antes de pausar as conexões
+SHARD_BACKLOG = 64
+
+# Espera (s) antes de iniciar outro processo no lugar de um shard que morreu
+RESPAWN_DELAY = 1.0
+
+# Mensagens ao shard: (OPEN, conexão, satélite), (DATA, conexão, recebido, bytes),
+# (CLOSE, conexão). Respostas: (conexão, recebido, bytes lidos, ReadResult),
+# (conexão, recebido, bytes lidos, mensagem de erro) se a leitura falhou, ou
+# (conexão, None, 0, None) confirmando o CLOSE
+OPEN = "open"
+DATA = "data"
+CLOSE = "close"
+
+
+class _Shard:
+    """Um processo de shard e os pipes até ele"""
+
+    def __init__(self, index, logs_dir):
+        self.index = index
+        child_in, requests = os.pipe()
+        results, child_out = os.pipe()
+        command = [sys.executable, str(Path(__file__).resolve()), str(child_in), str(child_out)]
+        if logs_dir is not None:
+            command += ["--logs-dir", str(logs_dir)]
+        self.process = subprocess.Popen(command, pass_fds=(child_in, child_out))
+        os.close(child_in)
+        os.close(child_out)
+        self.requests = Connection(requests, readable=False)
+        self.results = Connection(results, writable=False)
+        self.alive = True
+        self.connections = 0
+        self.backlog = 0
+        self.reads = 0
+        self.ready = asyncio.Event()
+        self.ready.set()
+        self._outgoing = queue.SimpleQueue()
+        threading.Thread(target=self._send_loop, name=f"ingest-shard-{index}", daemon=True).start()
+
+    def _send_loop(self):
+        while True:
+            message = self._outgoing.get()
+            if message is None:
+                return
+            try:
+                self.requests.send(message)
+            except OSError:
+                return
+
+    def post(self, message):
+        """Envia uma mensagem ao processo sem bloquear"""
+        self._outgoing.put(message)
+
+    def close(self):
+        """Libera os pipes e a thread de envio de um shard encerrado"""
+        self._outgoing.put(None)
+        self.requests.close()
+        self.results.close()
+        self.process.poll()
+
+    def stats(self):
+        return {
+            "pid": self.process.pid,
+            "alive": self.alive,
+            "connections": self.connections,
+            "backlog": self.backlog,
+            "reads": self.reads
+        }
+
+
+class ShardPool:
+    """Processos de shard do ingest; usado só pela thread do ingest"""
+
+    def __init__(self, shards, logs_dir=None, backlog=SHARD_BACKLOG):
+        self.count = shards
+        self.logs_dir = logs_dir
+        self.backlog = backlog
+        self.shards = []
+        self.loop = None
+        self.on_result = None
+        self.on_lost = None
+        self.respawns = 0
+
+    def start(self, loop, on_result, on_lost):
+        """Inicia os processos; os resultados chegam a `on_result(conexão, recebido,
+        bytes, resultado)` no loop e a morte de um shard a `on_lost(shard)`"""
+        self.loop = loop
+        self.on_result = on_result
+        self.on_lost = on_lost
+        for index in range(self.count):
+            self.shards.append(self._spawn(index))
+        print(f"Ingest com {self.count} shard(s): pids {[shard.process.pid for shard in self.shards]}")
+
+    def _spawn(self, index):
+        shard = _Shard(index, self.logs_dir)
+        self.loop.add_reader(shard.results.fileno(), self._read_results, shard)
+        return shard
+
+    def _respawn(self, shard):
+        shard.close()
+        if self.shards[shard.index] is shard:
+            self.shards[shard.index] = self._spawn(shard.index)
+            self.respawns += 1
+            print(f"Shard {shard.index} do ingest reiniciado: pid {self.shards[shard.index].process.pid}")
+
+    def open(self, connection, satellite):
+        """Atribui uma conexão ao shard do satélite"""
+        shard = self.shards[shard_of(satellite, len(self.shards))]
+        if not shard.alive:
+            raise ConnectionError(f"Shard {shard.index} do ingest encerrado")
+        shard.connections += 1
+        shard.post((OPEN, connection, satellite))
+        return shard
+
+    async def feed(self, shard, connection, data, received):
+        """Envia uma leitura ao shard; espera se ele estiver atrasado"""
+        if not shard.alive:
+            raise ConnectionError(f"Shard {shard.index} do ingest encerrado")
+        shard.backlog += 1
+        shard.reads += 1
+        shard.post((DATA, connection, received, data))
+        if shard.backlog >= self.backlog:
+            shard.ready.clear()
+            await shard.ready.wait()
+
+    def close(self, shard, connection):
+        shard.connections -= 1
+        shard.post((CLOSE, connection))
+
+    def _read_results(self, shard):
+        try:
+            while shard.results.poll():
+                connection, received, nbytes, result = shard.results.recv()
+                if result is not None:
+                    shard.backlog -= 1
+                self.on_result(connection, received, nbytes, result)
+        except (EOFError, OSError):
+            self.loop.remove_reader(shard.results.fileno())
+            shard.alive = False
+            shard.ready.set()
+            print(f"Shard {shard.index} do ingest encerrado (código {shard.process.poll()})")
+            self.on_lost(shard)
+            self.loop.call_later(RESPAWN_DELAY, self._respawn, shard)
+            return
+        if shard.backlog < self.backlog:
+            shard.ready.set()
+
+    def stats(self):
+        return {"respawns": self.respawns, "shards": [shard.stats() for shard in self.shards]}
+
+
+def run_shard(requests, results, logs_dir=None):
+    """Loop de um processo de shard, até o ingest fechar o pipe de entrada"""
+    processors = {}
+    logs = {}
+    while True:
+        try:
+            message = requests.recv()
+        except EOFError:
+            return
+        op, connection = message[0], message[1]
+        if op == DATA:
+            _, _, received, data = message
+            processor = processors.get(connection)
+            if processor is None:
+                result = "conexão sem processador"
+            else:
+                try:
+                    result = processor.feed(data)
+                except Exception as e:
+                    # Só esta conexão é encerrada; o estado do processador é descartado
+                    del processors[connection]
+                    result = f"{type(e).__name__}: {e}"
+            results.send((connection, received, len(data), result))
+        elif op == OPEN:
+            satellite = message[2]
+            try:
+                log = None
+                if logs_dir is not None:
+                    log = logs.get(satellite)
+                    if log is None:
+                        log = logs[satellite] = TelemetryLog(satellite_logs_dir(logs_dir, satellite))
+                processors[connection] = StreamProcessor(log)
+            except Exception as e:
+                # A primeira leitura da conexão recebe o erro
+                print(f"Shard: erro ao abrir a conexão {connection}: {e}")
+        elif op == CLOSE:
+            processors.pop(connection, None)
+            results.send((connection, None, 0, None))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Processo de shard do ingest TCP")
+    parser.add_argument("input", type=int, help="descritor do pipe de entrada")
+    parser.add_argument("output", type=int, help="descritor do pipe de saída")
+    parser.add_argument("--logs-dir", type=Path)
+    args = parser.parse_args()
+    # O Ctrl+C do dashboard chega ao grupo todo: o shard termina quando o pipe fecha
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    run_shard(Connection(args.input, writable=False), Connection(args.output, readable=False),
+              args.logs_dir)
+
+
+if __name__ == "__main__":
+    main()
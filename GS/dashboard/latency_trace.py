@@ -0,0 +1,229 @@
+# Rastreamento da latência da telemetria, do tick do satélite ao navegador
+# /home/groundstation/projeto_final/GS/dashboard/latency_trace.py
+#
+# Cada amostra TelemetryData recebida pelo ingest ganha um Trace com os
+# instantes (relógio da GS) de cada etapa:
+#
+#   gerada (tick do satélite) -> recebida -> decodificada -> gravada ->
+#   publicada aos clientes -> desenhada no navegador
+#
+# O tick vira horário da GS pela estimativa de ClockOffset: os heartbeats do
+# satélite levam o tick do envio, e o offset é o menor (chegada - tick) numa
+# janela recente, ou seja, inclui o menor atraso de rede observado. A etapa
+# "downlink" mede, portanto, o atraso acima desse mínimo.
+#
+# O navegador confirma o desenho (telemetry_rendered) com o tempo entre
+# receber a mensagem e desenhá-la, medido no próprio relógio. A etapa
+# "deliver" é o tempo entre a publicação e a chegada dessa confirmação,
+# menos o desenho: inclui a fila do cliente e a rede nos dois sentidos.
+
+import itertools
+import threading
+import time
+from collections import OrderedDict, deque
+
+import metrics
+from fleet import DEFAULT_SATELLITE
+
+# Tick do FreeRTOS (configTICK_RATE_HZ)
+SATELLITE_TICK_HZ = 1000
+TICK_MODULO = 2 ** 32
+
+# Heartbeats considerados na estimativa do offset
+CLOCK_WINDOW = 64
+# Traces aguardando confirmação de desenho
+MAX_TRACES = 256
+TRACE_TTL = 30.0
+# Amostras por etapa usadas nos percentis
+STAGE_SAMPLES = 1024
+
+STAGES = ("downlink", "decode", "persist", "hub", "deliver", "render", "total")
+
+TRACE_BUCKETS = (0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+                 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STAGE_SECONDS = metrics.Histogram(
+    "gs_trace_stage_seconds", "Latência de cada etapa da telemetria, do satélite ao navegador",
+    ("stage",), buckets=TRACE_BUCKETS)
+
+
+class ClockOffset:
+    """Offset entre o tick do satélite e o relógio da GS, estimado pelos heartbeats"""
+
+    def __init__(self, window=CLOCK_WINDOW, tick_hz=SATELLITE_TICK_HZ):
+        self.tick_hz = tick_hz
+        self.samples = deque(maxlen=window)  # chegada - tick desenrolado (s)
+        self.last_tick = None
+        self.wraps = 0
+        self.resets = 0
+        self.heartbeats = 0
+
+    def _unwrap(self, tick):
+        return (self.wraps * TICK_MODULO + tick) / self.tick_hz
+
+    def observe(self, tick, received):
+        """Heartbeat com o tick do envio, recebido em `received` (time.time())"""
+        if self.last_tick is not None and tick < self.last_tick:
+            if self.last_tick - tick > TICK_MODULO // 2:
+                self.wraps += 1
+            else:
+                # Tick voltou: o satélite reiniciou e a estimativa recomeça
+                self.samples.clear()
+                self.wraps = 0
+                self.resets += 1
+        self.last_tick = tick
+        self.heartbeats += 1
+        self.samples.append(received - self._unwrap(tick))
+
+    @property
+    def offset(self):
+        samples = list(self.samples)
+        return min(samples) if samples else None
+
+    def to_wall(self, tick):
+        """Horário da GS correspondente a um tick (None sem estimativa)"""
+        offset = self.offset
+        if offset is None:
+            return None
+        # Ticks de telemetria ficam perto do último heartbeat: a diferença com
+        # sinal resolve a volta do contador
+        delta = (tick - self.last_tick + TICK_MODULO // 2) % TICK_MODULO - TICK_MODULO // 2
+        return offset + self._unwrap(self.last_tick) + delta / self.tick_hz
+
+    def stats(self):
+        samples = list(self.samples)
+        return {
+            "offset": self.offset,
+            "spread": (max(samples) - min(samples)) if samples else None,
+            "samples": len(samples),
+            "heartbeats": self.heartbeats,
+            "last_tick": self.last_tick,
+            "resets": self.resets
+        }
+
+
+class Trace:
+    __slots__ = ("id", "tick", "generated", "received", "decoded", "persisted", "published")
+
+    def __init__(self, trace_id, tick, generated, received):
+        self.id = trace_id
+        self.tick = tick
+        self.generated = generated
+        self.received = received
+        self.decoded = time.time()
+        self.persisted = None
+        self.published = None
+
+
+class LatencyTracer:
+    """Traces das amostras e percentis por etapa"""
+
+    def __init__(self, clock=None, max_traces=MAX_TRACES, ttl=TRACE_TTL, samples=STAGE_SAMPLES):
+        # Cada satélite tem o seu tick; `clock` é o do satélite padrão
+        self.clock = clock or ClockOffset()
+        self.clocks = {}
+        self.max_traces = max_traces
+        self.ttl = ttl
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self.published = OrderedDict()  # id -> Trace aguardando confirmação
+        self.stages = {stage: deque(maxlen=samples) for stage in STAGES}
+        self.rendered = 0
+        self.unknown = 0
+
+    def _record(self, stage, seconds):
+        self.stages[stage].append(seconds)
+        STAGE_SECONDS.labels(stage).observe(max(0.0, seconds))
+
+    def clock_for(self, satellite):
+        """ClockOffset de um satélite (o padrão usa `clock`)"""
+        if satellite == DEFAULT_SATELLITE:
+            return self.clock
+        clock = self.clocks.get(satellite)
+        if clock is None:
+            with self._lock:
+                clock = self.clocks.setdefault(satellite, ClockOffset(self.clock.samples.maxlen,
+                                                                      self.clock.tick_hz))
+        return clock
+
+    def start(self, tick, received, clock=None, decoded=None):
+        """Trace de uma amostra decodificada (thread do ingest).
+
+        `clock` é o ClockOffset do satélite (o padrão, se None) e `decoded` o
+        instante da decodificação, se ela ocorreu antes (num shard do ingest).
+        """
+        trace = Trace(next(self._ids), tick, (clock or self.clock).to_wall(tick), received)
+        if decoded is not None:
+            trace.decoded = decoded
+        return trace
+
+    def persisted(self, trace, when=None):
+        trace.persisted = time.time() if when is None else when
+
+    def publish(self, trace):
+        """A amostra foi entregue às filas dos clientes (hub); retorna o id a enviar"""
+        trace.published = now = time.time()
+        if trace.generated is not None:
+            self._record("downlink", trace.received - trace.generated)
+        self._record("decode", trace.decoded - trace.received)
+        persisted = trace.persisted or trace.decoded
+        self._record("persist", persisted - trace.decoded)
+        self._record("hub", now - persisted)
+        with self._lock:
+            self.published[trace.id] = trace
+            while len(self.published) > self.max_traces:
+                self.published.popitem(last=False)
+        return trace.id
+
+    def render_ack(self, trace_id, render_ms, since=None):
+        """Um cliente desenhou a amostra `trace_id` em `render_ms` ms após recebê-la.
+
+        `since` é quando o cliente conectou: amostras publicadas antes disso
+        chegaram no estado inicial, não pelo caminho medido, e são ignoradas.
+        """
+        now = time.time()
+        with self._lock:
+            trace = self.published.get(trace_id)
+            # Descarta traces vencidos (os mais antigos ficam no início)
+            while self.published:
+                oldest = next(iter(self.published.values()))
+                if now - oldest.published <= self.ttl:
+                    break
+                self.published.popitem(last=False)
+        if trace is None or now - trace.published > self.ttl:
+            self.unknown += 1
+            return
+        if since is not None and trace.published < since:
+            return
+        render = max(0.0, float(render_ms) / 1000.0)
+        deliver = max(0.0, now - trace.published - render)
+        self._record("deliver", deliver)
+        self._record("render", render)
+        start = trace.generated if trace.generated is not None else trace.received
+        self._record("total", trace.published + deliver + render - start)
+        self.rendered += 1
+
+    @staticmethod
+    def _percentile(ordered, fraction):
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+    def stats(self, satellite=DEFAULT_SATELLITE):
+        """Percentis de todas as amostras e o relógio de um satélite"""
+        stages = {}
+        for stage in STAGES:
+            ordered = sorted(self.stages[stage])
+            if not ordered:
+                stages[stage] = {"count": 0, "p50_ms": None, "p99_ms": None, "max_ms": None}
+                continue
+            stages[stage] = {
+                "count": len(ordered),
+                "p50_ms": round(self._percentile(ordered, 0.50) * 1000, 3),
+                "p99_ms": round(self._percentile(ordered, 0.99) * 1000, 3),
+                "max_ms": round(ordered[-1] * 1000, 3)
+            }
+        return {
+            "clock": self.clock_for(satellite).stats(),
+            "stages": stages,
+            "pending": len(self.published),
+            "rendered": self.rendered,
+            "unknown": self.unknown
+        }
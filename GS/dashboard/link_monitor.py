@@ -0,0 +1,179 @@
+# Estado do enlace com o satélite, mantido em memória
+# /home/groundstation/projeto_final/GS/dashboard/link_monitor.py
+#
+# O ingest TCP informa cada leitura (mensagens, bytes, heartbeats) e o
+# observador de logs informa os registros novos; nenhuma verificação de
+# estado acessa o disco. Segue o §4.2 do protocolo: heartbeats a cada
+# HEARTBEAT_INTERVAL segundos e perda do enlace após LOSS_TIMEOUT segundos
+# sem nenhuma mensagem.
+#
+# As atualizações podem vir de qualquer thread (o ingest roda num loop
+# asyncio próprio); as transições ficam pendentes até `check()` e o
+# callback `notify()` avisa o consumidor de que há alguma.
+
+import threading
+import time
+from datetime import datetime
+
+HEARTBEAT_INTERVAL = 5.0
+LOSS_TIMEOUT = 15.0
+# Janela (s) das taxas de mensagens e bytes
+RATE_WINDOW = 10
+
+STATE_DISCONNECTED = "disconnected"  # Nenhuma mensagem desde o início
+STATE_CONNECTED = "connected"
+STATE_LOST = "lost"
+
+
+class LinkMonitor:
+    def __init__(self, notify=None, heartbeat_interval=HEARTBEAT_INTERVAL,
+                 loss_timeout=LOSS_TIMEOUT, rate_window=RATE_WINDOW):
+        self.notify = notify
+        self.heartbeat_interval = heartbeat_interval
+        self.loss_timeout = loss_timeout
+        self.rate_window = rate_window
+        self._lock = threading.Lock()
+
+        self.state = STATE_DISCONNECTED
+        self.since = time.time()
+        self.last_frame = None       # monotonic
+        self.last_frame_wall = None
+        self.last_heartbeat = None   # monotonic
+        self.heartbeat_period = None  # Média móvel do intervalo entre heartbeats
+        self.frames = 0
+        self.bytes = 0
+        self.heartbeats = 0
+        # Contagens por segundo: [segundo, mensagens, bytes] em anel
+        self._buckets = [[None, 0, 0] for _ in range(rate_window)]
+
+        self.peers = set()
+        self.connects = 0
+        self.disconnects = 0
+        self.outages = 0
+        self.outage_total = 0.0
+        self.outage_longest = 0.0
+        self._outage_start = None    # monotonic da última mensagem antes da perda
+        self._transitions = []
+
+    def _transition(self, state, now, reason):
+        previous, self.state = self.state, state
+        self.since = time.time()
+        transition = {"state": state, "previous": previous, "reason": reason,
+                      "time": datetime.now().isoformat()}
+        if state == STATE_LOST:
+            self.outages += 1
+            self._outage_start = self.last_frame if self.last_frame is not None else now
+        elif state == STATE_CONNECTED and self._outage_start is not None:
+            duration = now - self._outage_start
+            self.outage_total += duration
+            self.outage_longest = max(self.outage_longest, duration)
+            transition["outage"] = round(duration, 3)
+            self._outage_start = None
+        self._transitions.append(transition)
+
+    def _notify(self):
+        if self.notify is not None:
+            self.notify()
+
+    def frames_received(self, count, nbytes=0, heartbeats=0):
+        """Mensagens recebidas do satélite (ou registros novos nos logs)"""
+        now = time.monotonic()
+        with self._lock:
+            self.last_frame = now
+            self.last_frame_wall = time.time()
+            self.frames += count
+            self.bytes += nbytes
+            if heartbeats:
+                if self.last_heartbeat is not None:
+                    period = now - self.last_heartbeat
+                    self.heartbeat_period = (period if self.heartbeat_period is None
+                                             else 0.8 * self.heartbeat_period + 0.2 * period)
+                self.last_heartbeat = now
+                self.heartbeats += heartbeats
+            second = int(now)
+            bucket = self._buckets[second % self.rate_window]
+            if bucket[0] != second:
+                bucket[:] = [second, 0, 0]
+            bucket[1] += count
+            bucket[2] += nbytes
+            changed = self.state != STATE_CONNECTED
+            if changed:
+                self._transition(STATE_CONNECTED, now, "frame received")
+        if changed:
+            self._notify()
+
+    def connection_opened(self, peer):
+        with self._lock:
+            self.peers.add(peer)
+            self.connects += 1
+
+    def connection_closed(self, peer):
+        """Conexão TCP encerrada: sem outras conexões, o enlace está perdido"""
+        with self._lock:
+            self.peers.discard(peer)
+            self.disconnects += 1
+            changed = not self.peers and self.state == STATE_CONNECTED
+            if changed:
+                self._transition(STATE_LOST, time.monotonic(), "connection closed")
+        if changed:
+            self._notify()
+
+    def check(self):
+        """Declara a perda do enlace se o prazo venceu; retorna as transições pendentes"""
+        now = time.monotonic()
+        with self._lock:
+            if self.state == STATE_CONNECTED and now - self.last_frame > self.loss_timeout:
+                self._transition(STATE_LOST, now, f"no frames for {self.loss_timeout:g} s")
+            transitions, self._transitions = self._transitions, []
+        return transitions
+
+    def next_deadline(self):
+        """Segundos até a perda do enlace ser declarada (None se não estiver conectado)"""
+        if self.state != STATE_CONNECTED:
+            return None
+        return max(0.0, self.last_frame + self.loss_timeout - time.monotonic()) + 0.01
+
+    @property
+    def connected(self):
+        return self.state == STATE_CONNECTED
+
+    def rates(self, now=None):
+        """Mensagens/s e bytes/s na janela de RATE_WINDOW segundos"""
+        second = int(time.monotonic() if now is None else now)
+        frames = nbytes = 0
+        for start, count, size in self._buckets:
+            if start is not None and second - self.rate_window < start <= second:
+                frames += count
+                nbytes += size
+        return frames / self.rate_window, nbytes / self.rate_window
+
+    def stats(self):
+        now = time.monotonic()
+        frame_rate, byte_rate = self.rates(now)
+        silence = None if self.last_frame is None else now - self.last_frame
+        heartbeat_age = None if self.last_heartbeat is None else now - self.last_heartbeat
+        current_outage = None if self._outage_start is None else now - self._outage_start
+        return {
+            "state": self.state,
+            "since": datetime.fromtimestamp(self.since).isoformat(),
+            "last_frame": (datetime.fromtimestamp(self.last_frame_wall).isoformat()
+                           if self.last_frame_wall else None),
+            "silence": None if silence is None else round(silence, 3),
+            "heartbeat": {
+                "expected_interval": self.heartbeat_interval,
+                "measured_interval": (None if self.heartbeat_period is None
+                                      else round(self.heartbeat_period, 3)),
+                "age": None if heartbeat_age is None else round(heartbeat_age, 3),
+                "late": heartbeat_age is not None and heartbeat_age > 1.5 * self.heartbeat_interval,
+                "count": self.heartbeats
+            },
+            "frames": self.frames,
+            "bytes": self.bytes,
+            "frame_rate": frame_rate,
+            "byte_rate": byte_rate,
+            "connections": {"open": len(self.peers), "opened": self.connects,
+                            "closed": self.disconnects},
+            "outages": {"count": self.outages, "total": round(self.outage_total, 3),
+                        "longest": round(self.outage_longest, 3),
+                        "current": None if current_outage is None else round(current_outage, 3)}
+        }
@@ -0,0 +1,109 @@
+# Cache dos logs já interpretados, invalidado por mudança real no arquivo
+# /home/groundstation/projeto_final/GS/dashboard/log_cache.py
+#
+# Cada stream é identificado pela assinatura (inode, tamanho, mtime_ns) do
+# segmento ativo (ou do arquivo JSON antigo). Enquanto a assinatura não muda,
+# o final do log e o registro mais recente vêm da memória, sem reabrir nem
+# interpretar o arquivo. O número de streams em cache é limitado (LRU).
+
+import os
+from collections import OrderedDict
+from pathlib import Path
+
+import segment_log
+
+
+class _CacheEntry:
+    __slots__ = ("signature", "dir_signature", "active", "tail")
+
+    def __init__(self, signature, dir_signature, active, tail):
+        self.signature = signature
+        self.dir_signature = dir_signature
+        self.active = active
+        self.tail = tail
+
+
+def _file_signature(path):
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+
+class ParsedLogCache:
+    """Cache LRU do final de cada stream de log, por assinatura de arquivo"""
+
+    def __init__(self, logs_dir, max_entries=32, tail_size=100):
+        self.logs_dir = Path(logs_dir)
+        self.max_entries = max_entries
+        self.tail_size = tail_size
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _signature(self, category, filename, entry):
+        directory = segment_log.stream_dir(self.logs_dir, category, filename)
+        dir_signature = _file_signature(directory)
+        if dir_signature is None:
+            # Stream ainda no formato antigo (array JSON)
+            return _file_signature(self.logs_dir / category / filename), None, None
+
+        # Rotação de segmento altera o diretório; só então relemos o índice
+        if entry is not None and entry.dir_signature == dir_signature:
+            active = entry.active
+        else:
+            active = segment_log.load_index(directory)["active"]
+        signature = (active, _file_signature(segment_log.segment_path(directory, active)))
+        return signature, dir_signature, active
+
+    def _lookup(self, category, filename):
+        key = (category, filename)
+        entry = self._entries.get(key)
+        signature, dir_signature, active = self._signature(category, filename, entry)
+
+        if entry is not None and entry.signature == signature and entry.dir_signature == dir_signature:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return entry
+
+        self.misses += 1
+        tail = segment_log.read_tail(self.logs_dir, category, filename, self.tail_size)
+        entry = _CacheEntry(signature, dir_signature, active, tail)
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+        return entry
+
+    def latest(self, category, filename):
+        """Registro mais recente do stream, ou None"""
+        tail = self._lookup(category, filename).tail
+        return tail[-1] if tail else None
+
+    def tail(self, category, filename, limit):
+        """Últimos `limit` registros; além de `tail_size`, lê direto do disco"""
+        if limit <= 0:
+            return []
+        if limit > self.tail_size:
+            return segment_log.read_tail(self.logs_dir, category, filename, limit)
+        return self._lookup(category, filename).tail[-limit:]
+
+    def invalidate(self, category=None, filename=None):
+        if category is None:
+            self._entries.clear()
+        else:
+            self._entries.pop((category, filename), None)
+
+    def stats(self):
+        """Contadores de acerto/falha do cache"""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "hit_ratio": self.hits / total if total else 0.0
+        }
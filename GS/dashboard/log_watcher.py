@@ -0,0 +1,218 @@
+# Observador de mudanças nos logs de telemetria
+# /home/groundstation/projeto_final/GS/dashboard/log_watcher.py
+#
+# No Linux usa inotify (via ctypes, sem dependências extras): o descritor
+# retornado por `fileno()` fica legível assim que algum stream muda, e o
+# chamador pode esperar nele sem polling. Em outros sistemas (ou se o inotify
+# não estiver disponível) cai para um polling portátil por `os.stat`.
+#
+# `read_changes()` devolve o conjunto de streams alterados, como pares
+# (categoria, arquivo), p.ex. ('power', 'battery.json').
+
+import ctypes
+import ctypes.util
+import os
+import struct
+from pathlib import Path
+
+import segment_log
+
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+
+_EVENT_HEADER = struct.Struct("iIII")
+_WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+
+
+def _stream_key(category, name):
+    # Mapeia uma entrada do diretório da categoria para o nome do stream
+    if name.endswith(segment_log.STREAM_SUFFIX):
+        return (category, name[:-len(segment_log.STREAM_SUFFIX)] + ".json")
+    if name.endswith(".json"):
+        return (category, name)
+    return None
+
+
+def list_streams(logs_dir):
+    """Todos os streams existentes em `logs_dir`"""
+    streams = set()
+    logs_dir = Path(logs_dir)
+    if not logs_dir.is_dir():
+        return streams
+    for category_dir in logs_dir.iterdir():
+        if not category_dir.is_dir():
+            continue
+        for entry in category_dir.iterdir():
+            key = _stream_key(category_dir.name, entry.name)
+            if key is not None:
+                streams.add(key)
+    return streams
+
+
+class _Inotify:
+    def __init__(self):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 falhou")
+
+    def add_watch(self, path, mask=_WATCH_MASK):
+        wd = self._add_watch(self.fd, os.fsencode(path), mask)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch falhou: {path}")
+        return wd
+
+    def read_events(self):
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            wd, mask, _cookie, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b"\0").decode("utf-8", "replace")
+            offset += length
+            yield wd, mask, name
+
+    def close(self):
+        os.close(self.fd)
+
+
+class InotifyLogWatcher:
+    """Observador baseado em inotify (Linux)"""
+
+    def __init__(self, logs_dir):
+        self.logs_dir = Path(logs_dir)
+        self._inotify = _Inotify()
+        # wd -> (categoria, stream) ; (None, None) para a raiz
+        self._watches = {}
+        self._pending = set()
+        self._watch_root()
+
+    def fileno(self):
+        return self._inotify.fd
+
+    def _watch(self, path, target):
+        try:
+            self._watches[self._inotify.add_watch(path)] = target
+            return True
+        except OSError:
+            return False
+
+    def _watch_category(self, category):
+        category_dir = self.logs_dir / category
+        if not self._watch(category_dir, (category, None)):
+            return
+        for entry in category_dir.iterdir():
+            if entry.is_dir():
+                self._watch_stream(category, entry.name)
+
+    def _watch_stream(self, category, name):
+        key = _stream_key(category, name)
+        if key is not None and name.endswith(segment_log.STREAM_SUFFIX):
+            self._watch(self.logs_dir / category / name, (category, key))
+            # Registros escritos antes de o watch existir
+            self._pending.add(key)
+
+    def _watch_root(self):
+        self.logs_dir.mkdir(parents=True, exist_ok=True)
+        self._watch(self.logs_dir, (None, None))
+        for entry in self.logs_dir.iterdir():
+            if entry.is_dir():
+                self._watch_category(entry.name)
+        self._pending.clear()
+
+    def read_changes(self):
+        changes, self._pending = self._pending, set()
+        for wd, mask, name in self._inotify.read_events():
+            if mask & IN_Q_OVERFLOW:
+                # Eventos perdidos: considerar tudo alterado
+                changes |= list_streams(self.logs_dir)
+                continue
+            if mask & IN_IGNORED:
+                self._watches.pop(wd, None)
+                continue
+            category, stream = self._watches.get(wd, (None, None))
+            if category is None:
+                # Nova categoria na raiz dos logs
+                if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                    self._watch_category(name)
+                continue
+            if stream is not None:
+                changes.add(stream)
+                continue
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    self._watch_stream(category, name)
+                continue
+            key = _stream_key(category, name)
+            if key is not None:
+                changes.add(key)
+        changes |= self._pending
+        self._pending = set()
+        return changes
+
+    def close(self):
+        self._inotify.close()
+
+
+def _stream_signature(path):
+    # Assinatura barata de um stream: mtime do diretório + último segmento
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    if not os.path.isdir(path):
+        return (st.st_ino, st.st_size, st.st_mtime_ns)
+    newest = max((e for e in os.scandir(path) if e.name.endswith(segment_log.SEGMENT_SUFFIX)),
+                 key=lambda e: e.name, default=None)
+    if newest is None:
+        return (st.st_mtime_ns, None)
+    seg = newest.stat()
+    return (st.st_mtime_ns, newest.name, seg.st_size, seg.st_mtime_ns)
+
+
+class PollingLogWatcher:
+    """Observador portátil por polling de `os.stat`"""
+
+    def __init__(self, logs_dir, poll_interval=0.25):
+        self.logs_dir = Path(logs_dir)
+        self.poll_interval = poll_interval
+        self._signatures = self._scan()
+
+    def fileno(self):
+        return None
+
+    def _scan(self):
+        signatures = {}
+        for category, filename in list_streams(self.logs_dir):
+            directory = segment_log.stream_dir(self.logs_dir, category, filename)
+            path = directory if directory.exists() else self.logs_dir / category / filename
+            signatures[(category, filename)] = _stream_signature(path)
+        return signatures
+
+    def read_changes(self):
+        signatures = self._scan()
+        changes = {key for key, sig in signatures.items() if self._signatures.get(key) != sig}
+        self._signatures = signatures
+        return changes
+
+    def close(self):
+        pass
+
+
+def create_log_watcher(logs_dir, poll_interval=0.25):
+    """Cria o melhor observador disponível para `logs_dir`"""
+    try:
+        return InotifyLogWatcher(logs_dir)
+    except (OSError, AttributeError) as e:
+        print(f"inotify indisponível ({e}), usando polling a cada {poll_interval}s")
+        return PollingLogWatcher(logs_dir, poll_interval)
@@ -0,0 +1,241 @@
+# Métricas no formato texto do Prometheus (rota /metrics)
+# /home/groundstation/projeto_final/GS/dashboard/metrics.py
+#
+# Contadores, histogramas de latência e gauges sem dependências externas.
+# O registro precisa ser barato o bastante para ficar sempre ligado nos
+# caminhos quentes (decodificação, derivação, gravação, emits): cada thread
+# escreve no seu próprio shard (uma lista), sem lock, e os shards só são
+# somados quando /metrics é lido. As greenlets do eventlet compartilham a
+# thread do hub e não são interrompidas no meio de um incremento.
+#
+# Uso típico:
+#
+#     DECODE_SECONDS = metrics.Histogram("gs_frame_decode_seconds", "...")
+#     start = perf_counter()
+#     ...
+#     DECODE_SECONDS.observe(perf_counter() - start)
+
+import math
+import threading
+from bisect import bisect_left
+
+# Limites (s) dos baldes de latência: de 10 µs a 1 s
+LATENCY_BUCKETS = (0.00001, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+                   0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+_registry = []
+
+
+def _format_value(value):
+    if value == math.inf:
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(value)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+class _Sharded:
+    """Valores de uma série com um shard (lista) por thread"""
+
+    def __init__(self, size):
+        self._size = size
+        self._local = threading.local()
+        self._shards = []
+        self._lock = threading.Lock()
+
+    def _new_shard(self):
+        shard = [0] * self._size
+        with self._lock:
+            self._shards.append(shard)
+        self._local.shard = shard
+        return shard
+
+    def _totals(self):
+        totals = [0] * self._size
+        with self._lock:
+            shards = list(self._shards)
+        for shard in shards:
+            for i, value in enumerate(shard):
+                totals[i] += value
+        return totals
+
+
+class _CounterChild(_Sharded):
+    def __init__(self):
+        super().__init__(1)
+
+    def inc(self, amount=1):
+        try:
+            shard = self._local.shard
+        except AttributeError:
+            shard = self._new_shard()
+        shard[0] += amount
+
+    def value(self):
+        return self._totals()[0]
+
+
+class _HistogramChild(_Sharded):
+    # Shard: contagem de cada balde (não cumulativa), +Inf e a soma no fim
+    def __init__(self, bounds):
+        super().__init__(len(bounds) + 2)
+        self.bounds = bounds
+
+    def observe(self, value, _bisect=bisect_left):
+        try:
+            shard = self._local.shard
+        except AttributeError:
+            shard = self._new_shard()
+        shard[_bisect(self.bounds, value)] += 1
+        shard[-1] += value
+
+    def snapshot(self):
+        """(contagens cumulativas por limite, incluindo +Inf), soma e total"""
+        totals = self._totals()
+        cumulative, running = [], 0
+        for count in totals[:-1]:
+            running += count
+            cumulative.append(running)
+        return cumulative, totals[-1], running
+
+
+class _GaugeChild:
+    def __init__(self):
+        self._value = 0
+        self._function = None
+
+    def set(self, value):
+        self._value = value
+
+    def inc(self, amount=1):
+        self._value += amount
+
+    def dec(self, amount=1):
+        self._value -= amount
+
+    def set_function(self, function):
+        """O valor passa a ser lido de `function()` a cada leitura de /metrics"""
+        self._function = function
+
+    def value(self):
+        return self._function() if self._function is not None else self._value
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            self._default = self._children[()] = self._new_child()
+        _registry.append(self)
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values):
+        """Série com os valores de rótulo dados (criada na primeira vez)"""
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name}: esperados os rótulos {self.labelnames}")
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def _series(self):
+        with self._lock:
+            return list(self._children.items())
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for values, child in sorted(self._series(), key=lambda item: tuple(map(str, item[0]))):
+            lines.extend(self._render_child(values, child))
+        return lines
+
+    def _render_child(self, values, child):
+        return [f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(child.value())}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name, help_text, labelnames=()):
+        super().__init__(name, help_text, labelnames)
+        if not self.labelnames:
+            # Sem rótulos, inc() é o da série: um nível de chamada a menos
+            self.inc = self._default.inc
+
+    def _new_child(self):
+        return _CounterChild()
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def set(self, value):
+        self._default.set(value)
+
+    def inc(self, amount=1):
+        self._default.inc(amount)
+
+    def dec(self, amount=1):
+        self._default.dec(amount)
+
+    def set_function(self, function):
+        self._default.set_function(function)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.bounds = tuple(sorted(buckets))
+        super().__init__(name, help_text, labelnames)
+        if not self.labelnames:
+            self.observe = self._default.observe
+
+    def _new_child(self):
+        return _HistogramChild(self.bounds)
+
+    def _render_child(self, values, child):
+        cumulative, total, count = child.snapshot()
+        lines = []
+        for bound, value in zip(self.bounds + (math.inf,), cumulative):
+            labels = _format_labels(self.labelnames, values, (("le", _format_value(float(bound))),))
+            lines.append(f"{self.name}_bucket{labels} {value}")
+        labels = _format_labels(self.labelnames, values)
+        lines.append(f"{self.name}_sum{labels} {_format_value(float(total))}")
+        lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+def render():
+    """Todas as métricas registradas, no formato texto do Prometheus"""
+    lines = []
+    for metric in list(_registry):
+        try:
+            lines.extend(metric.render())
+        except Exception as e:
+            lines.append(f"# erro ao ler {metric.name}: {e}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,285 @@
+# Protocolo de comunicação Satélite-Ground Station (docs/communication_protocol.md)
+# /home/groundstation/projeto_final/GS/dashboard/protocol.py
+#
+# Espelha include/protocol.h e src/protocol.c do firmware: cabeçalho
+# MessageHeader de 8 bytes (little-endian) seguido dos dados, com CRC-16
+# calculado apenas sobre os dados.
+
+import re
+import struct
+
+# Sync bytes
+SYNC_BYTE1 = 0xAA
+SYNC_BYTE2 = 0x55
+SYNC = bytes((SYNC_BYTE1, SYNC_BYTE2))
+
+# Message types
+MSG_TYPE_ADCS_CMD = 0x01
+MSG_TYPE_TELEMETRY_REQ = 0x02
+MSG_TYPE_TELEMETRY_DATA = 0x03
+MSG_TYPE_ACK = 0x04
+MSG_TYPE_ERROR = 0x05
+MSG_TYPE_CMD_BATCH = 0x06
+MSG_TYPE_HELLO = 0x07
+MSG_TYPE_HEARTBEAT = 0xFF
+
+# Control flags
+FLAG_REQUIRES_ACK = 0x01
+FLAG_FRAGMENTED = 0x02
+FLAG_LAST_FRAGMENT = 0x04
+
+# Error codes
+ERR_INVALID_COMMAND = 0x01
+ERR_INVALID_CHECKSUM = 0x02
+ERR_TIMEOUT = 0x03
+ERR_INVALID_PARAMS = 0x04
+ERR_INVALID_STATE = 0x05
+ERR_QUEUE_FULL = 0x06
+
+# struct MessageHeader { uint8_t sync[2]; uint8_t type; uint8_t flags;
+#                        uint16_t length; uint16_t checksum; }
+HEADER = struct.Struct("<BBBBHH")
+HEADER_SIZE = HEADER.size
+
+# struct TelemetryPacket (tm_proc.h), o mesmo TELEMETRY_FORMAT do process_qemu_output
+TELEMETRY_PACKET = struct.Struct("<Ifff?xxx")
+# struct TelemetryData (protocol.h), com a atitude atual do ADCS
+TELEMETRY_DATA = struct.Struct("<IffffffB3x")
+
+# struct ADCSCommand
+ADCS_COMMAND = struct.Struct("<fff")
+
+# struct HeartbeatData { uint32_t tick; }: tick do satélite no envio (vazio nas
+# versões anteriores do firmware e nos heartbeats da GS)
+HEARTBEAT = struct.Struct("<I")
+
+# struct HelloData { uint16_t satellite_id; uint16_t reserved; }: identificação
+# opcional do satélite, primeira mensagem da conexão
+HELLO = struct.Struct("<H2x")
+
+# struct CommandBatchHeader { uint8_t count; uint8_t reserved[3]; }
+COMMAND_BATCH_HEADER = struct.Struct("<B3x")
+# struct CommandBatchEntry { uint8_t type; uint8_t length; uint16_t reserved;
+#                            uint32_t exec_tick; } seguida dos parâmetros
+COMMAND_BATCH_ENTRY = struct.Struct("<BBHI")
+
+
+def _make_crc16_table(poly=0x1021):
+    table = []
+    for i in range(256):
+        crc = i << 8
+        for _ in range(8):
+            crc = ((crc << 1) ^ poly) if crc & 0x8000 else (crc << 1)
+        table.append(crc & 0xFFFF)
+    return tuple(table)
+
+
+# Tabela CRC-16-CCITT (polinômio 0x1021), a mesma crc16_table de src/protocol.c
+CRC16_TABLE = _make_crc16_table()
+
+
+def crc16(data, crc=0xFFFF):
+    """CRC-16-CCITT (valor inicial 0xFFFF), como calculate_crc16.
+
+    Aceita bytes, bytearray ou memoryview (sem copiar os dados).
+    """
+    table = CRC16_TABLE
+    for byte in data:
+        crc = ((crc << 8) & 0xFFFF) ^ table[(crc >> 8) ^ byte]
+    return crc
+
+
+def encode_frame(msg_type, flags=0, payload=b""):
+    """Monta uma mensagem (cabeçalho + dados), como create_message"""
+    return HEADER.pack(SYNC_BYTE1, SYNC_BYTE2, msg_type, flags, len(payload), crc16(payload)) + bytes(payload)
+
+
+def encode_command_batch(entries):
+    """Dados de uma mensagem MSG_TYPE_CMD_BATCH; `entries` são (tipo, exec_tick, parâmetros)"""
+    parts = [COMMAND_BATCH_HEADER.pack(len(entries))]
+    for msg_type, exec_tick, params in entries:
+        parts.append(COMMAND_BATCH_ENTRY.pack(msg_type, len(params), 0, exec_tick))
+        parts.append(bytes(params))
+    return b"".join(parts)
+
+
+_SYNC_PATTERN = re.compile(re.escape(SYNC))
+
+
+def _sync_finder(view):
+    # memoryview não tem find(); a regex percorre o buffer sem copiá-lo
+    search = _SYNC_PATTERN.search
+
+    def find(_sync, pos, end):
+        match = search(view, pos, end)
+        return match.start() if match else -1
+    return find
+
+
+class Frame:
+    """Mensagem decodificada; `payload` é uma memoryview sobre os bytes recebidos"""
+    __slots__ = ("type", "flags", "payload", "valid")
+
+    def __init__(self, msg_type, flags, payload, valid):
+        self.type = msg_type
+        self.flags = flags
+        self.payload = payload
+        self.valid = valid
+
+    def __repr__(self):
+        return f"Frame(type=0x{self.type:02X}, flags=0x{self.flags:02X}, len={len(self.payload)}, valid={self.valid})"
+
+
+class FrameDecoder:
+    """Decodificador incremental de mensagens recebidas por um stream.
+
+    Cada chamada a `feed()` pode devolver várias mensagens. Os dados recebidos
+    (bytes, bytearray ou memoryview) são percorridos por índices e os payloads
+    são memoryviews sobre eles, sem cópias por mensagem. Só os bytes de uma
+    mensagem dividida entre leituras são copiados, uma vez, para um bytearray
+    persistente: cada leitura seguinte acrescenta a ele apenas o que falta para
+    completar o cabeçalho ou a mensagem, e o resto é decodificado direto da
+    leitura. O bytearray é lido por um deslocamento e só é compactado quando a
+    parte já consumida passa de COMPACT_BYTES.
+
+    Após corrupção o decodificador ressincroniza procurando o próximo par
+    SYNC_BYTE1/SYNC_BYTE2. Mensagens com CRC inválido são devolvidas com
+    `valid=False` e a busca recomeça logo após o seu sync, para não confiar
+    num campo de comprimento possivelmente corrompido.
+    """
+
+    COMPACT_BYTES = 4096
+
+    def __init__(self, max_payload=4096):
+        self.max_payload = max_payload
+        self._pending = bytearray()
+        self._offset = 0
+        self.frames = 0
+        self.crc_errors = 0
+        self.skipped_bytes = 0
+
+    def feed(self, data):
+        """Processa os bytes recebidos e retorna a lista de mensagens completas"""
+        view = memoryview(data).cast("B")
+        end = len(view)
+        frames = []
+        pos = self._complete(view, frames) if self._offset < len(self._pending) else 0
+        if pos < end:
+            pos = self._parse(data if isinstance(data, (bytes, bytearray)) else view,
+                              view, pos, end, frames)
+            if pos < end:
+                # Bytes de uma mensagem incompleta: a única cópia dos dados recebidos
+                self._pending = bytearray(view[pos:])
+                self._offset = 0
+        return frames
+
+    def _complete(self, view, frames):
+        # Completa a mensagem pendente com o mínimo de bytes de `view`; retorna
+        # quantos foram consumidos (todos se a mensagem continuar incompleta)
+        pos = 0
+        end = len(view)
+        while pos < end:
+            pending = self._pending
+            available = len(pending) - self._offset
+            if available < HEADER_SIZE:
+                need = HEADER_SIZE - available
+            else:
+                need = HEADER_SIZE + HEADER.unpack_from(pending, self._offset)[4] - available
+            take = min(need, end - pos)
+            pending += view[pos:pos + take]
+            pos += take
+            if take < need:
+                break
+            count = len(frames)
+            offset = self._parse(pending, memoryview(pending), self._offset, len(pending), frames)
+            if offset == len(pending):
+                # Pendência resolvida: o restante é lido direto da leitura
+                self._pending = bytearray()
+                self._offset = 0
+                break
+            if len(frames) > count:
+                # Há payloads apontando para este bytearray: não pode ser alterado
+                self._pending = bytearray(pending[offset:])
+                self._offset = 0
+            elif offset >= self.COMPACT_BYTES:
+                del pending[:offset]
+                self._offset = 0
+            else:
+                self._offset = offset
+        return pos
+
+    def _parse(self, data, view, pos, end, frames):
+        # Decodifica data[pos:end]; retorna o início do que ficou incompleto
+        find = data.find if not isinstance(data, memoryview) else _sync_finder(data)
+        unpack_header = HEADER.unpack_from
+        max_payload = self.max_payload
+
+        while True:
+            start = find(SYNC, pos, end)
+            if start < 0:
+                # Mantém um possível primeiro byte de sync no final
+                keep = end - 1 if end > pos and view[end - 1] == SYNC_BYTE1 else end
+                self.skipped_bytes += keep - pos
+                return keep
+            self.skipped_bytes += start - pos
+            if end - start < HEADER_SIZE:
+                return start
+            _s1, _s2, msg_type, flags, length, checksum = unpack_header(view, start)
+            if length > max_payload:
+                # Cabeçalho impossível: procurar o próximo sync
+                self.skipped_bytes += 1
+                pos = start + 1
+                continue
+            payload_end = start + HEADER_SIZE + length
+            if payload_end > end:
+                return start
+            payload = view[start + HEADER_SIZE:payload_end]
+            if crc16(payload) == checksum:
+                self.frames += 1
+                frames.append(Frame(msg_type, flags, payload, True))
+                pos = payload_end
+            else:
+                self.crc_errors += 1
+                frames.append(Frame(msg_type, flags, payload, False))
+                pos = start + 1
+
+    def buffered(self):
+        """Bytes aguardando o restante de uma mensagem"""
+        return len(self._pending) - self._offset
+
+
+def decode_heartbeat(payload):
+    """Tick do satélite num heartbeat, ou None se ele não trouxer o tick"""
+    if len(payload) != HEARTBEAT.size:
+        return None
+    return HEARTBEAT.unpack(payload)[0]
+
+
+def decode_telemetry(payload):
+    """Interpreta os dados de uma mensagem MSG_TYPE_TELEMETRY_DATA.
+
+    Aceita tanto o TelemetryPacket do TM_proc quanto o TelemetryData do
+    protocolo; retorna um dicionário ou None se o tamanho não corresponder.
+    """
+    if len(payload) == TELEMETRY_PACKET.size:
+        timestamp, temperature, power, battery, adcs_status = TELEMETRY_PACKET.unpack(payload)
+        return {"timestamp": timestamp, "temperature": temperature, "power": power,
+                "battery": battery, "adcs_status": adcs_status}
+    if len(payload) == TELEMETRY_DATA.size:
+        timestamp, temperature, power, battery, roll, pitch, yaw, mode = TELEMETRY_DATA.unpack(payload)
+        return {"timestamp": timestamp, "temperature": temperature, "power": power,
+                "battery": battery, "adcs_status": bool(mode),
+                "attitude": {"roll": roll, "pitch": pitch, "yaw": yaw}}
+    return None
+
+
+def encode_hello(satellite_id, flags=0):
+    """Mensagem MSG_TYPE_HELLO com o identificador do satélite"""
+    return encode_frame(MSG_TYPE_HELLO, flags, HELLO.pack(satellite_id))
+
+
+def decode_hello(payload):
+    """Identificador do satélite numa mensagem MSG_TYPE_HELLO, ou None se inválida"""
+    if len(payload) != HELLO.size:
+        return None
+    return HELLO.unpack(payload)[0] or None
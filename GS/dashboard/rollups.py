@@ -0,0 +1,398 @@
+# Agregados (rollups) da telemetria para consultas de histórico por intervalo
+# /home/groundstation/projeto_final/GS/dashboard/rollups.py
+#
+# Para cada stream de log são mantidos, de forma incremental, baldes de
+# 1 s, 1 min e 1 h com min/máx/média de cada campo numérico. Uma consulta
+# `from`/`to`/`max_points` usa os registros brutos quando o intervalo é
+# pequeno e, caso contrário, o nível de agregação mais grosso que ainda
+# tenha detalhe suficiente; o resultado é reduzido a `max_points` com LTTB
+# (largest-triangle-three-buckets), preservando a forma da curva. O custo
+# depende do intervalo e de `max_points`, não do tamanho do histórico.
+#
+# As consultas e a agregação dos registros novos rodam nas threads do
+# worker_pool: os baldes ficam sob `lock`, e a leitura de registros do disco
+# (carregamento, lacunas, brutos) e o LTTB sobre cópias do hot store
+# acontecem fora dele. `stats` só lê contadores, sem o lock, e roda no hub.
+
+import threading
+from datetime import datetime
+
+import numpy as np
+
+import segment_log
+
+# (nome, segundos por balde, baldes mantidos)
+TIERS = (
+    ("1s", 1, 6 * 3600),        # 6 horas
+    ("1m", 60, 7 * 24 * 60),    # 7 dias
+    ("1h", 3600, 366 * 24),     # 1 ano
+)
+
+DEFAULT_MAX_POINTS = 500
+MAX_POINTS_LIMIT = 5000
+DEFAULT_RANGE = 3600  # Segundos quando só `to` (ou nada) é informado
+
+# Pontos de origem aceitos por ponto de saída antes de passar ao nível mais
+# grosso: limita o custo da consulta independentemente do histórico
+OVERSAMPLE = 8
+
+
+def parse_time(value):
+    """Converte epoch (segundos) ou ISO 8601 em epoch; None se vazio"""
+    if value is None or value == "":
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return datetime.fromisoformat(str(value)).timestamp()
+
+
+def format_time(epoch):
+    # Mesmo formato dos timestamps dos registros (datetime.now().isoformat())
+    return datetime.fromtimestamp(epoch).isoformat()
+
+
+def record_time(record):
+    """Epoch do timestamp de um registro (None se ausente ou inválido)"""
+    try:
+        return datetime.fromisoformat(record["timestamp"]).timestamp()
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def numeric_fields(record, prefix=""):
+    """Campos numéricos de um registro como (caminho.com.pontos, valor)"""
+    for key, value in record.items():
+        if key == "timestamp" or isinstance(value, bool):
+            continue
+        if isinstance(value, (int, float)):
+            yield prefix + key, value
+        elif isinstance(value, dict):
+            yield from numeric_fields(value, f"{prefix}{key}.")
+
+
+def get_field(record, field):
+    for key in field.split("."):
+        record = record.get(key) if isinstance(record, dict) else None
+    return record
+
+
+def _set_field(record, field, value):
+    keys = field.split(".")
+    for key in keys[:-1]:
+        record = record.setdefault(key, {})
+    record[keys[-1]] = value
+
+
+def lttb_indices(x, y, threshold):
+    """Índices escolhidos pelo largest-triangle-three-buckets.
+
+    Mantém o primeiro e o último ponto e, de cada balde intermediário, o
+    ponto que forma o maior triângulo com o ponto escolhido antes e a média
+    do balde seguinte.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    every = (n - 2) / (threshold - 2)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    a = 0
+    for i in range(threshold - 2):
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+        next_end = min(int((i + 2) * every) + 1, n)
+        avg_x = x[end:next_end].mean()
+        avg_y = np.nanmean(y[end:next_end]) if not np.isnan(y[end:next_end]).all() else y[a]
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(np.nan_to_num(area, nan=-1.0)))
+        selected[i + 1] = a
+    selected[-1] = n - 1
+    return selected
+
+
+class RollupTier:
+    """Baldes de um nível de agregação em arrays NumPy pré-alocados.
+
+    Para cada campo é mantida uma matriz (capacidade x 4) com mín, máx, soma
+    e número de valores por balde. Os baldes ficam ordenados pelo início;
+    quando a capacidade acaba os mais antigos são descartados em bloco.
+    """
+
+    def __init__(self, name, seconds, max_buckets):
+        self.name = name
+        self.seconds = seconds
+        self.max_buckets = max_buckets
+        self.capacity = max_buckets + max_buckets // 8
+        self.size = 0
+        self.starts = np.zeros(self.capacity, dtype=np.int64)
+        self.counts = np.zeros(self.capacity, dtype=np.int64)
+        self.fields = {}
+        # Início do balde mais antigo mantido após um descarte (None: nada descartado)
+        self.kept_from = None
+
+    def _trim(self):
+        excess = self.size - self.max_buckets
+        for array in (self.starts, self.counts, *self.fields.values()):
+            array[:self.max_buckets] = array[excess:self.size]
+        self.size = self.max_buckets
+        self.kept_from = int(self.starts[0])
+
+    def _open(self, i, start):
+        # Abre um balde vazio na posição i, deslocando os seguintes
+        if self.size == self.capacity:
+            self._trim()
+            i -= self.capacity - self.size
+            if i < 0:
+                return None
+        n = self.size
+        for array in (self.starts, self.counts, *self.fields.values()):
+            array[i + 1:n + 1] = array[i:n]
+        self.starts[i] = start
+        self.counts[i] = 0
+        for array in self.fields.values():
+            array[i] = (np.nan, np.nan, 0.0, 0.0)
+        self.size += 1
+        return i
+
+    def add(self, epoch, fields):
+        start = int(epoch // self.seconds) * self.seconds
+        n = self.size
+        last = self.starts[n - 1] if n else None
+        if last == start:
+            i = n - 1
+        elif last is None or start > last:
+            i = self._open(n, start)
+        else:
+            # Registro atrasado: raro, busca binária
+            if self.kept_from is not None and start < self.kept_from:
+                return
+            i = int(np.searchsorted(self.starts[:n], start))
+            if self.starts[i] != start:
+                i = self._open(i, start)
+            if i is None:
+                return
+
+        self.counts[i] += 1
+        for field, value in fields:
+            array = self.fields.get(field)
+            if array is None:
+                array = self.fields[field] = np.zeros((self.capacity, 4))
+                array[:, :2] = np.nan
+            row = array[i]
+            if row[3]:
+                if value < row[0]:
+                    row[0] = value
+                if value > row[1]:
+                    row[1] = value
+            else:
+                row[0] = row[1] = value
+            row[2] += value
+            row[3] += 1
+
+    def covers(self, start):
+        """Indica se nenhum balde a partir de `start` foi descartado"""
+        return self.kept_from is None or start >= self.kept_from
+
+    def span(self, start, end):
+        """Fatia [i, j) dos baldes que se sobrepõem ao intervalo"""
+        starts = self.starts[:self.size]
+        first = int(start // self.seconds) * self.seconds
+        return int(np.searchsorted(starts, first)), int(np.searchsorted(starts, end, side="right"))
+
+    def record_count(self, start, end):
+        i, j = self.span(start, end)
+        return int(self.counts[i:j].sum())
+
+    def series(self, i, j, field):
+        """Início dos baldes e média de `field` (NaN sem valores)"""
+        array = self.fields.get(field)
+        if array is None:
+            return self.starts[i:j], np.full(j - i, np.nan)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return self.starts[i:j], array[i:j, 2] / array[i:j, 3]
+
+    def points(self, indices):
+        """Pontos (média no lugar do valor, mais min/max/count) dos baldes indicados"""
+        points = []
+        for i in indices:
+            point = {"timestamp": format_time(int(self.starts[i])), "count": int(self.counts[i]),
+                     "min": {}, "max": {}}
+            for field, array in self.fields.items():
+                low, high, total, n = array[i].tolist()
+                if n:
+                    _set_field(point, field, total / n)
+                    point["min"][field] = low
+                    point["max"][field] = high
+            points.append(point)
+        return points
+
+
+class _Stream:
+    __slots__ = ("last_time", "fields", "tiers")
+
+    def __init__(self, tiers):
+        self.last_time = None
+        self.fields = []
+        self.tiers = [RollupTier(*tier) for tier in tiers]
+
+
+class RollupStore:
+    """Rollups de todos os streams, atualizados à medida que os dados chegam.
+
+    Os streams são carregados do disco no primeiro acesso; depois disso cada
+    registro novo custa uma atualização por nível. Registros com timestamp
+    não posterior ao último já agregado são ignorados, então o mesmo registro
+    pode chegar pelo ingest e pelo observador de logs.
+    """
+
+    def __init__(self, logs_dir, tiers=TIERS, hot=None):
+        self.logs_dir = logs_dir
+        self.tier_specs = tiers
+        # Hot store (hot_store.HotStore) opcional com as amostras recentes
+        self.hot = hot
+        self._streams = {}
+        self.lock = threading.RLock()
+
+    def load(self, category, filename):
+        """Carrega um stream do disco, se ainda não estiver (antes do primeiro `add`)"""
+        self._stream(category, filename)
+
+    def _stream(self, category, filename):
+        key = (category, filename)
+        stream = self._streams.get(key)
+        if stream is None:
+            # Leitura do disco fora do lock (como em HotStore.channel)
+            loaded = _Stream(self.tier_specs)
+            for record in segment_log.iter_records(self.logs_dir, category, filename):
+                self._add(loaded, record)
+            with self.lock:
+                stream = self._streams.setdefault(key, loaded)
+        return stream
+
+    def _add(self, stream, record):
+        if not isinstance(record, dict):
+            return False
+        epoch = record_time(record)
+        if epoch is None or (stream.last_time is not None and epoch <= stream.last_time):
+            return False
+        stream.last_time = epoch
+        fields = list(numeric_fields(record))
+        for field, _ in fields:
+            if field not in stream.fields:
+                stream.fields.append(field)
+        for tier in stream.tiers:
+            tier.add(epoch, fields)
+        return True
+
+    def add(self, category, filename, record):
+        """Agrega um registro recém-chegado; False se já agregado"""
+        stream = self._stream(category, filename)
+        with self.lock:
+            return self._add(stream, record)
+
+    def refresh(self, category, filename, recent):
+        """Agrega os registros novos entre `recent` (os últimos do stream).
+
+        Se todos os registros de `recent` forem novos pode haver uma lacuna
+        (muitos registros entre duas notificações): lê do disco o que faltou.
+        """
+        if (category, filename) not in self._streams:
+            # O carregamento inicial já inclui os registros recentes
+            self._stream(category, filename)
+            return
+        stream = self._streams[(category, filename)]
+        with self.lock:
+            last_time = stream.last_time
+        if recent and last_time is not None:
+            first = record_time(recent[0]) if isinstance(recent[0], dict) else None
+            if first is not None and first > last_time:
+                # Lacuna lida do disco fora do lock (_add ignora o que já foi agregado)
+                recent = list(segment_log.iter_range(self.logs_dir, category, filename,
+                                                     start=format_time(last_time)))
+        with self.lock:
+            for record in recent:
+                self._add(stream, record)
+
+    def query(self, category, filename, start=None, end=None, max_points=DEFAULT_MAX_POINTS, field=None):
+        """Histórico de `start` a `end` (epoch) com no máximo `max_points` pontos"""
+        stream = self._stream(category, filename)
+        max_points = max(3, min(int(max_points), MAX_POINTS_LIMIT))
+        with self.lock:
+            if end is None:
+                end = stream.last_time if stream.last_time is not None else datetime.now().timestamp()
+            if field is None and stream.fields:
+                field = stream.fields[0]
+        if start is None:
+            start = end - DEFAULT_RANGE
+        limit = max_points * OVERSAMPLE
+
+        # Amostras recentes direto das colunas do hot store, sem acessar o
+        # disco (cópia da janela: o LTTB roda sem segurar o lock do store)
+        if self.hot is not None and self.hot.covers(category, filename, start):
+            ring = self.hot.snapshot(category, filename, start, end)
+            i, j = ring.span(start, end)
+            column = ring.columns.get(field)
+            if j - i <= max_points:
+                indices = range(i, j)
+            elif column is not None and column.dtype != object:
+                indices = i + lttb_indices(ring.times[i:j], column[i:j], max_points)
+            else:
+                # Sem campo numérico para o LTTB: amostragem uniforme
+                indices = np.linspace(i, j - 1, max_points).astype(np.int64)
+            return self._response(category, filename, start, end, "raw", field, j - i, ring.rows(indices))
+
+        # Registros brutos se couberem no limite e ainda estiverem em disco
+        with self.lock:
+            expected = stream.tiers[0].record_count(start, end)
+        if expected <= limit:
+            points = list(segment_log.iter_range(self.logs_dir, category, filename,
+                                                 format_time(start), format_time(end)))
+            if len(points) >= expected:
+                source_points = len(points)
+                if len(points) > max_points and field is not None:
+                    x = [record_time(p) for p in points]
+                    y = [get_field(p, field) for p in points]
+                    y = [v if isinstance(v, (int, float)) else np.nan for v in y]
+                    points = [points[i] for i in lttb_indices(x, y, max_points)]
+                return self._response(category, filename, start, end, "raw", field, source_points, points)
+
+        # O nível mais grosso que ainda tenha `limit` baldes no intervalo; se
+        # nenhum tiver, o mais fino que ainda cubra o início do intervalo
+        with self.lock:
+            covering = [tier for tier in stream.tiers if tier.covers(start)] or stream.tiers[-1:]
+            tier = covering[0]
+            for candidate in reversed(covering):
+                i, j = candidate.span(start, end)
+                if j - i >= limit:
+                    tier = candidate
+                    break
+            i, j = tier.span(start, end)
+            if j - i > max_points and field is not None:
+                x, y = tier.series(i, j, field)
+                indices = i + lttb_indices(x, y, max_points)
+            else:
+                indices = range(i, j)
+            points = tier.points(indices)
+        return self._response(category, filename, start, end, tier.name, field, j - i, points)
+
+    def _response(self, category, filename, start, end, resolution, field, source_points, points):
+        return {
+            "category": category,
+            "filename": filename,
+            "from": format_time(start),
+            "to": format_time(end),
+            "resolution": resolution,
+            "field": field,
+            "source_points": source_points,
+            "points": points
+        }
+
+    def stats(self):
+        """Baldes por stream e nível; sem o lock (pode ser chamado no hub)"""
+        return {
+            f"{category}/{filename}": {tier.name: tier.size for tier in stream.tiers}
+            for (category, filename), stream in list(self._streams.items())
+        }
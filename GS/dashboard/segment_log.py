@@ -0,0 +1,441 @@
+#!/usr/bin/env python3
+# Formato de log segmentado append-only para a telemetria da Ground Station
+# /home/groundstation/projeto_final/GS/dashboard/segment_log.py
+#
+# Cada stream de log (<categoria>/<arquivo>.json) passa a ser um diretório
+# <categoria>/<arquivo>.seg/ contendo:
+#   - segmentos NDJSON (um registro JSON por linha): 00000001.ndjson, ...
+#   - index.json: pequeno índice com os segmentos fechados (número de
+#     registros e timestamps do primeiro/último) e o segmento ativo.
+#
+# Escritores só acrescentam linhas ao segmento ativo e, quando ele passa de
+# `segment_bytes`, o fecham e registram no índice. A retenção (número mínimo
+# de registros mantidos) é aplicada apenas na rotação, apagando segmentos
+# antigos inteiros. Leitores só leem o final dos segmentos.
+#
+# Uso pela linha de comando (registros NDJSON via stdin):
+#   python3 segment_log.py append <logs_dir> <categoria> <arquivo> [--retention N]
+#   python3 segment_log.py tail <logs_dir> <categoria> <arquivo> [-n N]
+#   python3 segment_log.py migrate <logs_dir>
+#
+# Recepção de lotes por uma conexão de longa duração (ver satellite/log_sinks.py):
+#   python3 segment_log.py ingest <logs_dir>          # lotes via stdin (ssh)
+#   python3 segment_log.py serve <logs_dir> [--port P] # lotes via TCP
+# Cada lote é uma linha JSON {"batch": n, "records": [[categoria, arquivo, registro], ...]}
+# e é confirmado com uma linha {"batch": n, "written": k}.
+
+import argparse
+import json
+import os
+import socketserver
+import sys
+import threading
+from pathlib import Path
+
+STREAM_SUFFIX = ".seg"
+SEGMENT_SUFFIX = ".ndjson"
+INDEX_NAME = "index.json"
+
+DEFAULT_SEGMENT_BYTES = 256 * 1024  # Rotaciona segmentos a cada ~256 KiB
+DEFAULT_RETENTION = 10000  # Registros mantidos por stream (antes: 100 fixos)
+DEFAULT_BATCH_PORT = 5001  # Recepção de lotes via TCP (segment_log.py serve)
+
+_TAIL_BLOCK = 8192
+
+
+def stream_dir(logs_dir, category, filename):
+    """Diretório do stream segmentado de <categoria>/<arquivo>"""
+    stem = Path(filename).stem
+    return Path(logs_dir) / category / f"{stem}{STREAM_SUFFIX}"
+
+
+def segment_path(directory, segment_id):
+    return Path(directory) / f"{segment_id:08d}{SEGMENT_SUFFIX}"
+
+
+def load_index(directory):
+    """Lê o índice do stream (ou um índice vazio se ainda não existir)"""
+    try:
+        with open(Path(directory) / INDEX_NAME, 'r') as f:
+            index = json.load(f)
+        if isinstance(index, dict) and "active" in index:
+            index.setdefault("segments", [])
+            return index
+    except (FileNotFoundError, json.JSONDecodeError):
+        pass
+    return {"version": 1, "active": 1, "segments": []}
+
+
+def _write_index(directory, index):
+    # Escrita atômica: leitores nunca veem um índice parcial
+    tmp_path = Path(directory) / f".{INDEX_NAME}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(index, f, separators=(",", ":"))
+    os.replace(tmp_path, Path(directory) / INDEX_NAME)
+
+
+def encode_records(records):
+    """Serializa registros como linhas NDJSON"""
+    return "".join(json.dumps(r, separators=(",", ":")) + "\n" for r in records).encode("utf-8")
+
+
+def _parse_lines(data):
+    records = []
+    for line in data.split(b"\n"):
+        if not line.strip():
+            continue
+        try:
+            records.append(json.loads(line))
+        except json.JSONDecodeError:
+            # Linha corrompida (ex.: escrita interrompida): ignorar
+            continue
+    return records
+
+
+class SegmentLogWriter:
+    """Escritor append-only de um stream de log segmentado.
+
+    Cada `append` custa uma escrita no fim do segmento ativo, independente
+    do tamanho do histórico. Um único escritor por stream é suposto.
+    """
+
+    def __init__(self, directory, segment_bytes=DEFAULT_SEGMENT_BYTES, retention=DEFAULT_RETENTION):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.segment_bytes = segment_bytes
+        self.retention = retention
+        self._index = load_index(self.directory)
+        self._fd = None
+
+    def _open_active(self):
+        if self._fd is None:
+            path = segment_path(self.directory, self._index["active"])
+            self._fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        return self._fd
+
+    def append(self, record):
+        """Acrescenta um registro ao stream"""
+        self.append_many([record])
+
+    def append_many(self, records):
+        """Acrescenta vários registros com uma única escrita"""
+        if not records:
+            return
+        fd = self._open_active()
+        os.write(fd, encode_records(records))
+        if os.fstat(fd).st_size >= self.segment_bytes:
+            self.rotate()
+
+    def rotate(self):
+        """Fecha o segmento ativo, registra-o no índice e aplica a retenção"""
+        active = self._index["active"]
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+        path = segment_path(self.directory, active)
+        try:
+            with open(path, 'rb') as f:
+                records = _parse_lines(f.read())
+        except FileNotFoundError:
+            records = []
+        if not records:
+            return
+
+        self._index["segments"].append({
+            "id": active,
+            "count": len(records),
+            "first_ts": records[0].get("timestamp") if isinstance(records[0], dict) else None,
+            "last_ts": records[-1].get("timestamp") if isinstance(records[-1], dict) else None,
+        })
+        self._index["active"] = active + 1
+
+        # Retenção: descartar os segmentos mais antigos enquanto os restantes
+        # ainda garantem `retention` registros
+        expired = []
+        segments = self._index["segments"]
+        total = sum(s["count"] for s in segments)
+        while len(segments) > 1 and total - segments[0]["count"] >= self.retention:
+            total -= segments[0]["count"]
+            expired.append(segments.pop(0))
+
+        _write_index(self.directory, self._index)
+        for seg in expired:
+            try:
+                os.remove(segment_path(self.directory, seg["id"]))
+            except FileNotFoundError:
+                pass
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _tail_segment(path, limit):
+    """Lê os últimos `limit` registros de um segmento, de trás para frente"""
+    try:
+        with open(path, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            end = f.tell()
+            pos = end
+            data = b""
+            while pos > 0:
+                step = min(_TAIL_BLOCK, pos)
+                pos -= step
+                f.seek(pos)
+                data = f.read(step) + data
+                if data.count(b"\n") > limit:
+                    break
+    except FileNotFoundError:
+        return []
+
+    # Ignora uma última linha incompleta (escrita em andamento)
+    if not data.endswith(b"\n"):
+        data = data[:data.rfind(b"\n") + 1]
+    lines = data.split(b"\n")
+    if pos > 0:
+        # A primeira linha lida pode estar cortada
+        lines = lines[1:]
+    return _parse_lines(b"\n".join(lines[-(limit + 1):]))[-limit:]
+
+
+def _read_legacy(logs_dir, category, filename):
+    # Arquivos no formato antigo (array JSON reescrito a cada amostra)
+    legacy_path = Path(logs_dir) / category / filename
+    if not legacy_path.exists():
+        return None
+    with open(legacy_path, 'r') as f:
+        logs = json.load(f)
+    return logs if isinstance(logs, list) else [logs]
+
+
+def read_tail(logs_dir, category, filename, limit=50):
+    """Retorna os últimos `limit` registros do stream (mais antigo primeiro)"""
+    directory = stream_dir(logs_dir, category, filename)
+    if not directory.exists():
+        legacy = _read_legacy(logs_dir, category, filename)
+        return legacy[-limit:] if legacy else []
+
+    index = load_index(directory)
+    records = _tail_segment(segment_path(directory, index["active"]), limit)
+    for seg in reversed(index["segments"]):
+        if len(records) >= limit:
+            break
+        older = _tail_segment(segment_path(directory, seg["id"]), limit - len(records))
+        records = older + records
+    return records
+
+
+def read_latest(logs_dir, category, filename):
+    """Retorna o registro mais recente do stream, ou None"""
+    records = read_tail(logs_dir, category, filename, limit=1)
+    return records[-1] if records else None
+
+
+def iter_records(logs_dir, category, filename):
+    """Itera sobre todos os registros retidos do stream (mais antigo primeiro)"""
+    directory = stream_dir(logs_dir, category, filename)
+    if not directory.exists():
+        yield from _read_legacy(logs_dir, category, filename) or []
+        return
+
+    index = load_index(directory)
+    yield from _iter_segments(directory, [s["id"] for s in index["segments"]] + [index["active"]])
+
+
+def _iter_segments(directory, segment_ids):
+    for segment_id in segment_ids:
+        try:
+            with open(segment_path(directory, segment_id), 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            continue
+        if not data.endswith(b"\n"):
+            data = data[:data.rfind(b"\n") + 1]
+        yield from _parse_lines(data)
+
+
+def iter_range(logs_dir, category, filename, start=None, end=None):
+    """Itera sobre os registros com `start` <= timestamp <= `end` (ISO 8601).
+
+    Segmentos fechados fora do intervalo são pulados pelo índice, sem leitura.
+    """
+    directory = stream_dir(logs_dir, category, filename)
+    if not directory.exists():
+        records = _read_legacy(logs_dir, category, filename) or []
+    else:
+        index = load_index(directory)
+        segment_ids = [s["id"] for s in index["segments"]
+                       if not ((start and s.get("last_ts") and s["last_ts"] < start) or
+                               (end and s.get("first_ts") and s["first_ts"] > end))]
+        records = _iter_segments(directory, segment_ids + [index["active"]])
+
+    for record in records:
+        timestamp = record.get("timestamp") if isinstance(record, dict) else None
+        if timestamp is None:
+            continue
+        if start and timestamp < start:
+            continue
+        if end and timestamp > end:
+            # Os registros estão em ordem: nada mais no intervalo
+            break
+        yield record
+
+
+def migrate_legacy(logs_dir, retention=DEFAULT_RETENTION):
+    """Converte arquivos JSON antigos de <logs_dir> para streams segmentados"""
+    migrated = []
+    for legacy_path in sorted(Path(logs_dir).glob("*/*.json")):
+        directory = stream_dir(logs_dir, legacy_path.parent.name, legacy_path.name)
+        if directory.exists():
+            continue
+        records = _read_legacy(logs_dir, legacy_path.parent.name, legacy_path.name)
+        with SegmentLogWriter(directory, retention=retention) as writer:
+            writer.append_many(records)
+        migrated.append(legacy_path)
+    return migrated
+
+
+def _valid_name(name):
+    return isinstance(name, str) and name not in ("", ".", "..") and "/" not in name and "\\" not in name
+
+
+class BatchIngestor:
+    """Grava lotes de registros de vários streams, mantendo os escritores abertos.
+
+    Pode ser usado por várias conexões ao mesmo tempo: as gravações de cada
+    stream são serializadas por um lock próprio.
+    """
+
+    def __init__(self, logs_dir, retention=DEFAULT_RETENTION, segment_bytes=DEFAULT_SEGMENT_BYTES):
+        self.logs_dir = Path(logs_dir)
+        self.retention = retention
+        self.segment_bytes = segment_bytes
+        self._writers = {}
+        self._lock = threading.Lock()
+
+    def _writer(self, key):
+        with self._lock:
+            entry = self._writers.get(key)
+            if entry is None:
+                writer = SegmentLogWriter(stream_dir(self.logs_dir, *key), self.segment_bytes, self.retention)
+                entry = self._writers[key] = (writer, threading.Lock())
+            return entry
+
+    def write_batch(self, records):
+        """Grava [(categoria, arquivo, registro), ...] e retorna quantos foram gravados"""
+        by_stream = {}
+        for category, filename, record in records:
+            if not (_valid_name(category) and _valid_name(filename)):
+                raise ValueError(f"Stream inválido: {category}/{filename}")
+            by_stream.setdefault((category, filename), []).append(record)
+        for key, stream_records in by_stream.items():
+            writer, lock = self._writer(key)
+            with lock:
+                writer.append_many(stream_records)
+        return sum(len(r) for r in by_stream.values())
+
+    def handle_stream(self, rfile, wfile):
+        """Lê lotes (uma linha JSON cada) até o fim do stream, confirmando cada um"""
+        for line in rfile:
+            if not line.strip():
+                continue
+            batch = None
+            try:
+                message = json.loads(line)
+                batch = message.get("batch")
+                reply = {"batch": batch, "written": self.write_batch(message["records"])}
+            except Exception as e:
+                reply = {"batch": batch, "error": str(e)}
+            wfile.write((json.dumps(reply) + "\n").encode("utf-8"))
+            wfile.flush()
+
+    def close(self):
+        with self._lock:
+            for writer, lock in self._writers.values():
+                with lock:
+                    writer.close()
+            self._writers.clear()
+
+
+def serve_batches(logs_dir, host="0.0.0.0", port=DEFAULT_BATCH_PORT, retention=DEFAULT_RETENTION):
+    """Servidor TCP de lotes (uma conexão persistente por satélite)"""
+    ingestor = BatchIngestor(logs_dir, retention)
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            ingestor.handle_stream(self.rfile, self.wfile)
+
+    # Uma thread por conexão; o BatchIngestor serializa as gravações de cada stream
+    class Server(socketserver.ThreadingTCPServer):
+        daemon_threads = True
+
+    with Server((host, port), Handler) as server:
+        print(f"Recebendo lotes de logs em {host}:{port} -> {logs_dir}")
+        server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Logs de telemetria segmentados (append-only)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_append = sub.add_parser("append", help="acrescenta registros NDJSON lidos do stdin")
+    p_append.add_argument("logs_dir")
+    p_append.add_argument("category")
+    p_append.add_argument("filename")
+    p_append.add_argument("--retention", type=int, default=DEFAULT_RETENTION)
+    p_append.add_argument("--segment-bytes", type=int, default=DEFAULT_SEGMENT_BYTES)
+
+    p_tail = sub.add_parser("tail", help="mostra os últimos registros de um stream")
+    p_tail.add_argument("logs_dir")
+    p_tail.add_argument("category")
+    p_tail.add_argument("filename")
+    p_tail.add_argument("-n", type=int, default=10)
+
+    p_migrate = sub.add_parser("migrate", help="converte logs JSON antigos")
+    p_migrate.add_argument("logs_dir")
+    p_migrate.add_argument("--retention", type=int, default=DEFAULT_RETENTION)
+
+    p_ingest = sub.add_parser("ingest", help="grava lotes recebidos via stdin (conexão ssh)")
+    p_ingest.add_argument("logs_dir")
+    p_ingest.add_argument("--retention", type=int, default=DEFAULT_RETENTION)
+
+    p_serve = sub.add_parser("serve", help="grava lotes recebidos via TCP")
+    p_serve.add_argument("logs_dir")
+    p_serve.add_argument("--host", default="0.0.0.0")
+    p_serve.add_argument("--port", type=int, default=DEFAULT_BATCH_PORT)
+    p_serve.add_argument("--retention", type=int, default=DEFAULT_RETENTION)
+
+    args = parser.parse_args(argv)
+
+    if args.command == "append":
+        records = _parse_lines(sys.stdin.buffer.read())
+        directory = stream_dir(args.logs_dir, args.category, args.filename)
+        with SegmentLogWriter(directory, args.segment_bytes, args.retention) as writer:
+            writer.append_many(records)
+    elif args.command == "tail":
+        for record in read_tail(args.logs_dir, args.category, args.filename, args.n):
+            print(json.dumps(record))
+    elif args.command == "ingest":
+        ingestor = BatchIngestor(args.logs_dir, args.retention)
+        try:
+            ingestor.handle_stream(sys.stdin.buffer, sys.stdout.buffer)
+        finally:
+            ingestor.close()
+    elif args.command == "serve":
+        serve_batches(args.logs_dir, args.host, args.port, args.retention)
+    elif args.command == "migrate":
+        for path in migrate_legacy(args.logs_dir, args.retention):
+            print(f"Migrado: {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
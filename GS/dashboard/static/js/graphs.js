@@ -23,23 +23,123 @@ let charts = {};
 // Variável para controlar o tipo de gráfico exibido no telemetryChart
 let activeTelemetryChart = 'power';
 
+// Intervalo do histórico em segundos (0 = últimos registros)
+let historyRange = 0;
+
+// Pontos pedidos por gráfico (o servidor reduz com LTTB)
+const HISTORY_MAX_POINTS = 300;
+
+// Séries do modo "Latest": uma só consulta incremental para todos os gráficos
+const LIVE_SERIES = 'thermal/temperatures.json:internal:processor,power/battery.json:level,' +
+    'adcs/attitude.json:roll:pitch:yaw,power/consumption.json:total_watts';
+const LIVE_POINTS = 100;
+
+// Estado da consulta incremental: cursor e ETag da última resposta e os
+// últimos LIVE_POINTS registros de cada série
+let liveCursor = '';
+let liveEtag = null;
+let liveBuffers = {};
+
+// Último trace confirmado: keyframes e reenvios repetem o id. A comparação é
+// por igualdade porque os ids recomeçam em 1 quando o servidor reinicia
+let lastRenderedTrace = 0;
+
+// Intervalo de atualização do painel de latência (ms)
+const LATENCY_REFRESH_MS = 5000;
+
 // Formatar data para exibição
 function formatTime(isoString) {
     const date = new Date(isoString);
-    return date.toLocaleTimeString();
+    // Intervalos maiores que um dia também mostram a data
+    return historyRange > 86400 ? date.toLocaleString() : date.toLocaleTimeString();
+}
+
+// Obter o histórico de um stream no intervalo selecionado
+function fetchHistory(category, filename, field) {
+    let url = `/api/history/${category}/${filename}?satellite=${SATELLITE}`;
+    if (historyRange > 0) {
+        const now = Date.now() / 1000;
+        url += `&from=${now - historyRange}&to=${now}&max_points=${HISTORY_MAX_POINTS}&field=${field}`;
+    }
+    return fetch(url)
+        .then(response => response.json())
+        .then(data => Array.isArray(data) ? data : data.points);
+}
+
+// Registros novos das séries do modo "Latest" desde o último cursor; o
+// servidor responde 304 se nada mudou (If-None-Match com o último ETag)
+function fetchLiveSeries() {
+    let url = `/api/history?series=${LIVE_SERIES}&limit=${LIVE_POINTS}&satellite=${SATELLITE}`;
+    if (liveCursor) url += `&since=${liveCursor}`;
+    const headers = liveEtag ? {'If-None-Match': liveEtag} : {};
+    return fetch(url, {headers: headers, cache: 'no-store'})
+        .then(response => {
+            if (response.status === 304) return null;
+            if (!response.ok) throw new Error(`HTTP ${response.status}`);
+            liveEtag = response.headers.get('ETag');
+            return response.json();
+        })
+        .then(data => {
+            if (!data) return null;
+            liveCursor = data.cursor;
+            Object.entries(data.series).forEach(([name, records]) => {
+                liveBuffers[name] = (liveBuffers[name] || []).concat(records).slice(-LIVE_POINTS);
+            });
+            return liveBuffers;
+        });
+}
+
+// Volta a consulta incremental ao início (troca de intervalo)
+function resetLiveSeries() {
+    liveCursor = '';
+    liveEtag = null;
+    liveBuffers = {};
 }
 
 // Inicializar gráficos quando a página carregar
 document.addEventListener('DOMContentLoaded', () => {
     initCharts();
     setupTelemetryButtons();
+    setupHistoryRange();
     
     // Atualizar gráficos a cada 10 segundos
     setInterval(() => {
         updateCharts();
     }, 10000);
+
+    updateLatencyPanel();
+    setInterval(updateLatencyPanel, LATENCY_REFRESH_MS);
 });
 
+// Confirma ao servidor o desenho de uma amostra rastreada: o tempo vai da
+// chegada da mensagem (main.js) até o próximo quadro pintado pelo navegador
+function acknowledgeRender(trace) {
+    if (trace === lastRenderedTrace) return;
+    lastRenderedTrace = trace;
+    const receivedAt = telemetryReceivedAt;
+    requestAnimationFrame(() => {
+        socket.emit('telemetry_rendered', {trace: trace, render_ms: performance.now() - receivedAt});
+    });
+}
+
+// Percentis de cada etapa do caminho da telemetria (/api/stats/latency)
+function updateLatencyPanel() {
+    const table = document.getElementById('latency-stages');
+    if (!table) return;
+    fetch(`/api/stats/latency?satellite=${SATELLITE}`)
+        .then(response => response.json())
+        .then(stats => {
+            const format = value => value === null ? '--' : value.toFixed(1);
+            table.innerHTML = Object.entries(stats.stages).map(([stage, values]) =>
+                `<tr><td>${stage}</td><td>${format(values.p50_ms)}</td>` +
+                `<td>${format(values.p99_ms)}</td><td>${values.count}</td></tr>`).join('');
+            const offset = stats.clock.offset;
+            document.getElementById('clock-offset').textContent =
+                offset === null ? '--' : `${offset.toFixed(3)} s (${stats.clock.samples} heartbeats)`;
+        })
+        .catch(error => console.error('Erro ao obter latência:', error));
+}
+
 // Inicializar todos os gráficos
 function initCharts() {
     // Inicializar gráfico principal de telemetria
@@ -114,6 +214,18 @@ function setupTelemetryButtons() {
     });
 }
 
+// Configurar o seletor de intervalo do histórico
+function setupHistoryRange() {
+    const select = document.getElementById('history-range');
+    if (!select) return;
+    
+    select.addEventListener('change', function() {
+        historyRange = parseInt(this.value, 10) || 0;
+        resetLiveSeries();
+        updateCharts();
+    });
+}
+
 // Inicializar gráfico de temperatura
 function initTemperatureChart() {
     const ctx = document.getElementById('temperatureChart').getContext('2d');
@@ -243,9 +355,26 @@ function initPowerConsumptionChart() {
 
 // Atualizar dados de todos os gráficos
 function updateCharts() {
+    if (historyRange === 0) {
+        fetchLiveSeries()
+            .then(buffers => {
+                if (!buffers) return;
+                const temperature = buffers['thermal/temperatures.json'];
+                const battery = buffers['power/battery.json'];
+                const consumption = buffers['power/consumption.json'];
+                updateTemperatureChart(temperature);
+                updateBatteryChart(battery);
+                updateAttitudeChart(buffers['adcs/attitude.json']);
+                updatePowerConsumptionChart(consumption);
+                const main = {temperature: temperature, battery: battery, power: consumption};
+                updateMainTelemetryChart(activeTelemetryChart, main[activeTelemetryChart]);
+            })
+            .catch(error => console.error('Erro ao obter histórico:', error));
+        return;
+    }
+
     // Temperatura
-    fetch('/api/history/thermal/temperatures.json')
-        .then(response => response.json())
+    fetchHistory('thermal', 'temperatures.json', 'internal')
         .then(data => {
             updateTemperatureChart(data);
             // Se o gráfico ativo for temperatura, também atualiza o gráfico principal
@@ -255,8 +384,7 @@ function updateCharts() {
         });
     
     // Bateria
-    fetch('/api/history/power/battery.json')
-        .then(response => response.json())
+    fetchHistory('power', 'battery.json', 'level')
         .then(data => {
             updateBatteryChart(data);
             // Se o gráfico ativo for bateria, também atualiza o gráfico principal
@@ -266,13 +394,11 @@ function updateCharts() {
         });
         
     // Atitude
-    fetch('/api/history/adcs/attitude.json')
-        .then(response => response.json())
+    fetchHistory('adcs', 'attitude.json', 'roll')
         .then(data => updateAttitudeChart(data));
         
     // Consumo de energia
-    fetch('/api/history/power/consumption.json')
-        .then(response => response.json())
+    fetchHistory('power', 'consumption.json', 'total_watts')
         .then(data => {
             updatePowerConsumptionChart(data);
             // Se o gráfico ativo for power, também atualiza o gráfico principal
@@ -396,7 +522,21 @@ function updatePowerConsumptionChart(data) {
 // Atualizar valores de status do sistema
 function updateSystemStatus(data) {
     if (!data) return;
-    
+
+    // Valores do painel de status direto da telemetria (sem esperar o próximo histórico)
+    if (data.thermal) {
+        const temp = data.thermal.internal || data.thermal.processor;
+        if (typeof temp === 'number') {
+            document.getElementById('temp-value').textContent = `${temp.toFixed(1)}°C`;
+        }
+    }
+    if (data.power && data.power.battery && typeof data.power.battery.level === 'number') {
+        document.getElementById('battery-value').textContent = `${data.power.battery.level.toFixed(1)}%`;
+    }
+    if (data.power && data.power.consumption && typeof data.power.consumption.total_watts === 'number') {
+        document.getElementById('power-value').textContent = `${data.power.consumption.total_watts.toFixed(2)}W`;
+    }
+
     // Atualizar latência e perda de pacotes quando dados estiverem disponíveis
     if (data.communication && data.communication.radio) {
         const radio = data.communication.radio;
@@ -413,6 +553,10 @@ function updateSystemStatus(data) {
         }
     }
     
+    if (typeof data.trace === 'number') {
+        acknowledgeRender(data.trace);
+    }
+
     // Atualizar modo ADCS quando disponível
     if (data.system && data.system.status && data.system.status.mode) {
         const adcsMode = document.getElementById('adcs-mode');
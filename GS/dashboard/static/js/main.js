@@ -1,5 +1,8 @@
+// Satélite acompanhado, escolhido pela URL (?satellite=2); sem o parâmetro, o satélite 1
+const SATELLITE = parseInt(new URLSearchParams(window.location.search).get('satellite') || '1', 10);
+
 // Initialize Socket.IO connection
-const socket = io();
+const socket = io({auth: {satellite: SATELLITE}});
 
 // A inicialização do gráfico foi movida para graphs.js
 // Variáveis mantidas para compatibilidade com código existente
@@ -9,18 +12,194 @@ let telemetryChart = null;
 document.addEventListener('DOMContentLoaded', function() {
     // Setup command form handler
     document.getElementById('command-form').addEventListener('submit', handleCommand);
+    document.getElementById('satellite-select').addEventListener('change', selectSatellite);
 });
 
+// Telemetria em modo delta: o servidor envia só os campos alterados desde o
+// último quadro confirmado (telemetry_ack) e keyframes periódicos
+// ('binary' usa anexos binários do Socket.IO; 'json' usa objetos)
+const TELEMETRY_ENCODING = 'binary';
+let telemetryFields = {};   // id -> caminho (modo binário)
+let telemetryStates = {};   // seq -> estado achatado, bases possíveis dos próximos deltas
+const textDecoder = new TextDecoder();
+
+// Inscrição por canal pela URL, ex.: ?channels=power,thermal@0.2,adcs.attitude@10
+// (taxa em Hz, 1 Hz se omitida); sem o parâmetro, recebe toda a telemetria
+const TELEMETRY_CHANNELS = parseChannelList(new URLSearchParams(window.location.search).get('channels'));
+let channelTelemetry = {};
+
+function parseChannelList(text) {
+    if (!text) return null;
+    const channels = {};
+    for (const item of text.split(',')) {
+        const [name, rate] = item.trim().split('@');
+        if (name) channels[name] = rate ? parseFloat(rate) : 1;
+    }
+    return channels;
+}
+
+// Chegada da última mensagem de telemetria (relógio local), para medir o desenho
+let telemetryReceivedAt = 0;
+
+// O servidor só envia a próxima mensagem de telemetria depois do ack da
+// anterior (callback do Socket.IO), confirmado após o processamento
+function withAck(handler) {
+    return (payload, ack) => {
+        telemetryReceivedAt = performance.now();
+        try {
+            handler(payload);
+        } finally {
+            if (typeof ack === 'function') ack();
+        }
+    };
+}
+
 // Socket event handlers
 socket.on('connect', () => {
     updateConnectionStatus(true);
+    telemetryStates = {};
+    if (TELEMETRY_CHANNELS) {
+        socket.emit('telemetry_channels', {channels: TELEMETRY_CHANNELS});
+    } else {
+        socket.emit('telemetry_subscribe', {encoding: TELEMETRY_ENCODING});
+    }
 });
 
+// Canal inscrito: JSON em bytes {channel: "power.battery", data: registro}
+socket.on('channel_update', withAck((payload) => {
+    const update = JSON.parse(textDecoder.decode(payload));
+    const keys = update.channel.split('.');
+    let node = channelTelemetry;
+    for (let i = 0; i < keys.length - 1; i++) {
+        node = node[keys[i]] = node[keys[i]] || {};
+    }
+    node[keys[keys.length - 1]] = update.data;
+    handleTelemetry(channelTelemetry);
+}));
+
+socket.on('telemetry_fields', withAck((fields) => {
+    Object.assign(telemetryFields, fields);
+}));
+
+socket.on('telemetry_frame', withAck((payload) => {
+    const frame = (payload instanceof ArrayBuffer) ? decodeTelemetryFrame(payload) : payload;
+
+    let base;
+    if (frame.key) {
+        base = {};
+    } else {
+        base = telemetryStates[frame.base];
+        if (!base) {
+            // Base desconhecida (ex.: reconexão): pede um keyframe
+            socket.emit('telemetry_resync');
+            return;
+        }
+    }
+    const state = Object.assign({}, base, frame.set);
+    for (const path of frame.del) delete state[path];
+
+    // O servidor nunca usa como base um quadro anterior ao desta mensagem
+    const oldest = frame.key ? frame.seq : frame.base;
+    for (const seq of Object.keys(telemetryStates)) {
+        if (Number(seq) < oldest) delete telemetryStates[seq];
+    }
+    telemetryStates[frame.seq] = state;
+    socket.emit('telemetry_ack', {seq: frame.seq});
+
+    handleTelemetry(unflattenTelemetry(state));
+}));
+
 socket.on('disconnect', () => {
     updateConnectionStatus(false);
 });
 
-socket.on('telemetry_update', (data) => {
+// Estado do enlace com o satélite, enviado pelo servidor a cada transição
+socket.on('status', (status) => {
+    if (status.satellite !== undefined && status.satellite !== SATELLITE) return;
+    updateLinkStatus(status);
+    const transition = status.transition;
+    if (transition) {
+        const outage = transition.outage !== undefined ? ` após ${transition.outage} s sem enlace` : '';
+        appendToLog(`Enlace: ${transition.previous} -> ${transition.state} (${transition.reason})${outage}`);
+    }
+});
+
+// Satélites conhecidos e estado do enlace de cada um (na conexão e a cada transição)
+socket.on('fleet', (satellites) => {
+    const select = document.getElementById('satellite-select');
+    if (!select) return;
+    select.innerHTML = Object.entries(satellites).map(([id, info]) =>
+        `<option value="${id}"${parseInt(id, 10) === SATELLITE ? ' selected' : ''}>` +
+        `SAT ${id} (${info.state})</option>`).join('');
+});
+
+// Troca de satélite: recarrega a página com o novo parâmetro na URL
+function selectSatellite(event) {
+    const params = new URLSearchParams(window.location.search);
+    params.set('satellite', event.target.value);
+    window.location.search = params.toString();
+}
+
+// Telemetria completa (clientes fora do modo delta e envio inicial na conexão)
+socket.on('telemetry_update', withAck((data) => {
+    handleTelemetry(data);
+}));
+
+// Decodifica um quadro binário: cabeçalho <BIIdH seguido de (id u16, tipo u8, valor)
+// (tipos: 0 número, 1 texto, 2 booleano, 3 nulo, 4 JSON, 5 campo removido)
+function decodeTelemetryFrame(buffer) {
+    const view = new DataView(buffer);
+    const frame = {
+        key: (view.getUint8(0) & 1) !== 0,
+        seq: view.getUint32(1, true),
+        base: view.getUint32(5, true),
+        t: view.getFloat64(9, true),
+        set: {},
+        del: []
+    };
+    const count = view.getUint16(17, true);
+    let pos = 19;
+    for (let i = 0; i < count; i++) {
+        const path = telemetryFields[view.getUint16(pos, true)];
+        const type = view.getUint8(pos + 2);
+        pos += 3;
+        if (type === 5) {
+            frame.del.push(path);
+            continue;
+        }
+        let value = null;
+        if (type === 0) {
+            value = view.getFloat64(pos, true);
+            pos += 8;
+        } else if (type === 2) {
+            value = view.getUint8(pos) !== 0;
+            pos += 1;
+        } else if (type === 1 || type === 4) {
+            const length = view.getUint16(pos, true);
+            const text = textDecoder.decode(new Uint8Array(buffer, pos + 2, length));
+            value = (type === 1) ? text : JSON.parse(text);
+            pos += 2 + length;
+        }
+        frame.set[path] = value;
+    }
+    return frame;
+}
+
+// Estado achatado ("power.battery.voltage") -> objeto aninhado
+function unflattenTelemetry(state) {
+    const telemetry = {};
+    for (const [path, value] of Object.entries(state)) {
+        const keys = path.split('.');
+        let node = telemetry;
+        for (let i = 0; i < keys.length - 1; i++) {
+            node = node[keys[i]] = node[keys[i]] || {};
+        }
+        node[keys[keys.length - 1]] = value;
+    }
+    return telemetry;
+}
+
+function handleTelemetry(data) {
     // Não precisamos mais chamar updateTelemetryChart aqui, pois agora usamos o graphs.js para isso
     // mas podemos usar os dados para atualizar outros indicadores
     
@@ -31,7 +210,7 @@ socket.on('telemetry_update', (data) => {
     if (window.updateSystemStatus && typeof window.updateSystemStatus === 'function') {
         window.updateSystemStatus(data);
     }
-});
+}
 
 // UI update functions
 function updateConnectionStatus(connected) {
@@ -45,6 +224,18 @@ function updateConnectionStatus(connected) {
     }
 }
 
+function updateLinkStatus(status) {
+    const badge = document.getElementById('link-status');
+    const link = status.link || {};
+    const state = link.state || (status.connected ? 'connected' : 'disconnected');
+    const colors = {connected: 'bg-success', lost: 'bg-danger', disconnected: 'bg-secondary'};
+    badge.textContent = `Link: ${state}`;
+    badge.classList.remove('bg-success', 'bg-danger', 'bg-secondary', 'bg-warning');
+    const late = state === 'connected' && link.heartbeat && link.heartbeat.late;
+    badge.classList.add(late ? 'bg-warning' : colors[state] || 'bg-secondary');
+    if (link.last_frame) badge.title = `Last frame: ${link.last_frame}`;
+}
+
 // Esta função é mantida apenas para compatibilidade, não usada mais
 function updateTelemetryChart(data) {
     console.log('Telemetria recebida:', data);
@@ -58,20 +249,70 @@ function updateSystemStatus(data) {
 }
 
 
+// Comando descrito pelo formulário
+function readCommandForm() {
+    const commandType = document.getElementById('command-type').value;
+    const commandParams = {};
+    if (commandType === 'ADCS') {
+        for (const axis of ['roll', 'pitch', 'yaw']) {
+            commandParams[axis] = parseFloat(document.getElementById(axis).value) || 0;
+        }
+    }
+    return {type: commandType, parameters: commandParams};
+}
+
 function handleCommand(event) {
     event.preventDefault();
     
-    const commandType = document.getElementById('command-type').value;
-    const commandParams = document.getElementById('command-params').value;
-
-    socket.emit('send_command', {
-        type: commandType,
-        parameters: commandParams
-    });
+    const command = readCommandForm();
+    socket.emit('send_command', command);
     
-    appendToLog(`Comando ${commandType} enviado ao satélite`);
+    appendToLog(`Comando ${command.type} enviado ao satélite`);
+}
+
+// Plano de comandos: enviado de uma vez, em lotes, com tick de execução opcional
+let commandPlan = [];
+
+function updatePlanCount() {
+    document.getElementById('plan-count').textContent = commandPlan.length;
 }
 
+document.addEventListener('DOMContentLoaded', function() {
+    document.getElementById('plan-add').addEventListener('click', function() {
+        const command = readCommandForm();
+        const execTick = parseInt(document.getElementById('exec-tick').value);
+        if (execTick > 0) command.exec_tick = execTick;
+        commandPlan.push(command);
+        updatePlanCount();
+        appendToLog(`Comando ${command.type} adicionado ao plano` + (execTick > 0 ? ` (tick ${execTick})` : ''));
+    });
+
+    document.getElementById('plan-send').addEventListener('click', function() {
+        if (commandPlan.length === 0) return;
+        socket.emit('send_command_plan', {commands: commandPlan});
+        appendToLog(`Plano com ${commandPlan.length} comando(s) enviado ao satélite`);
+        commandPlan = [];
+        updatePlanCount();
+    });
+});
+
+// Andamento dos comandos enviados por este cliente
+socket.on('command_status', (status) => {
+    let detail = '';
+    if (status.status === 'acked') {
+        detail = ` (${status.rtt_ms} ms, ${status.attempts} tentativa(s))`;
+    } else if (status.status === 'retransmitted') {
+        detail = ` (tentativa ${status.attempt})`;
+    } else if (status.error !== undefined) {
+        detail = ` (erro ${status.error})`;
+    }
+    if (status.plan_indices) {
+        detail += ` [plano: ${status.plan_indices.length} comando(s)]`;
+    }
+    const id = status.id !== undefined ? ` #${status.id}` : '';
+    appendToLog(`Comando ${status.command}${id}: ${status.status}${detail}`);
+});
+
 // Adicionar entradas ao log do sistema
 function appendToLog(message) {
     const logDisplay = document.getElementById('log-display');
@@ -0,0 +1,224 @@
+# Envio da telemetria aos clientes com codificação delta
+# /home/groundstation/projeto_final/GS/dashboard/telemetry_stream.py
+#
+# O estado da telemetria (o dicionário aninhado enviado em telemetry_update)
+# é achatado em caminhos "subsistema.canal.campo". Cada publicação gera um
+# quadro numerado; um cliente em modo delta recebe só os campos que mudaram
+# desde o último quadro que ele confirmou (telemetry_ack), e um keyframe com
+# o estado completo ao se inscrever, a cada KEYFRAME_INTERVAL quadros ou
+# quando a sua base não está mais disponível.
+#
+# Clientes que confirmaram o mesmo quadro recebem o mesmo delta: cada
+# combinação (base, codificação) é serializada uma única vez por quadro.
+#
+# Quadro JSON: {"seq", "base", "key", "t", "set": {caminho: valor}, "del": [caminho]}
+# Quadro binário (anexo Socket.IO): cabeçalho FRAME_HEADER seguido de
+# `count` campos (FIELD_HEADER + valor; removidos têm o tipo TYPE_DELETE e
+# nenhum valor); os caminhos são trocados por ids anunciados antes no
+# evento telemetry_fields.
+
+import json
+import struct
+import time
+from collections import OrderedDict
+
+KEYFRAME_INTERVAL = 30
+# Quadros mantidos para servir de base aos deltas
+SNAPSHOT_HISTORY = 64
+
+ENCODINGS = ("json", "binary")
+
+# flags (bit 0: keyframe), seq, base, t (epoch em ms), count
+FRAME_HEADER = struct.Struct("<BIIdH")
+# id do campo, tipo do valor
+FIELD_HEADER = struct.Struct("<HB")
+_F64 = struct.Struct("<d")
+_U16 = struct.Struct("<H")
+
+TYPE_NUMBER = 0
+TYPE_STRING = 1
+TYPE_BOOL = 2
+TYPE_NULL = 3
+TYPE_JSON = 4
+TYPE_DELETE = 5
+
+
+def flatten_state(state, prefix=""):
+    """Estado aninhado -> {caminho.com.pontos: valor}"""
+    flat = {}
+    for key, value in state.items():
+        if isinstance(value, dict) and value:
+            flat.update(flatten_state(value, f"{prefix}{key}."))
+        else:
+            flat[prefix + key] = value
+    return flat
+
+
+def diff_state(base, current):
+    """(campos de `current` novos ou alterados, caminhos de `base` que sumiram)"""
+    changed = {path: value for path, value in current.items()
+               if path not in base or base[path] != value}
+    removed = [path for path in base if path not in current]
+    return changed, removed
+
+
+def _encode_value(value):
+    if value is None:
+        return bytes((TYPE_NULL,)), b""
+    if isinstance(value, bool):
+        return bytes((TYPE_BOOL,)), bytes((int(value),))
+    if isinstance(value, (int, float)):
+        return bytes((TYPE_NUMBER,)), _F64.pack(value)
+    if isinstance(value, str):
+        data = value.encode("utf-8")
+        return bytes((TYPE_STRING,)), _U16.pack(len(data)) + data
+    data = json.dumps(value).encode("utf-8")
+    return bytes((TYPE_JSON,)), _U16.pack(len(data)) + data
+
+
+def encode_binary(frame, field_ids):
+    """Serializa um quadro no formato binário"""
+    parts = [FRAME_HEADER.pack(1 if frame["key"] else 0, frame["seq"], frame["base"],
+                               frame["t"], len(frame["set"]) + len(frame["del"]))]
+    for path, value in frame["set"].items():
+        value_type, data = _encode_value(value)
+        parts.append(_U16.pack(field_ids[path]) + value_type + data)
+    for path in frame["del"]:
+        parts.append(FIELD_HEADER.pack(field_ids[path], TYPE_DELETE))
+    return b"".join(parts)
+
+
+class _Client:
+    __slots__ = ("encoding", "acked", "key_seq", "frames", "keyframes", "bytes_sent")
+
+    def __init__(self, encoding):
+        self.encoding = encoding
+        self.acked = None     # Último quadro confirmado
+        self.key_seq = None   # Último keyframe enviado
+        self.frames = 0
+        self.keyframes = 0
+        # Só os quadros binários são medidos: os JSON são serializados pelo Socket.IO
+        self.bytes_sent = 0 if encoding == "binary" else None
+
+
+class TelemetryStream:
+    """Quadros delta por cliente sobre um estado de telemetria compartilhado.
+
+    `emit(evento, dados, sid)` envia a um cliente (ex.: socketio.emit com to=sid).
+    """
+
+    def __init__(self, emit, keyframe_interval=KEYFRAME_INTERVAL, history=SNAPSHOT_HISTORY):
+        self.emit = emit
+        self.keyframe_interval = keyframe_interval
+        self.history = history
+        self.seq = 0
+        self.snapshots = OrderedDict()  # seq -> estado achatado
+        self.field_ids = {}
+        self.clients = {}
+        self.encodes = 0
+        self.encode_reuses = 0
+
+    def _register_fields(self, flat):
+        # Novos caminhos ganham ids e são anunciados aos clientes binários
+        new = {}
+        for path in flat:
+            if path not in self.field_ids:
+                self.field_ids[path] = len(self.field_ids)
+                new[self.field_ids[path]] = path
+        if new:
+            for sid, client in self.clients.items():
+                if client.encoding == "binary":
+                    self.emit('telemetry_fields', new, sid)
+
+    def subscribe(self, sid, encoding="json"):
+        """Coloca um cliente em modo delta; ele recebe um keyframe em seguida"""
+        if encoding not in ENCODINGS:
+            raise ValueError(f"Codificação desconhecida: {encoding}")
+        client = self.clients[sid] = _Client(encoding)
+        if encoding == "binary":
+            self.emit('telemetry_fields', {i: path for path, i in self.field_ids.items()}, sid)
+        if self.snapshots:
+            self._send(sid, client, self.seq, self.snapshots[self.seq], {})
+
+    def unsubscribe(self, sid):
+        self.clients.pop(sid, None)
+
+    def resync(self, sid):
+        """Pedido do cliente por um keyframe (ex.: perdeu a base de um delta)"""
+        client = self.clients.get(sid)
+        if client is not None:
+            client.acked = None
+            if self.snapshots:
+                self._send(sid, client, self.seq, self.snapshots[self.seq], {})
+
+    def ack(self, sid, seq):
+        """Confirmação do cliente: o quadro `seq` passa a ser a sua base"""
+        client = self.clients.get(sid)
+        if client is None or not isinstance(seq, int) or seq not in self.snapshots:
+            return
+        if client.acked is None or seq > client.acked:
+            client.acked = seq
+
+    def publish(self, state):
+        """Gera um quadro com o estado atual e o envia aos clientes em modo delta"""
+        flat = flatten_state(state)
+        self._register_fields(flat)
+        self.seq += 1
+        self.snapshots[self.seq] = flat
+        while len(self.snapshots) > self.history:
+            self.snapshots.popitem(last=False)
+
+        cache = {}
+        for sid, client in self.clients.items():
+            self._send(sid, client, self.seq, flat, cache)
+
+    def _send(self, sid, client, seq, flat, cache):
+        # Delta só sobre uma base confirmada, ainda guardada e não anterior ao último keyframe
+        base = client.acked
+        keyframe = (base is None or client.key_seq is None or
+                    base not in self.snapshots or base < client.key_seq or
+                    seq - client.key_seq >= self.keyframe_interval)
+        cache_key = (None if keyframe else base, client.encoding)
+        cached = cache.get(cache_key)
+        if cached is None:
+            changed, removed = (flat, []) if keyframe else diff_state(self.snapshots[base], flat)
+            frame = {
+                "seq": seq,
+                "base": 0 if keyframe else base,
+                "key": keyframe,
+                "t": time.time() * 1000,
+                "set": changed,
+                "del": removed
+            }
+            if client.encoding == "binary":
+                payload = encode_binary(frame, self.field_ids)
+                size = len(payload)
+            else:
+                payload = frame
+                size = None
+            cached = cache[cache_key] = (payload, size)
+            self.encodes += 1
+        else:
+            self.encode_reuses += 1
+        payload, size = cached
+
+        if keyframe:
+            client.key_seq = seq
+            client.keyframes += 1
+        client.frames += 1
+        if size is not None:
+            client.bytes_sent += size
+        self.emit('telemetry_frame', payload, sid)
+
+    def stats(self):
+        return {
+            "seq": self.seq,
+            "fields": len(self.field_ids),
+            "encodes": self.encodes,
+            "encode_reuses": self.encode_reuses,
+            "clients": {
+                sid: {"encoding": c.encoding, "acked": c.acked, "frames": c.frames,
+                      "keyframes": c.keyframes, "bytes_sent": c.bytes_sent}
+                for sid, c in self.clients.items()
+            }
+        }
@@ -0,0 +1,134 @@
+# Pool limitado de threads para o trabalho bloqueante do dashboard
+# /home/groundstation/projeto_final/GS/dashboard/worker_pool.py
+#
+# Leitura de logs, interpretação de JSON e consultas de histórico não podem
+# rodar no hub do eventlet: enquanto rodam, nenhuma conexão Socket.IO é
+# atendida. `run()` executa a função numa thread do tpool do eventlet e
+# suspende só a greenlet que chamou.
+#
+# O pool é limitado: além de MAX_PENDING tarefas (executando ou na fila do
+# tpool) novas chamadas falham na hora com PoolBusy, e uma tarefa que passa
+# de `timeout` segundos faz a greenlet desistir com PoolTimeout (a thread
+# termina o trabalho, que é descartado, e a vaga só é liberada então).
+#
+# O trabalho ao vivo (logs alterados, telemetria do ingest, carga inicial)
+# usa `reserved=True`: não entra no limite de MAX_PENDING e tem
+# RESERVED_THREADS threads só para ele, porque as demais tarefas esperam
+# por uma das outras threads no hub, fora da fila do tpool. Uma rajada de
+# consultas de histórico recebe PoolBusy, mas não atrasa a telemetria.
+#
+# Threads Python ainda disputam o GIL, mas o interpretador alterna entre
+# elas a cada poucos ms: uma rajada de consultas atrasa o hub por pouco
+# tempo em vez de congelá-lo (ver gs_hub_lag_seconds em /metrics).
+
+import threading
+from time import perf_counter
+
+import eventlet
+from eventlet import tpool
+from eventlet.semaphore import Semaphore
+from eventlet.timeout import Timeout
+
+import metrics
+
+WORKER_THREADS = 4
+RESERVED_THREADS = 1
+MAX_PENDING = 16
+TASK_TIMEOUT = 10.0
+
+ACTIVE = metrics.Gauge("gs_worker_pool_active", "Tarefas no pool (executando ou aguardando thread)")
+REJECTED = metrics.Counter("gs_worker_pool_rejected_total", "Tarefas recusadas com o pool cheio")
+TIMEOUTS = metrics.Counter("gs_worker_pool_timeouts_total", "Tarefas abandonadas por timeout")
+WAIT_SECONDS = metrics.Histogram("gs_worker_pool_wait_seconds", "Espera por uma thread do pool")
+RUN_SECONDS = metrics.Histogram(
+    "gs_worker_pool_run_seconds", "Duração das tarefas do pool", ("task",))
+
+
+class PoolBusy(Exception):
+    """O pool já tem MAX_PENDING tarefas"""
+
+
+class PoolTimeout(Exception):
+    """A tarefa não terminou dentro do prazo"""
+
+
+class WorkerPool:
+    def __init__(self, threads=WORKER_THREADS, max_pending=MAX_PENDING, timeout=TASK_TIMEOUT,
+                 reserved_threads=RESERVED_THREADS):
+        # Precisa vir antes do primeiro uso do tpool
+        tpool.set_num_threads(threads)
+        self.threads = threads
+        self.reserved_threads = reserved_threads
+        # Vagas no tpool das tarefas comuns; as demais threads ficam para as reservadas
+        self._shared = Semaphore(max(1, threads - reserved_threads))
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self.active = 0
+        self.completed = 0
+        self.rejected = 0
+        self.timeouts = 0
+        ACTIVE.set_function(lambda: self.active)
+
+    def run(self, function, *args, timeout=None, reserved=False, **kwargs):
+        """Executa `function(*args, **kwargs)` numa thread do pool e retorna o resultado.
+
+        Levanta PoolBusy se o pool estiver cheio (nunca com `reserved`) e
+        PoolTimeout se a tarefa passar de `timeout` segundos (padrão: o do pool).
+        """
+        with self._lock:
+            if not reserved and self.active >= self.max_pending:
+                self.rejected += 1
+                REJECTED.inc()
+                raise PoolBusy(f"Pool ocupado ({self.active} tarefas)")
+            self.active += 1
+        submitted = perf_counter()
+        started = False
+        try:
+            with Timeout(self.timeout if timeout is None else timeout, PoolTimeout):
+                if not reserved:
+                    self._shared.acquire()
+                started = True
+                # Numa greenlet própria: se esta desistir, aquela ainda espera a
+                # thread terminar para liberar a vaga
+                worker = eventlet.spawn(self._execute, function, args, kwargs, submitted, not reserved)
+                return worker.wait()
+        except PoolTimeout:
+            if not started:
+                # Desistiu antes de chegar ao tpool: _call não vai rodar
+                with self._lock:
+                    self.active -= 1
+            self.timeouts += 1
+            TIMEOUTS.inc()
+            raise PoolTimeout(f"{getattr(function, '__name__', function)} passou de "
+                              f"{self.timeout if timeout is None else timeout:g} s")
+
+    def _execute(self, function, args, kwargs, submitted, shared):
+        try:
+            return tpool.execute(self._call, function, args, kwargs, submitted)
+        finally:
+            if shared:
+                self._shared.release()
+
+    def _call(self, function, args, kwargs, submitted):
+        # Executa na thread do pool
+        start = perf_counter()
+        WAIT_SECONDS.observe(start - submitted)
+        try:
+            return function(*args, **kwargs)
+        finally:
+            RUN_SECONDS.labels(getattr(function, "__name__", "task")).observe(perf_counter() - start)
+            with self._lock:
+                self.active -= 1
+                self.completed += 1
+
+    def stats(self):
+        return {
+            "threads": self.threads,
+            "reserved_threads": self.reserved_threads,
+            "max_pending": self.max_pending,
+            "active": self.active,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "timeouts": self.timeouts
+        }
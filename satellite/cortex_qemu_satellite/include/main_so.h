@@ -16,6 +16,9 @@
 #define COMMAND_QUEUE_LENGTH 10
 #define TELEMETRY_QUEUE_LENGTH 20
 
+// Comandos com horário de execução aguardando no MAIN_SO
+#define MAX_SCHEDULED_COMMANDS 16
+
 // Command types
 typedef enum {
     CMD_ADCS_CONTROL,
@@ -28,6 +31,7 @@ typedef struct {
     CommandType type;
     void* parameters;
     size_t param_size;
+    TickType_t exec_tick;   // Tick de execução (0 = imediato)
 } Command;
 
 // Task handles
@@ -14,6 +14,8 @@
 #define MSG_TYPE_TELEMETRY_DATA   0x03
 #define MSG_TYPE_ACK              0x04
 #define MSG_TYPE_ERROR            0x05
+#define MSG_TYPE_CMD_BATCH        0x06
+#define MSG_TYPE_HELLO            0x07
 #define MSG_TYPE_HEARTBEAT        0xFF
 
 // Control flags
@@ -27,6 +29,7 @@
 #define ERR_TIMEOUT             0x03
 #define ERR_INVALID_PARAMS      0x04
 #define ERR_INVALID_STATE       0x05
+#define ERR_QUEUE_FULL          0x06  // Lote válido sem espaço na fila de comandos
 
 // Estrutura do cabeçalho comum
 typedef struct {
@@ -44,6 +47,36 @@ typedef struct {
     float yaw;     // Ângulo de guinada desejado
 } ADCSCommand;
 
+// Lote de comandos (MSG_TYPE_CMD_BATCH): cabeçalho seguido de `count`
+// entradas, cada uma com os seus `length` bytes de parâmetros logo após
+typedef struct {
+    uint8_t  count;        // Número de comandos no lote
+    uint8_t  reserved[3];
+} CommandBatchHeader;
+
+typedef struct {
+    uint8_t  type;         // MSG_TYPE_ADCS_CMD ou MSG_TYPE_TELEMETRY_REQ
+    uint8_t  length;       // Bytes de parâmetros após a entrada
+    uint16_t reserved;
+    uint32_t exec_tick;    // Tick de execução no satélite (0 = imediato)
+} CommandBatchEntry;
+
+// Chamado para cada comando de um lote válido; retorno != 0 interrompe
+typedef int (*CommandBatchHandler)(const CommandBatchEntry *entry, const uint8_t *params, void *context);
+
+// Dados do heartbeat do satélite: tick do envio, para a GS estimar o offset
+// entre o tick e o seu relógio (heartbeats vazios continuam válidos)
+typedef struct {
+    uint32_t tick;         // xTaskGetTickCount() no envio
+} HeartbeatData;
+
+// Identificação do satélite (MSG_TYPE_HELLO): opcional, primeira mensagem
+// da conexão numa constelação; sem ela a GS usa o satélite 1
+typedef struct {
+    uint16_t satellite_id;  // Identificador na constelação (1-65535)
+    uint16_t reserved;
+} HelloData;
+
 // Estrutura de dados de telemetria
 typedef struct {
     uint32_t timestamp;     // Timestamp em milissegundos
@@ -63,5 +96,6 @@ uint16_t calculate_crc16(const uint8_t *data, size_t length);
 int validate_message(const MessageHeader *header, const uint8_t *data);
 int create_message(uint8_t type, uint8_t flags, const void *data, size_t data_length, uint8_t *buffer);
 int process_message(const uint8_t *buffer, size_t length);
+int parse_command_batch(const uint8_t *data, size_t length, CommandBatchHandler handler, void *context);
 
 #endif // PROTOCOL_H
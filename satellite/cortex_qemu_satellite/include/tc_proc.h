@@ -13,5 +13,6 @@
 // Function declarations
 void vTCProcTask(void *pvParameters);
 BaseType_t xProcessCommand(Command* command);
+int xProcessCommandBatch(const uint8_t* buffer, size_t length);
 
 #endif /* TC_PROC_H */
@@ -2,6 +2,7 @@
 #include "task.h"
 #include "lwip/sockets.h"
 #include "protocol.h"
+#include "tc_proc.h"
 #include <string.h>
 
 #define BUFFER_SIZE 1024
@@ -11,6 +12,7 @@
 
 static int sock = -1;
 static uint8_t rx_buffer[BUFFER_SIZE];
+static size_t rx_length = 0;  // Bytes em rx_buffer (mensagem incompleta no início)
 static uint8_t tx_buffer[BUFFER_SIZE];
 
 static bool connect_to_ground_station(const char *gs_ip) {
@@ -43,7 +45,8 @@ static bool connect_to_ground_station(const char *gs_ip) {
 }
 
 static void send_heartbeat(void) {
-    int msg_len = create_message(MSG_TYPE_HEARTBEAT, 0, NULL, 0, tx_buffer);
+    HeartbeatData heartbeat = { .tick = (uint32_t)xTaskGetTickCount() };
+    int msg_len = create_message(MSG_TYPE_HEARTBEAT, 0, &heartbeat, sizeof(heartbeat), tx_buffer);
     if (msg_len > 0) {
         send(sock, tx_buffer, msg_len, 0);
     }
@@ -51,9 +54,15 @@ static void send_heartbeat(void) {
 
 static void handle_received_message(const uint8_t *buffer, size_t length) {
     int result = process_message(buffer, length);
+    const MessageHeader *header = (MessageHeader *)buffer;
+
+    // Lote válido: os comandos são enfileirados aqui, e o ERROR após o ACK
+    // informa se não couberam na fila (o lote tem um único dono, esta task)
+    if (result == 0 && header->type == MSG_TYPE_CMD_BATCH) {
+        result = xProcessCommandBatch(buffer, length);
+    }
     
     // If message requires ACK, send it
-    const MessageHeader *header = (MessageHeader *)buffer;
     if (header->flags & FLAG_REQUIRES_ACK) {
         int msg_len = create_message(MSG_TYPE_ACK, 0, &header->type, sizeof(uint8_t), tx_buffer);
         if (msg_len > 0) {
@@ -71,6 +80,41 @@ static void handle_received_message(const uint8_t *buffer, size_t length) {
     }
 }
 
+// Processa todas as mensagens completas de rx_buffer: a GS envia vários
+// comandos seguidos (janela de ACKs) e o TCP pode juntá-los numa leitura.
+// Os bytes de uma mensagem incompleta ficam no início para a próxima leitura.
+static void process_rx_buffer(void) {
+    size_t pos = 0;
+
+    while (rx_length - pos >= sizeof(MessageHeader)) {
+        if (rx_buffer[pos] != SYNC_BYTE1 || rx_buffer[pos + 1] != SYNC_BYTE2) {
+            // Ressincroniza no próximo par de sync bytes
+            pos++;
+            continue;
+        }
+
+        MessageHeader header;
+        memcpy(&header, rx_buffer + pos, sizeof(header));
+        size_t frame_length = sizeof(MessageHeader) + header.length;
+        if (frame_length > BUFFER_SIZE) {
+            // Comprimento impossível: procura o próximo sync
+            pos++;
+            continue;
+        }
+        if (rx_length - pos < frame_length) {
+            break;
+        }
+
+        handle_received_message(rx_buffer + pos, frame_length);
+        pos += frame_length;
+    }
+
+    if (pos > 0) {
+        memmove(rx_buffer, rx_buffer + pos, rx_length - pos);
+        rx_length -= pos;
+    }
+}
+
 void comm_task(void *pvParameters) {
     const char *gs_ip = (const char *)pvParameters;
     TickType_t last_heartbeat = xTaskGetTickCount();
@@ -82,6 +126,7 @@ void comm_task(void *pvParameters) {
                 vTaskDelay(pdMS_TO_TICKS(RECONNECT_DELAY_MS));
                 continue;
             }
+            rx_length = 0;
         }
         
         // Send periodic heartbeat
@@ -111,7 +156,7 @@ void comm_task(void *pvParameters) {
         }
         
         if (activity > 0 && FD_ISSET(sock, &readfds)) {
-            int bytes_received = recv(sock, rx_buffer, BUFFER_SIZE, 0);
+            int bytes_received = recv(sock, rx_buffer + rx_length, BUFFER_SIZE - rx_length, 0);
             
             if (bytes_received <= 0) {
                 // Connection closed or error
@@ -120,7 +165,8 @@ void comm_task(void *pvParameters) {
                 continue;
             }
             
-            handle_received_message(rx_buffer, bytes_received);
+            rx_length += bytes_received;
+            process_rx_buffer();
         }
         
         // Allow other tasks to run
@@ -9,6 +9,79 @@
 static volatile uint32_t watchdogCounters[4] = {0};
 static const uint32_t WATCHDOG_TIMEOUT = 5000; // 5 segundos em ticks
 
+// Comandos com horário de execução ainda no futuro, na ordem de chegada
+static Command scheduledCommands[MAX_SCHEDULED_COMMANDS];
+static UBaseType_t uxScheduledCount = 0;
+
+// Indica se o tick de execução já chegou (considerando o overflow do contador)
+static BaseType_t prvIsDue(TickType_t execTick, TickType_t now)
+{
+    return execTick == 0 || (TickType_t)(now - execTick) < (portMAX_DELAY / 2);
+}
+
+static void prvExecuteCommand(Command *command)
+{
+    // Processar comando recebido
+    switch(command->type)
+    {
+        case CMD_ADCS_CONTROL:
+            if(xSemaphoreTake(xResourceMutex, portMAX_DELAY) == pdTRUE)
+            {
+                // Atualizar atitude do satélite
+                xUpdateAttitude((float*)command->parameters);
+                xSemaphoreGive(xResourceMutex);
+                
+                // Liberar memória do comando
+                if(command->parameters != NULL)
+                {
+                    vPortFree(command->parameters);
+                }
+            }
+            break;
+
+        case CMD_TELEMETRY_REQUEST:
+            // Solicitar telemetria atualizada
+            if(xSemaphoreTake(xResourceMutex, portMAX_DELAY) == pdTRUE)
+            {
+                TelemetryPacket packet;
+                ADCSStatus adcsStatus = xGetADCSStatus();
+                
+                // Preencher pacote de telemetria
+                packet.timestamp = xTaskGetTickCount();
+                packet.adcs_status = adcsStatus;
+                
+                // Enviar telemetria
+                xSendTelemetry(&packet);
+                xSemaphoreGive(xResourceMutex);
+            }
+            break;
+
+        default:
+            // Comando desconhecido
+            break;
+    }
+}
+
+// Executa, na ordem de chegada, os comandos agendados cujo tick chegou
+static void prvRunScheduledCommands(void)
+{
+    TickType_t now = xTaskGetTickCount();
+    UBaseType_t kept = 0;
+
+    for(UBaseType_t i = 0; i < uxScheduledCount; i++)
+    {
+        if(prvIsDue(scheduledCommands[i].exec_tick, now))
+        {
+            prvExecuteCommand(&scheduledCommands[i]);
+        }
+        else
+        {
+            scheduledCommands[kept++] = scheduledCommands[i];
+        }
+    }
+    uxScheduledCount = kept;
+}
+
 void vMainSOTask(void *pvParameters)
 {
     Command command;
@@ -22,52 +95,28 @@ void vMainSOTask(void *pvParameters)
     // Task main loop
     for(;;)
     {
-        // Verificar se há comandos pendentes
-        status = xQueueReceive(xCommandQueue, &command, pdMS_TO_TICKS(100));
-        
-        if(status == pdPASS)
+        // Verificar se há comandos pendentes (só se houver espaço para agendá-los;
+        // senão ficam na fila, em ordem, até os agendados serem executados)
+        if(uxScheduledCount < MAX_SCHEDULED_COMMANDS)
         {
-            // Processar comando recebido
-            switch(command.type)
+            status = xQueueReceive(xCommandQueue, &command,
+                                   pdMS_TO_TICKS(uxScheduledCount > 0 ? 10 : 100));
+            
+            if(status == pdPASS)
             {
-                case CMD_ADCS_CONTROL:
-                    if(xSemaphoreTake(xResourceMutex, portMAX_DELAY) == pdTRUE)
-                    {
-                        // Atualizar atitude do satélite
-                        status = xUpdateAttitude((float*)command.parameters);
-                        xSemaphoreGive(xResourceMutex);
-                        
-                        // Liberar memória do comando
-                        if(command.parameters != NULL)
-                        {
-                            vPortFree(command.parameters);
-                        }
-                    }
-                    break;
-
-                case CMD_TELEMETRY_REQUEST:
-                    // Solicitar telemetria atualizada
-                    if(xSemaphoreTake(xResourceMutex, portMAX_DELAY) == pdTRUE)
-                    {
-                        TelemetryPacket packet;
-                        ADCSStatus adcsStatus = xGetADCSStatus();
-                        
-                        // Preencher pacote de telemetria
-                        packet.timestamp = xTaskGetTickCount();
-                        packet.adcs_status = adcsStatus;
-                        
-                        // Enviar telemetria
-                        xSendTelemetry(&packet);
-                        xSemaphoreGive(xResourceMutex);
-                    }
-                    break;
-
-                default:
-                    // Comando desconhecido
-                    break;
+                if(prvIsDue(command.exec_tick, xTaskGetTickCount()))
+                {
+                    prvExecuteCommand(&command);
+                }
+                else
+                {
+                    scheduledCommands[uxScheduledCount++] = command;
+                }
             }
         }
 
+        prvRunScheduledCommands();
+
         // Monitorar watchdog das tasks
         watchdogCounters[0]++; // MAIN_SO
 
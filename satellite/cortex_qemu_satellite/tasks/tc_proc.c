@@ -1,6 +1,7 @@
 #include <string.h>
 #include "tc_proc.h"
 #include "tcp_client.h"
+#include "protocol.h"
 
 // Buffer for receiving commands
 static uint8_t commandBuffer[256];
@@ -26,7 +27,13 @@ void vTCProcTask(void *pvParameters)
         // Wait for incoming command from Ground Station
         status = xTCPReceive(commandBuffer, sizeof(commandBuffer), &received);
         
-        if (status == TCP_OK && received > 0)
+        if (status == TCP_OK && received >= sizeof(MessageHeader) &&
+            commandBuffer[0] == SYNC_BYTE1 && commandBuffer[1] == SYNC_BYTE2)
+        {
+            // Mensagens do protocolo (inclusive lotes de comandos) são do
+            // comm_task, que responde com ACK/ERROR; aqui só os comandos simples
+        }
+        else if (status == TCP_OK && received > 0)
         {
             // Parse received command
             if (xProcessCommand(&command) == pdPASS)
@@ -88,3 +95,70 @@ BaseType_t xProcessCommand(Command* command)
     *command = newCommand;
     return pdPASS;
 }
+
+// Enfileira um comando de um lote (chamado em ordem por parse_command_batch)
+static int prvEnqueueBatchEntry(const CommandBatchEntry *entry, const uint8_t *params, void *context)
+{
+    (void)context;
+    Command newCommand = {0};
+
+    newCommand.type = (entry->type == MSG_TYPE_ADCS_CMD) ? CMD_ADCS_CONTROL : CMD_TELEMETRY_REQUEST;
+    newCommand.exec_tick = (TickType_t)entry->exec_tick;
+
+    if (entry->length > 0)
+    {
+        newCommand.parameters = pvPortMalloc(entry->length);
+        if (newCommand.parameters == NULL)
+        {
+            return ERR_INVALID_STATE;
+        }
+        memcpy(newCommand.parameters, params, entry->length);
+        newCommand.param_size = entry->length;
+    }
+
+    // Sem espera: o espaço do lote inteiro foi verificado antes
+    if (xQueueSend(xCommandQueue, &newCommand, 0) != pdPASS)
+    {
+        if (newCommand.parameters != NULL)
+        {
+            vPortFree(newCommand.parameters);
+        }
+        return ERR_QUEUE_FULL;
+    }
+    return 0;
+}
+
+int xProcessCommandBatch(const uint8_t* buffer, size_t length)
+{
+    const MessageHeader *header = (const MessageHeader *)buffer;
+    const uint8_t *data = buffer + sizeof(MessageHeader);
+
+    if (length < sizeof(MessageHeader) || header->length > length - sizeof(MessageHeader))
+    {
+        return ERR_INVALID_PARAMS;
+    }
+
+    int result = validate_message(header, data);
+    if (result != 0)
+    {
+        return result;
+    }
+    if (header->type != MSG_TYPE_CMD_BATCH)
+    {
+        return ERR_INVALID_COMMAND;
+    }
+
+    // O lote só é enfileirado se couber inteiro na fila do MAIN_SO (os comandos
+    // agendados além de MAX_SCHEDULED_COMMANDS esperam nela, em ordem)
+    result = parse_command_batch(data, header->length, NULL, NULL);
+    if (result != 0)
+    {
+        return result;
+    }
+    if (((const CommandBatchHeader *)data)->count > uxQueueSpacesAvailable(xCommandQueue))
+    {
+        return ERR_QUEUE_FULL;
+    }
+
+    return parse_command_batch(data, header->length, prvEnqueueBatchEntry, NULL);
+}
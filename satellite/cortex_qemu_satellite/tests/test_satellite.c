@@ -3,6 +3,7 @@
 #include "tc_proc.h"
 #include "adcs_proc.h"
 #include "tm_proc.h"
+#include "protocol.h"
 
 void setUp(void)
 {
@@ -46,6 +47,64 @@ void test_TC_ProcessCommand(void)
     TEST_ASSERT_FLOAT_WITHIN(0.1f, 1.0f, params[0]);
 }
 
+static int batchCount;
+static uint32_t batchTicks[4];
+
+static int countBatchEntry(const CommandBatchEntry *entry, const uint8_t *params, void *context)
+{
+    (void)params;
+    (void)context;
+    batchTicks[batchCount++] = entry->exec_tick;
+    return 0;
+}
+
+void test_Protocol_ParseCommandBatch(void)
+{
+    uint8_t batch[sizeof(CommandBatchHeader) + 2 * sizeof(CommandBatchEntry) + sizeof(ADCSCommand)] = {0};
+    CommandBatchEntry entry = {0};
+    ADCSCommand adcs = {1.0f, 0.0f, 0.0f};
+    size_t offset = sizeof(CommandBatchHeader);
+
+    batch[0] = 2; // count
+    entry.type = MSG_TYPE_ADCS_CMD;
+    entry.length = sizeof(ADCSCommand);
+    entry.exec_tick = 5000;
+    memcpy(batch + offset, &entry, sizeof(entry));
+    offset += sizeof(entry);
+    memcpy(batch + offset, &adcs, sizeof(adcs));
+    offset += sizeof(adcs);
+    entry.type = MSG_TYPE_TELEMETRY_REQ;
+    entry.length = 0;
+    entry.exec_tick = 0;
+    memcpy(batch + offset, &entry, sizeof(entry));
+
+    // Lote válido: entradas entregues na ordem
+    batchCount = 0;
+    TEST_ASSERT_EQUAL(0, parse_command_batch(batch, sizeof(batch), countBatchEntry, NULL));
+    TEST_ASSERT_EQUAL(2, batchCount);
+    TEST_ASSERT_EQUAL_UINT32(5000, batchTicks[0]);
+    TEST_ASSERT_EQUAL_UINT32(0, batchTicks[1]);
+
+    // Lote truncado: nenhuma entrada entregue
+    batchCount = 0;
+    TEST_ASSERT_EQUAL(ERR_INVALID_PARAMS, parse_command_batch(batch, sizeof(batch) - 1, countBatchEntry, NULL));
+    TEST_ASSERT_EQUAL(0, batchCount);
+}
+
+void test_Protocol_HeartbeatTick(void)
+{
+    uint8_t buffer[sizeof(MessageHeader) + sizeof(HeartbeatData)];
+    HeartbeatData heartbeat = { .tick = 123456 };
+    HeartbeatData received;
+
+    // O heartbeat leva o tick do envio e continua sendo uma mensagem válida
+    int length = create_message(MSG_TYPE_HEARTBEAT, 0, &heartbeat, sizeof(heartbeat), buffer);
+    TEST_ASSERT_EQUAL(sizeof(buffer), length);
+    TEST_ASSERT_EQUAL(0, process_message(buffer, length));
+    memcpy(&received, buffer + sizeof(MessageHeader), sizeof(received));
+    TEST_ASSERT_EQUAL_UINT32(123456, received.tick);
+}
+
 void test_TM_SendTelemetry(void)
 {
     TelemetryPacket packet;
@@ -88,6 +147,8 @@ int main(void)
     
     RUN_TEST(test_ADCS_UpdateAttitude);
     RUN_TEST(test_TC_ProcessCommand);
+    RUN_TEST(test_Protocol_ParseCommandBatch);
+    RUN_TEST(test_Protocol_HeartbeatTick);
     RUN_TEST(test_TM_SendTelemetry);
     RUN_TEST(test_TCP_Communication);
     
@@ -2,82 +2,10 @@
 # Script para gerar telemetria simulada diretamente para o dashboard
 # /home/istec/projeto_final/satellite/generate_telemetry.py
 
-import json
 import time
 import random
-import os
-import subprocess
-from datetime import datetime
-from pathlib import Path
 
-# IP e diretório da Ground Station
-GS_IP = "192.168.1.96"
-GS_LOGS_DIR = "/home/groundstation/projeto_final/GS/logs"
-GS_USER = "groundstation"  # Nome de usuário na VMGS
-
-def generate_timestamp():
-    """Gera um timestamp no formato ISO8601"""
-    return datetime.now().isoformat()
-
-def write_log_to_gs(category, filename, data):
-    """Escreve um arquivo de log na VMGS via SCP, mantendo histórico"""
-    log_path = f"{GS_LOGS_DIR}/{category}/{filename}"
-    timestamp = generate_timestamp()
-    
-    # Nova entrada de log
-    log_entry = {
-        "timestamp": timestamp,
-        **data
-    }
-    
-    # Criar diretório localmente primeiro
-    local_temp_dir = "/tmp/sat_logs"
-    local_category_dir = f"{local_temp_dir}/{category}"
-    os.makedirs(local_category_dir, exist_ok=True)
-    
-    # Nome de arquivo temporário local
-    local_file = f"{local_category_dir}/{filename}"
-    
-    try:
-        # Tentar carregar logs existentes
-        try:
-            # Copiar arquivo da VMGS para local se existir
-            subprocess.run([
-                "scp", 
-                "-o", "StrictHostKeyChecking=no",
-                f"{GS_USER}@{GS_IP}:{log_path}", 
-                local_file
-            ], check=False, capture_output=True)
-            
-            with open(local_file, 'r') as f:
-                log_data = json.load(f)
-                
-            if not isinstance(log_data, list):
-                log_data = [log_data]
-        except (FileNotFoundError, json.JSONDecodeError, subprocess.CalledProcessError):
-            # Criar novo array se não existir ou não for válido
-            log_data = []
-            
-        # Adicionar nova entrada e limitar a 100 entradas
-        log_data.append(log_entry)
-        if len(log_data) > 100:
-            log_data = log_data[-100:]
-            
-        # Salvar localmente
-        with open(local_file, 'w') as f:
-            json.dump(log_data, f, indent=2)
-            
-        # Copiar para a VMGS
-        subprocess.run([
-            "scp", 
-            "-o", "StrictHostKeyChecking=no",
-            local_file, 
-            f"{GS_USER}@{GS_IP}:{log_path}"
-        ], check=True)
-        
-        print(f"Log {category}/{filename} enviado com sucesso")
-    except Exception as e:
-        print(f"Erro ao escrever log {category}/{filename}: {e}")
+from gs_logs import GS_IP, GS_LOGS_DIR, write_log_to_gs
 
 def main():
     print("Iniciando gerador de telemetria simulada...")
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+# Envio de registros de log para a Ground Station (formato segmentado)
+# /home/istec/projeto_final/satellite/gs_logs.py
+#
+# Os logs na VMGS são streams append-only (ver GS/dashboard/segment_log.py).
+# Cada amostra é apenas acrescentada no fim do segmento ativo: não há mais
+# download, reescrita e upload do histórico inteiro a cada registro.
+
+import json
+import shlex
+import subprocess
+from datetime import datetime
+
+# IP e diretório da Ground Station
+GS_IP = "192.168.1.96"
+GS_USER = "groundstation"  # Nome de usuário na VMGS
+GS_LOGS_DIR = "/home/groundstation/projeto_final/GS/logs"
+GS_SEGMENT_LOG = "/home/groundstation/projeto_final/GS/dashboard/segment_log.py"
+
+# Número de registros mantidos por stream na VMGS (antes: 100 fixos)
+LOG_RETENTION = 10000
+
+SSH_OPTIONS = ["-o", "StrictHostKeyChecking=no", "-o", "UserKnownHostsFile=/dev/null"]
+
+
+def generate_timestamp():
+    """Gera um timestamp no formato ISO8601"""
+    return datetime.now().isoformat()
+
+
+def append_command(category, filename):
+    """Comando remoto que acrescenta registros NDJSON (stdin) a um stream"""
+    return " ".join(shlex.quote(arg) for arg in [
+        "python3", GS_SEGMENT_LOG, "append", GS_LOGS_DIR, category, filename,
+        "--retention", str(LOG_RETENTION)
+    ])
+
+
+def write_log_to_gs(category, filename, data):
+    """Acrescenta um registro ao log <categoria>/<arquivo> na VMGS"""
+    log_entry = {
+        "timestamp": generate_timestamp(),
+        **data
+    }
+
+    try:
+        subprocess.run(
+            ["ssh", *SSH_OPTIONS, f"{GS_USER}@{GS_IP}", append_command(category, filename)],
+            input=(json.dumps(log_entry) + "\n").encode("utf-8"),
+            check=True, capture_output=True
+        )
+        print(f"Log {category}/{filename} enviado com sucesso")
+        return True
+    except Exception as e:
+        print(f"Erro ao escrever log {category}/{filename}: {e}")
+        return False
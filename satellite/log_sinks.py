@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+# Destinos (sinks) dos registros de log gerados a partir da telemetria
+# /home/istec/projeto_final/satellite/log_sinks.py
+#
+# Em vez de um `write_log_to_gs` por registro (com dois scp e um handshake
+# SSH cada), os registros derivados de um pacote - ou de uma janela de tempo -
+# são agrupados num único lote e enviados por uma conexão de longa duração:
+#
+#   - LocalDirSink: grava direto num diretório de logs local
+#   - SSHStreamSink: um único processo `ssh` executando
+#     `segment_log.py ingest` na VMGS, reutilizado para todos os lotes
+#   - SocketSink: uma conexão TCP persistente com `segment_log.py serve`
+#
+# BatchingSink agrupa os registros e mede a latência de cada lote.
+
+import json
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from gs_logs import (GS_IP, GS_LOGS_DIR, GS_SEGMENT_LOG, GS_USER, LOG_RETENTION,
+                     SSH_OPTIONS, generate_timestamp)
+
+GS_BATCH_PORT = 5001
+
+# Intervalo mínimo (s) entre novas tentativas de envio depois de uma falha
+RETRY_INTERVAL = 1.0
+
+# O formato segmentado é implementado no código da Ground Station
+GS_DASHBOARD_DIR = Path(__file__).resolve().parents[1] / "GS" / "dashboard"
+
+
+class LocalDirSink:
+    """Grava os lotes num diretório de logs local (formato segmentado)"""
+
+    def __init__(self, logs_dir, retention=LOG_RETENTION):
+        if str(GS_DASHBOARD_DIR) not in sys.path:
+            sys.path.append(str(GS_DASHBOARD_DIR))
+        from segment_log import BatchIngestor
+        self.description = f"diretório local {logs_dir}"
+        self._ingestor = BatchIngestor(logs_dir, retention)
+
+    def send_batch(self, records):
+        return self._ingestor.write_batch(records)
+
+    def close(self):
+        self._ingestor.close()
+
+
+class _LineProtocolSink:
+    """Base dos sinks remotos: um lote por linha JSON, confirmado pela VMGS"""
+
+    def __init__(self):
+        self._seq = 0
+        self._rfile = None
+        self._wfile = None
+
+    def _connect(self):
+        raise NotImplementedError
+
+    def _disconnect(self):
+        raise NotImplementedError
+
+    def send_batch(self, records):
+        if self._wfile is None:
+            self._connect()
+        self._seq += 1
+        message = {"batch": self._seq, "records": records}
+        try:
+            self._wfile.write((json.dumps(message) + "\n").encode("utf-8"))
+            self._wfile.flush()
+            reply = json.loads(self._rfile.readline() or b"null")
+        except (OSError, ValueError) as e:
+            self._disconnect()
+            raise ConnectionError(f"Conexão com a VMGS perdida: {e}")
+        if not reply:
+            self._disconnect()
+            raise ConnectionError("Conexão com a VMGS encerrada")
+        if "error" in reply:
+            raise RuntimeError(f"VMGS recusou o lote {self._seq}: {reply['error']}")
+        return reply["written"]
+
+    def close(self):
+        if self._wfile is not None:
+            self._disconnect()
+
+
+class SSHStreamSink(_LineProtocolSink):
+    """Um processo ssh persistente com `segment_log.py ingest` na VMGS"""
+
+    def __init__(self, host=GS_IP, user=GS_USER, logs_dir=GS_LOGS_DIR, retention=LOG_RETENTION):
+        super().__init__()
+        self.description = f"ssh {user}@{host}:{logs_dir}"
+        self._command = ["ssh", *SSH_OPTIONS, "-o", "ServerAliveInterval=15", f"{user}@{host}",
+                         f"python3 {GS_SEGMENT_LOG} ingest {logs_dir} --retention {retention}"]
+        self._process = None
+
+    def _connect(self):
+        self._process = subprocess.Popen(self._command, stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+        self._rfile = self._process.stdout
+        self._wfile = self._process.stdin
+
+    def _disconnect(self):
+        try:
+            self._wfile.close()
+            self._process.wait(timeout=5)
+        except Exception:
+            self._process.kill()
+        self._process = self._rfile = self._wfile = None
+
+
+class SocketSink(_LineProtocolSink):
+    """Uma conexão TCP persistente com `segment_log.py serve` na VMGS"""
+
+    def __init__(self, host=GS_IP, port=GS_BATCH_PORT, timeout=10.0):
+        super().__init__()
+        self.description = f"tcp {host}:{port}"
+        self.address = (host, port)
+        self.timeout = timeout
+        self._sock = None
+
+    def _connect(self):
+        self._sock = socket.create_connection(self.address, timeout=self.timeout)
+        self._sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._rfile = self._sock.makefile("rb")
+        self._wfile = self._sock.makefile("wb")
+
+    def _disconnect(self):
+        for f in (self._rfile, self._wfile, self._sock):
+            try:
+                f.close()
+            except OSError:
+                pass
+        self._sock = self._rfile = self._wfile = None
+
+
+class BatchingSink:
+    """Agrupa registros e os envia em lotes para outro sink.
+
+    Com `window=0` cada chamada a `flush()` (uma por pacote) envia um lote;
+    com `window>0` os registros se acumulam até a janela expirar ou
+    `max_records` ser atingido. Um lote que falha volta para o início do
+    próximo; além de `max_backlog` registros pendentes os mais antigos são
+    descartados.
+    """
+
+    def __init__(self, sink, window=0.0, max_records=500, max_backlog=5000):
+        self.sink = sink
+        self.window = window
+        self.max_records = max_records
+        self.max_backlog = max_backlog
+        self._records = []
+        self._opened_at = None
+        self._retry_at = 0.0
+        self.batches = 0
+        self.records_sent = 0
+        self.failures = 0
+        self.dropped = 0
+        self.last_latency = None
+        self.total_latency = 0.0
+
+    def add(self, category, filename, data):
+        """Acrescenta um registro (com timestamp) ao lote atual"""
+        if not self._records:
+            self._opened_at = time.monotonic()
+        self._records.append([category, filename, {"timestamp": generate_timestamp(), **data}])
+        self._trim()
+        if len(self._records) >= self.max_records and time.monotonic() >= self._retry_at:
+            self.flush(force=True)
+
+    def _trim(self):
+        # Descarta os registros mais antigos além de max_backlog
+        excess = len(self._records) - self.max_backlog
+        if excess > 0:
+            del self._records[:excess]
+            self.dropped += excess
+
+    def due(self):
+        """Indica se o lote atual já deve ser enviado"""
+        now = time.monotonic()
+        return bool(self._records) and now - self._opened_at >= self.window and now >= self._retry_at
+
+    def time_until_due(self):
+        if not self._records:
+            return None
+        now = time.monotonic()
+        return max(0.0, self.window - (now - self._opened_at), self._retry_at - now)
+
+    def flush(self, force=False):
+        """Envia o lote atual se a janela expirou (ou se `force`)"""
+        if not self._records or not (force or self.due()):
+            return 0
+        records, self._records = self._records, []
+        start = time.perf_counter()
+        try:
+            written = self.sink.send_batch(records)
+        except Exception as e:
+            self.failures += 1
+            print(f"Erro ao enviar lote de {len(records)} registros ({self.sink.description}): {e}")
+            # Os registros voltam para o início do próximo lote
+            self._records = records + self._records
+            self._trim()
+            self._retry_at = time.monotonic() + RETRY_INTERVAL
+            return 0
+        self.last_latency = time.perf_counter() - start
+        self.total_latency += self.last_latency
+        self.batches += 1
+        self.records_sent += written
+        print(f"Lote com {written} registros enviado em {self.last_latency * 1000:.1f} ms")
+        return written
+
+    def stats(self):
+        return {
+            "batches": self.batches,
+            "records": self.records_sent,
+            "failures": self.failures,
+            "dropped": self.dropped,
+            "pending": len(self._records),
+            "last_latency_ms": self.last_latency * 1000 if self.last_latency is not None else None,
+            "avg_latency_ms": self.total_latency / self.batches * 1000 if self.batches else None
+        }
+
+    def close(self):
+        self.flush(force=True)
+        self.sink.close()
+
+
+def create_sink(kind, logs_dir=None, host=GS_IP, port=GS_BATCH_PORT):
+    """Cria o sink pelo nome: 'ssh', 'socket' ou 'local'"""
+    if kind == "local":
+        return LocalDirSink(logs_dir or GS_LOGS_DIR)
+    if kind == "socket":
+        return SocketSink(host, port)
+    if kind == "ssh":
+        return SSHStreamSink(host)
+    raise ValueError(f"Sink desconhecido: {kind}")
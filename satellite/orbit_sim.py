@@ -0,0 +1,413 @@
+#!/usr/bin/env python3
+# Simulador de órbitas vetorizado (NumPy), mais rápido que o tempo real
+# /home/istec/projeto_final/satellite/orbit_sim.py
+#
+# Mesma física de simulate_logs_updated.simulate_records (atitude,
+# magnetômetro, energia com eclipse, térmica, quedas do rádio e status), mas
+# calculada em arrays para muitos satélites e qualquer taxa de amostragem:
+# cada canal é um array (satélites, amostras). A fase orbital avança
+# PHASE_STEP rad a cada SAMPLE_INTERVAL s, como no simulador original.
+#
+# A geração é feita em blocos de BLOCK_SAMPLES amostras; o ruído de um bloco
+# depende só de (seed, número de satélites, bloco), então qualquer intervalo
+# pedido gera sempre os mesmos valores.
+#
+# Saídas:
+#   - stream_to_ingest: envia TelemetryData e heartbeats ao ingest TCP da GS,
+#     uma conexão por satélite (identificada por MSG_TYPE_HELLO, satélites
+#     1..N), com fator de aceleração do tempo; amostras em queda de sinal não
+#     são enviadas
+#   - write_capture: grava o stream de mensagens de cada satélite em arquivo
+#
+# Uso: python3 orbit_sim.py --satellites 50 --rate 10 --duration 86400
+#                           [--seed N] [--ingest host:porta --acceleration X]
+#                           [--capture DIR]
+
+import argparse
+import json
+import math
+import socket
+import sys
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+# O protocolo é implementado no código da Ground Station
+GS_DASHBOARD_DIR = Path(__file__).resolve().parents[1] / "GS" / "dashboard"
+if str(GS_DASHBOARD_DIR) not in sys.path:
+    sys.path.append(str(GS_DASHBOARD_DIR))
+import protocol  # noqa: E402
+
+# Passo da fase orbital do simulador original: 0.01 rad a cada amostra de 5 s
+SAMPLE_INTERVAL = 5.0
+PHASE_STEP = 0.01
+PHASE_RATE = PHASE_STEP / SAMPLE_INTERVAL  # rad/s
+ORBIT_PERIOD = 2 * math.pi / PHASE_RATE    # ~52 min
+
+BLOCK_SAMPLES = 4096
+HEARTBEAT_INTERVAL = 5.0
+
+# Mensagem TelemetryData completa (MessageHeader + struct TelemetryData)
+FRAME_DTYPE = np.dtype([
+    ("sync1", "u1"), ("sync2", "u1"), ("type", "u1"), ("flags", "u1"),
+    ("length", "<u2"), ("checksum", "<u2"),
+    ("tick", "<u4"), ("temperature", "<f4"), ("power", "<f4"), ("battery", "<f4"),
+    ("roll", "<f4"), ("pitch", "<f4"), ("yaw", "<f4"), ("mode", "u1"), ("pad", "V3")
+])
+assert FRAME_DTYPE.itemsize == protocol.HEADER_SIZE + protocol.TELEMETRY_DATA.size
+
+_CRC16_TABLE = np.array(protocol.CRC16_TABLE, dtype=np.uint16)
+
+
+def crc16_rows(data):
+    """CRC-16 (protocol.crc16) de cada linha de um array uint8 (mensagens, bytes)"""
+    crc = np.full(len(data), 0xFFFF, dtype=np.uint16)
+    for column in data.T:
+        crc = (crc << 8) ^ _CRC16_TABLE[(crc >> 8) ^ column]
+    return crc
+
+
+class OrbitBlock:
+    """Amostras [first, first + count) de todos os satélites.
+
+    `time` são os segundos desde o início da simulação (amostras,) e
+    `streams` a lista de (categoria, arquivo, colunas) de derive_telemetry_batch,
+    com cada coluna em forma (satélites, amostras).
+    """
+
+    def __init__(self, first, time, streams):
+        self.first = first
+        self.time = time
+        self.streams = streams
+
+    def __len__(self):
+        return len(self.time)
+
+    def column(self, category, filename, field):
+        for stream_category, stream_filename, columns in self.streams:
+            if (stream_category, stream_filename) == (category, filename):
+                return columns[field]
+        raise KeyError(f"{category}/{filename}:{field}")
+
+    def satellite(self, index):
+        """Os streams de um satélite, com colunas 1-D (entrada de telemetry_rows)"""
+        def pick(columns):
+            return {field: pick(value) if isinstance(value, dict) else value[index]
+                    for field, value in columns.items()}
+        return [(category, filename, pick(columns)) for category, filename, columns in self.streams]
+
+    def slice(self, start, stop):
+        def cut(columns):
+            return {field: cut(value) if isinstance(value, dict) else value[:, start:stop]
+                    for field, value in columns.items()}
+        return OrbitBlock(self.first + start, self.time[start:stop],
+                          [(category, filename, cut(columns)) for category, filename, columns in self.streams])
+
+
+class OrbitSimulator:
+    """Telemetria simulada de `satellites` satélites a `rate` amostras/s"""
+
+    def __init__(self, satellites=1, rate=1 / SAMPLE_INTERVAL, seed=0, dtype=np.float32):
+        self.satellites = satellites
+        self.rate = rate
+        self.seed = seed
+        self.dtype = dtype
+        # Fase inicial de cada satélite (o primeiro começa em 0, como o original)
+        self.phase0 = np.random.default_rng([seed, 0]).uniform(0, 2 * math.pi, satellites)
+        self.phase0[0] = 0.0
+
+    def block(self, index):
+        """Bloco `index` de BLOCK_SAMPLES amostras"""
+        first = index * BLOCK_SAMPLES
+        samples = np.arange(first, first + BLOCK_SAMPLES)
+        t = samples / self.rate
+        shape = (self.satellites, BLOCK_SAMPLES)
+        rng = np.random.default_rng([self.seed, 1, self.satellites, index])
+        dtype = self.dtype
+
+        def uniform(low, high):
+            return (low + (high - low) * rng.random(shape, dtype=np.float32)).astype(dtype, copy=False)
+
+        phase = np.mod(self.phase0[:, None] + PHASE_RATE * t[None, :], 2 * math.pi).astype(dtype)
+        sin = np.sin(phase)
+        counter = np.broadcast_to(samples + 1, shape)
+
+        def wave(amplitude, factor):
+            return amplitude * np.sin(phase * dtype(factor))
+
+        # ------- ADCS -------
+        attitude = {
+            "roll": 5 * sin,
+            "pitch": 3 * np.cos(phase * dtype(1.5)),
+            "yaw": wave(2, 0.8),
+            "stability": uniform(85, 100)
+        }
+        magnetometer = {
+            "x": 50 * sin,
+            "y": 45 * np.cos(phase),
+            "z": wave(30, 1.2),
+            "strength": uniform(40, 60)
+        }
+
+        # ------- Energia: ciclo de órbita com eclipse -------
+        in_eclipse = sin < -0.3
+        battery_discharge = in_eclipse | (rng.random(shape, dtype=np.float32) > 0.8)
+        battery_level = 75 + wave(20, 0.2)
+        battery = {
+            "level": battery_level,
+            "voltage": 3.6 + (battery_level - 50) * dtype(0.01),
+            "current": np.where(battery_discharge, dtype(-0.2), dtype(0.15)),
+            "temperature": 25 + 5 * sin
+        }
+        solar = {
+            "voltage": np.where(in_eclipse, dtype(4.2), dtype(5.0)),
+            "current": np.where(in_eclipse, dtype(0), 0.8 + 0.2 * sin),
+            "power": np.where(in_eclipse, dtype(0), (0.8 + 0.2 * sin) * 1000),
+            "temperature": np.where(in_eclipse, dtype(10), 40 + 10 * sin)
+        }
+        consumption = {
+            "total_watts": 3.5 + uniform(-0.2, 0.3),
+            "subsystems": {
+                "comm": 0.8 + uniform(-0.1, 0.1),
+                "adcs": 1.2 + uniform(-0.1, 0.2),
+                "payload": 0.9 + uniform(-0.2, 0.4),
+                "thermal": 0.3 + uniform(-0.05, 0.05),
+                "obc": 0.3 + uniform(-0.05, 0.05)
+            }
+        }
+
+        # ------- Térmica -------
+        thermal = {
+            "external": np.where(in_eclipse, dtype(-20), dtype(50)) + wave(10, 0.5),
+            "internal": 22 + wave(3, 0.3),
+            "battery": 25 + 5 * sin,
+            "solar_panels": np.where(in_eclipse, dtype(10), 60 + 15 * sin),
+            "processor": 35 + wave(8, 0.4) + uniform(-1, 1)
+        }
+
+        # ------- Rádio: perda de sinal em parte da órbita -------
+        signal_loss = sin < -0.5
+        signal_strength = np.where(signal_loss, dtype(0), 60 + 30 * sin)
+        radio = {
+            "signal_strength": signal_strength,
+            "bit_error_rate": np.where(signal_strength < 20, dtype(0.05),
+                                       np.where(signal_strength < 40, dtype(0.01), dtype(0.001))),
+            "packets_sent": counter,
+            "packets_received": np.where(signal_strength > 10, counter,
+                                         counter - rng.integers(1, 4, shape)),
+            "frequency_drift": uniform(-0.001, 0.001)
+        }
+
+        # ------- Status geral -------
+        status = {
+            "mode": np.where((battery_level > 30) & (signal_strength > 0), "nominal", "low_power"),
+            "uptime": np.broadcast_to(t, shape),
+            "memory_usage": 65 + uniform(-5, 5),
+            "cpu_load": 35 + wave(15, 2) + uniform(-5, 5),
+            "orbit_phase_deg": phase * dtype(180 / math.pi)
+        }
+
+        return OrbitBlock(first, t, [
+            ("adcs", "attitude.json", attitude),
+            ("adcs", "magnetometer.json", magnetometer),
+            ("power", "battery.json", battery),
+            ("power", "solar_panels.json", solar),
+            ("power", "consumption.json", consumption),
+            ("thermal", "temperatures.json", thermal),
+            ("communication", "radio.json", radio),
+            ("system", "status.json", status)
+        ])
+
+    def blocks(self, duration, start=0.0):
+        """Blocos que cobrem [start, start + duration) segundos de simulação"""
+        first = int(math.ceil(start * self.rate))
+        end = int(math.ceil((start + duration) * self.rate))
+        for index in range(first // BLOCK_SAMPLES, (end + BLOCK_SAMPLES - 1) // BLOCK_SAMPLES):
+            block = self.block(index)
+            lo = max(first - block.first, 0)
+            hi = min(end - block.first, BLOCK_SAMPLES)
+            yield block if (lo, hi) == (0, BLOCK_SAMPLES) else block.slice(lo, hi)
+
+    def generate(self, duration, start=0.0):
+        """Intervalo inteiro num só OrbitBlock (para durações que cabem na memória)"""
+        parts = list(self.blocks(duration, start))
+
+        def join(columns):
+            return {field: join([c[field] for c in columns]) if isinstance(columns[0][field], dict)
+                    else np.concatenate([c[field] for c in columns], axis=1)
+                    for field in columns[0]}
+        return OrbitBlock(parts[0].first, np.concatenate([p.time for p in parts]),
+                          [(category, filename, join([p.streams[i][2] for p in parts]))
+                           for i, (category, filename, _) in enumerate(parts[0].streams)])
+
+
+def tick_of(t):
+    """Tick do FreeRTOS (1 kHz, uint32) no instante t (s desde o início)"""
+    return (np.asarray(t) * 1000).astype(np.int64) % 2 ** 32
+
+
+def telemetry_frames(block):
+    """Mensagens TelemetryData de um bloco: array FRAME_DTYPE (satélites, amostras)"""
+    frames = np.zeros((block.column("adcs", "attitude.json", "roll").shape), dtype=FRAME_DTYPE)
+    frames["sync1"] = protocol.SYNC_BYTE1
+    frames["sync2"] = protocol.SYNC_BYTE2
+    frames["type"] = protocol.MSG_TYPE_TELEMETRY_DATA
+    frames["length"] = protocol.TELEMETRY_DATA.size
+    frames["tick"] = tick_of(block.time)[None, :]
+    frames["temperature"] = block.column("thermal", "temperatures.json", "internal")
+    frames["power"] = block.column("power", "consumption.json", "total_watts")
+    frames["battery"] = block.column("power", "battery.json", "level")
+    for axis in ("roll", "pitch", "yaw"):
+        frames[axis] = block.column("adcs", "attitude.json", axis)
+    frames["mode"] = block.column("system", "status.json", "mode") == "nominal"
+    raw = frames.reshape(-1).view(np.uint8).reshape(-1, FRAME_DTYPE.itemsize)
+    frames["checksum"] = crc16_rows(raw[:, protocol.HEADER_SIZE:]).reshape(frames.shape)
+    return frames
+
+
+def heartbeat_frame(t):
+    return protocol.encode_frame(protocol.MSG_TYPE_HEARTBEAT, 0, protocol.HEARTBEAT.pack(int(tick_of(t))))
+
+
+def link_up(block):
+    """Amostras com sinal (as demais não chegam à GS): (satélites, amostras)"""
+    return block.column("communication", "radio.json", "signal_strength") > 0
+
+
+def satellite_stream(block, frames, satellite, last_beats, dropouts=True, heartbeat_interval=HEARTBEAT_INTERVAL):
+    """Bytes enviados por um satélite no bloco: telemetria e heartbeats em ordem.
+
+    `last_beats[satellite]` é o intervalo de heartbeat da última amostra já
+    enviada (None no início) e é atualizado, para que blocos e janelas
+    consecutivos só tenham um heartbeat a cada `heartbeat_interval` segundos.
+    """
+    mask = link_up(block)[satellite] if dropouts else np.ones(len(block), dtype=bool)
+    parts = []
+    beats = np.floor(block.time / heartbeat_interval)
+    previous = last_beats[satellite]
+    # Heartbeat na primeira amostra de cada intervalo (e na primeira do stream)
+    starts = list(np.flatnonzero(np.diff(beats, prepend=beats[0] - 1 if previous is None else previous)))
+    last_beats[satellite] = beats[-1]
+    # Amostras que continuam o intervalo do bloco anterior, sem heartbeat
+    head = starts[0] if starts else len(block)
+    parts.append(frames[satellite, :head][mask[:head]].tobytes())
+    bounds = starts + [len(block)]
+    for lo, hi in zip(bounds[:-1], bounds[1:]):
+        if mask[lo]:
+            parts.append(heartbeat_frame(block.time[lo]))
+        parts.append(frames[satellite, lo:hi][mask[lo:hi]].tobytes())
+    return b"".join(parts)
+
+
+def write_capture(simulator, directory, duration, dropouts=True):
+    """Grava sat<NN>.bin (stream de mensagens de cada satélite) e capture.json"""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    files = [open(directory / f"sat{i:02d}.bin", "wb") for i in range(simulator.satellites)]
+    samples = 0
+    last_beats = [None] * simulator.satellites
+    try:
+        for block in simulator.blocks(duration):
+            frames = telemetry_frames(block)
+            for satellite, f in enumerate(files):
+                f.write(satellite_stream(block, frames, satellite, last_beats, dropouts))
+            samples += len(block)
+    finally:
+        for f in files:
+            f.close()
+    with open(directory / "capture.json", "w") as f:
+        json.dump({"satellites": simulator.satellites, "rate": simulator.rate, "seed": simulator.seed,
+                   "duration": duration, "samples": samples, "dropouts": dropouts,
+                   "heartbeat_interval": HEARTBEAT_INTERVAL,
+                   "files": [f"sat{i:02d}.bin" for i in range(simulator.satellites)]}, f, indent=2)
+    return samples
+
+
+def _discard(sock):
+    # Respostas do ingest (heartbeats, ACKs) são lidas e descartadas
+    try:
+        while sock.recv(65536):
+            pass
+    except OSError:
+        pass
+
+
+def stream_to_ingest(simulator, address, duration, acceleration=1.0, dropouts=True, window=0.05):
+    """Envia a simulação ao ingest TCP, `acceleration` vezes mais rápido que o tempo real.
+
+    As amostras de cada janela de `window` segundos (tempo real) seguem
+    juntas; acceleration=math.inf envia o mais rápido possível. Retorna o
+    número de amostras enviadas.
+    """
+    sockets = [socket.create_connection(address) for _ in range(simulator.satellites)]
+    for satellite, sock in enumerate(sockets):
+        sock.sendall(protocol.encode_hello(satellite + 1))
+        threading.Thread(target=_discard, args=(sock,), daemon=True).start()
+    started = time.monotonic()
+    sent = 0
+    last_beats = [None] * simulator.satellites
+    try:
+        for block in simulator.blocks(duration):
+            frames = telemetry_frames(block)
+            # Instante (tempo real) de envio de cada amostra
+            due = block.time / acceleration if math.isfinite(acceleration) else np.zeros(len(block))
+            lo = 0
+            while lo < len(block):
+                now = time.monotonic() - started
+                if due[lo] > now:
+                    time.sleep(min(due[lo] - now, window))
+                    continue
+                hi = int(np.searchsorted(due, now + window, side="right"))
+                part = block.slice(lo, hi)
+                part_frames = frames[:, lo:hi]
+                for satellite, sock in enumerate(sockets):
+                    sock.sendall(satellite_stream(part, part_frames, satellite, last_beats, dropouts))
+                sent += int(link_up(part).sum()) if dropouts else part_frames.size
+                lo = hi
+    finally:
+        for sock in sockets:
+            # shutdown antes do close: a thread de _discard ainda está no recv
+            # e, sem ele, o fim da conexão só seria enviado quando o recv voltasse
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            sock.close()
+    return sent
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulador de órbitas vetorizado")
+    parser.add_argument("--satellites", type=int, default=1)
+    parser.add_argument("--rate", type=float, default=1 / SAMPLE_INTERVAL, help="amostras/s por satélite")
+    parser.add_argument("--duration", type=float, default=ORBIT_PERIOD, help="segundos de simulação")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--ingest", help="host:porta do ingest TCP da GS (ex.: 127.0.0.1:5000)")
+    parser.add_argument("--acceleration", type=float, default=1.0,
+                        help="fator de aceleração do tempo no envio ao ingest (inf = sem espera)")
+    parser.add_argument("--capture", help="diretório onde gravar o stream de mensagens de cada satélite")
+    parser.add_argument("--no-dropouts", action="store_true", help="envia também durante a perda de sinal")
+    args = parser.parse_args()
+
+    simulator = OrbitSimulator(args.satellites, args.rate, args.seed)
+    dropouts = not args.no_dropouts
+    start = time.perf_counter()
+    if args.ingest:
+        host, port = args.ingest.rsplit(":", 1)
+        count = stream_to_ingest(simulator, (host, int(port)), args.duration, args.acceleration, dropouts)
+        action = f"enviadas ao ingest {args.ingest}"
+    elif args.capture:
+        count = write_capture(simulator, args.capture, args.duration, dropouts) * args.satellites
+        action = f"gravadas em {args.capture}"
+    else:
+        count = sum(len(block) for block in simulator.blocks(args.duration)) * args.satellites
+        action = "geradas"
+    elapsed = time.perf_counter() - start
+    print(f"{count:,} amostras {action} em {elapsed:.2f} s ({count / elapsed:,.0f} amostras/s, "
+          f"{args.duration / elapsed:,.0f}x o tempo real)")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,22 +3,17 @@
 # /home/istec/projeto_final/satellite/process_qemu_output.py
 
 import sys
-import re
-import json
+import argparse
 import time
 import binascii
-import socket
-import subprocess
 import struct
 import random
-from datetime import datetime
 from pathlib import Path
-import os
 
-# IP e diretório da Ground Station
-GS_IP = "192.168.1.96"
-GS_LOGS_DIR = "/home/groundstation/projeto_final/GS/logs"
-GS_USER = "groundstation"  # Nome de usuário na VMGS
+import numpy as np
+
+from log_sinks import BatchingSink, create_sink
+from qemu_stream import QemuOutputReader, wait_timeout
 
 # Formato do pacote de telemetria (conforme struct TelemetryPacket no código C)
 # struct TelemetryPacket {
@@ -30,248 +25,346 @@ GS_USER = "groundstation"  # Nome de usuário na VMGS
 # };
 TELEMETRY_FORMAT = "<Ifff?xxx"  # Adicionar padding para alinhar em 4 bytes
 
-def generate_timestamp():
-    """Gera um timestamp no formato ISO8601"""
-    return datetime.now().isoformat()
+# Intervalo da telemetria simulada enquanto não há telemetria real (segundos)
+SYNTHETIC_INTERVAL = 5
+
+# Formato de captura compartilhado com o ingest da GS (--capture)
+GS_DASHBOARD_DIR = Path(__file__).resolve().parents[1] / "GS" / "dashboard"
+
+# Mesmo layout como dtype estruturado, para decodificar vários pacotes de uma vez
+TELEMETRY_DTYPE = np.dtype({
+    "names": ["timestamp", "temperature", "power", "battery", "adcs_status"],
+    "formats": ["<u4", "<f4", "<f4", "<f4", "?"],
+    "offsets": [0, 4, 8, 12, 16],
+    "itemsize": struct.calcsize(TELEMETRY_FORMAT)
+})
+
+def decode_telemetry_batch(binary_data):
+    """Decodifica um buffer contíguo de pacotes (sem cópia) num array estruturado"""
+    if len(binary_data) % TELEMETRY_DTYPE.itemsize:
+        raise ValueError(f"Tamanho {len(binary_data)} não é múltiplo de {TELEMETRY_DTYPE.itemsize} bytes")
+    return np.frombuffer(binary_data, dtype=TELEMETRY_DTYPE)
 
-def write_log_to_gs(category, filename, data):
-    """Escreve um arquivo de log na VMGS via SCP, mantendo histórico"""
-    log_path = f"{GS_LOGS_DIR}/{category}/{filename}"
-    timestamp = generate_timestamp()
+def derive_telemetry_batch(packets):
+    """Deriva os canais de cada subsistema coluna a coluna.
+
+    `packets` é o array de decode_telemetry_batch (ou um dicionário com as
+    mesmas colunas). Retorna uma lista de (categoria, arquivo, colunas), onde
+    colunas é um dicionário de arrays (aninhado para os subsistemas).
+    """
+    # Os cálculos em float64 reproduzem os valores de struct.unpack
+    timestamp = np.asarray(packets["timestamp"]).astype(np.int64)
+    temp = np.asarray(packets["temperature"], dtype=np.float64)
+    power = np.asarray(packets["power"], dtype=np.float64)
+    battery = np.asarray(packets["battery"], dtype=np.float64)
+    adcs_status = np.asarray(packets["adcs_status"], dtype=bool)
+    
+    # Dados de temperatura
+    thermal_data = {
+        "external": temp + 10.0,  # Simulação de sensor externo
+        "internal": temp,
+        "battery": temp - 2.0,  # Bateria geralmente mais fria
+        "solar_panels": temp + 15.0,  # Painéis solares mais quentes
+        "processor": temp + 5.0  # Processador mais quente
+    }
+    
+    # Dados de bateria
+    battery_data = {
+        "level": battery,
+        "voltage": 3.7 + (battery / 100.0) * 0.7,  # 3.7V-4.4V
+        "current": 0.1 + (power / 100.0) * 0.5,  # 0.1A-0.6A
+        "temperature": temp - 2.0  # Igual ao sensor de bateria
+    }
+    
+    # Dados de consumo de energia
+    consumption_data = {
+        "total_watts": power,
+        "subsystems": {
+            "comm": power * 0.2,  # 20% do total
+            "adcs": power * 0.3,  # 30% do total
+            "payload": power * 0.3,  # 30% do total
+            "thermal": power * 0.1,  # 10% do total
+            "obc": power * 0.1  # 10% do total
+        }
+    }
     
-    # Nova entrada de log
-    log_entry = {
-        "timestamp": timestamp,
-        **data
+    # Dados de atitude (ADCS)
+    # Gere valores baseados no status do ADCS
+    attitude_data = {
+        "roll": (timestamp % 360) * 0.1,  # Varia lentamente
+        "pitch": ((timestamp + 120) % 360) * 0.1,  # Defasado
+        "yaw": ((timestamp + 240) % 360) * 0.1,  # Defasado
+        "stability": 95.0 + 5 * (~adcs_status)  # Status afeta estabilidade
     }
     
-    # Criar diretório localmente primeiro
-    local_temp_dir = "/tmp/sat_logs"
-    local_category_dir = f"{local_temp_dir}/{category}"
-    os.makedirs(local_category_dir, exist_ok=True)
+    # Dados de status do sistema
+    status_data = {
+        "mode": np.where(adcs_status, "nominal", "safe"),
+        "uptime": timestamp,  # Usar timestamp como uptime
+        "memory_usage": 65.0 + (timestamp % 10),  # Varia entre 65-75%
+        "cpu_load": 30.0 + (timestamp % 15),  # Varia entre 30-45%
+        "orbit_phase_deg": (timestamp / 10.0) % 360.0  # Fase da órbita
+    }
     
-    # Nome de arquivo temporário local
-    local_file = f"{local_category_dir}/{filename}"
+    # Dados de comunicação (rádio)
+    radio_data = {
+        "signal_strength": 75.0 + (timestamp % 25),  # Varia entre 75-100%
+        "bit_error_rate": 0.001 * (1.0 + (timestamp % 5) / 10.0),  # Varia entre 0.001-0.0015
+        "packets_sent": (timestamp / 10).astype(np.int64),  # Aumenta com o tempo
+        "packets_received": ((timestamp / 10) * 0.98).astype(np.int64),  # 98% dos enviados
+        "frequency_drift": (timestamp % 10) / 10000.0 - 0.0005  # ±0.0005 Hz
+    }
     
-    try:
-        # Tentar carregar logs existentes
+    return [
+        ("thermal", "temperatures.json", thermal_data),
+        ("power", "battery.json", battery_data),
+        ("power", "consumption.json", consumption_data),
+        ("adcs", "attitude.json", attitude_data),
+        ("system", "status.json", status_data),
+        ("communication", "radio.json", radio_data)
+    ]
+
+def _column_records(columns):
+    # tolist() converte cada coluna de uma vez em tipos Python (serializáveis em JSON)
+    keys = list(columns)
+    values = [_column_records(value) if isinstance(value, dict) else value.tolist()
+              for value in columns.values()]
+    return [dict(zip(keys, row)) for row in zip(*values)]
+
+def telemetry_rows(derived):
+    """Converte o resultado de derive_telemetry_batch em registros por pacote.
+
+    Retorna uma lista (um item por pacote) de listas de (categoria, arquivo, dados).
+    """
+    streams = [(category, filename) for category, filename, _ in derived]
+    columns = [_column_records(data) for _, _, data in derived]
+    return [[(category, filename, data) for (category, filename), data in zip(streams, row)]
+            for row in zip(*columns)]
+
+def derive_telemetry(timestamp, temp, power, battery, adcs_status):
+    """Deriva os registros de log de cada subsistema a partir de um pacote.
+
+    Retorna uma lista de (categoria, arquivo, dados). Versão escalar para o
+    ingest, que deriva uma amostra por vez; vários pacotes de uma vez usam
+    derive_telemetry_batch.
+    """
+    # Dados de temperatura
+    thermal_data = {
+        "external": temp + 10.0,  # Simulação de sensor externo
+        "internal": temp,
+        "battery": temp - 2.0,  # Bateria geralmente mais fria
+        "solar_panels": temp + 15.0,  # Painéis solares mais quentes
+        "processor": temp + 5.0  # Processador mais quente
+    }
+    
+    # Dados de bateria
+    battery_data = {
+        "level": battery,
+        "voltage": 3.7 + (battery / 100.0) * 0.7,  # 3.7V-4.4V
+        "current": 0.1 + (power / 100.0) * 0.5,  # 0.1A-0.6A
+        "temperature": temp - 2.0  # Igual ao sensor de bateria
+    }
+    
+    # Dados de consumo de energia
+    consumption_data = {
+        "total_watts": power,
+        "subsystems": {
+            "comm": power * 0.2,  # 20% do total
+            "adcs": power * 0.3,  # 30% do total
+            "payload": power * 0.3,  # 30% do total
+            "thermal": power * 0.1,  # 10% do total
+            "obc": power * 0.1  # 10% do total
+        }
+    }
+    
+    # Dados de atitude (ADCS)
+    # Gere valores baseados no status do ADCS
+    attitude_data = {
+        "roll": (timestamp % 360) * 0.1,  # Varia lentamente
+        "pitch": ((timestamp + 120) % 360) * 0.1,  # Defasado
+        "yaw": ((timestamp + 240) % 360) * 0.1,  # Defasado
+        "stability": 95.0 + (5 * (not adcs_status))  # Status afeta estabilidade
+    }
+    
+    # Dados de status do sistema
+    status_data = {
+        "mode": "nominal" if adcs_status else "safe",
+        "uptime": timestamp,  # Usar timestamp como uptime
+        "memory_usage": 65.0 + (timestamp % 10),  # Varia entre 65-75%
+        "cpu_load": 30.0 + (timestamp % 15),  # Varia entre 30-45%
+        "orbit_phase_deg": (timestamp / 10.0) % 360.0  # Fase da órbita
+    }
+    
+    # Dados de comunicação (rádio)
+    radio_data = {
+        "signal_strength": 75.0 + (timestamp % 25),  # Varia entre 75-100%
+        "bit_error_rate": 0.001 * (1.0 + (timestamp % 5) / 10.0),  # Varia entre 0.001-0.0015
+        "packets_sent": int(timestamp / 10),  # Aumenta com o tempo
+        "packets_received": int((timestamp / 10) * 0.98),  # 98% dos enviados
+        "frequency_drift": (timestamp % 10) / 10000.0 - 0.0005  # ±0.0005 Hz
+    }
+    
+    return [
+        ("thermal", "temperatures.json", thermal_data),
+        ("power", "battery.json", battery_data),
+        ("power", "consumption.json", consumption_data),
+        ("adcs", "attitude.json", attitude_data),
+        ("system", "status.json", status_data),
+        ("communication", "radio.json", radio_data)
+    ]
+
+def process_telemetry_batch(binary_data, sink):
+    """Decodifica e envia ao sink todos os pacotes de um buffer contíguo"""
+    derived = derive_telemetry_batch(decode_telemetry_batch(binary_data))
+    # Todos os registros derivados seguem num único lote
+    for records in telemetry_rows(derived):
+        for category, filename, data in records:
+            sink.add(category, filename, data)
+    sink.flush()
+
+def process_telemetry_frames(hex_frames, sink):
+    """Processa vários pacotes (em hex) de uma só vez; retorna quantos foram aceitos"""
+    packets = []
+    for hex_data in hex_frames:
         try:
-            # Copiar arquivo da VMGS para local se existir
-            subprocess.run([
-                "scp", 
-                "-o", "StrictHostKeyChecking=no",
-                f"{GS_USER}@{GS_IP}:{log_path}", 
-                local_file
-            ], check=False, capture_output=True)
-            
-            with open(local_file, 'r') as f:
-                log_data = json.load(f)
-                
-            if not isinstance(log_data, list):
-                log_data = [log_data]
-        except (FileNotFoundError, json.JSONDecodeError, subprocess.CalledProcessError):
-            # Criar novo array se não existir ou não for válido
-            log_data = []
-            
-        # Adicionar nova entrada e limitar a 100 entradas
-        log_data.append(log_entry)
-        if len(log_data) > 100:
-            log_data = log_data[-100:]
-            
-        # Salvar localmente
-        with open(local_file, 'w') as f:
-            json.dump(log_data, f, indent=2)
-            
-        # Copiar para a VMGS
-        subprocess.run([
-            "scp", 
-            "-o", "StrictHostKeyChecking=no",
-            local_file, 
-            f"{GS_USER}@{GS_IP}:{log_path}"
-        ], check=True)
-        
-        print(f"Log {category}/{filename} enviado com sucesso")
-    except Exception as e:
-        print(f"Erro ao escrever log {category}/{filename}: {e}")
+            # Converter hex para binário
+            binary_data = binascii.unhexlify(hex_data)
+        except (binascii.Error, ValueError) as e:
+            print(f"Erro ao processar telemetria: {e}")
+            continue
+        if len(binary_data) != TELEMETRY_DTYPE.itemsize:
+            print(f"Erro ao processar telemetria: pacote com {len(binary_data)} bytes")
+            continue
+        packets.append(binary_data)
+    if packets:
+        process_telemetry_batch(b"".join(packets), sink)
+    return len(packets)
 
-def process_telemetry_data(hex_data):
-    """Processa os dados de telemetria do formato binário para JSON"""
+def process_telemetry_data(hex_data, sink):
+    """Processa os dados de telemetria do formato binário e envia os registros ao sink"""
     try:
-        # Converter hex para binário
-        binary_data = binascii.unhexlify(hex_data)
-        
-        # Desempacotar estrutura
-        timestamp, temp, power, battery, adcs_status = struct.unpack(TELEMETRY_FORMAT, binary_data)
-        
-        # Criar dados de telemetria
-        
-        # Dados de temperatura
-        thermal_data = {
-            "external": temp + 10.0,  # Simulação de sensor externo
-            "internal": temp,
-            "battery": temp - 2.0,  # Bateria geralmente mais fria
-            "solar_panels": temp + 15.0,  # Painéis solares mais quentes
-            "processor": temp + 5.0  # Processador mais quente
-        }
-        write_log_to_gs("thermal", "temperatures.json", thermal_data)
-        
-        # Dados de bateria
-        battery_data = {
-            "level": battery,
-            "voltage": 3.7 + (battery / 100.0) * 0.7,  # 3.7V-4.4V
-            "current": 0.1 + (power / 100.0) * 0.5,  # 0.1A-0.6A
-            "temperature": temp - 2.0  # Igual ao sensor de bateria
-        }
-        write_log_to_gs("power", "battery.json", battery_data)
-        
-        # Dados de consumo de energia
-        consumption_data = {
-            "total_watts": power,
-            "subsystems": {
-                "comm": power * 0.2,  # 20% do total
-                "adcs": power * 0.3,  # 30% do total
-                "payload": power * 0.3,  # 30% do total
-                "thermal": power * 0.1,  # 10% do total
-                "obc": power * 0.1  # 10% do total
-            }
-        }
-        write_log_to_gs("power", "consumption.json", consumption_data)
-        
-        # Dados de atitude (ADCS)
-        # Gere valores baseados no status do ADCS
-        attitude_data = {
-            "roll": (timestamp % 360) * 0.1,  # Varia lentamente
-            "pitch": ((timestamp + 120) % 360) * 0.1,  # Defasado
-            "yaw": ((timestamp + 240) % 360) * 0.1,  # Defasado
-            "stability": 95.0 + (5 * (not adcs_status))  # Status afeta estabilidade
-        }
-        write_log_to_gs("adcs", "attitude.json", attitude_data)
-        
-        # Dados de status do sistema
-        status_data = {
-            "mode": "nominal" if adcs_status else "safe",
-            "uptime": timestamp,  # Usar timestamp como uptime
-            "memory_usage": 65.0 + (timestamp % 10),  # Varia entre 65-75%
-            "cpu_load": 30.0 + (timestamp % 15),  # Varia entre 30-45%
-            "orbit_phase_deg": (timestamp / 10.0) % 360.0  # Fase da órbita
-        }
-        write_log_to_gs("system", "status.json", status_data)
-        
-        # Dados de comunicação (rádio)
-        radio_data = {
-            "signal_strength": 75.0 + (timestamp % 25),  # Varia entre 75-100%
-            "bit_error_rate": 0.001 * (1.0 + (timestamp % 5) / 10.0),  # Varia entre 0.001-0.0015
-            "packets_sent": int(timestamp / 10),  # Aumenta com o tempo
-            "packets_received": int((timestamp / 10) * 0.98),  # 98% dos enviados
-            "frequency_drift": (timestamp % 10) / 10000.0 - 0.0005  # ±0.0005 Hz
-        }
-        write_log_to_gs("communication", "radio.json", radio_data)
-        
-        return True
+        return process_telemetry_frames([hex_data], sink) == 1
     except Exception as e:
         print(f"Erro ao processar telemetria: {e}")
         return False
 
-def main():
-    print("Iniciando processador de saída do QEMU para telemetria real...")
-    print(f"Enviando logs para {GS_IP}:{GS_LOGS_DIR}")
+def send_synthetic_telemetry(sink, current_time):
+    """Envia telemetria simulada enquanto não há telemetria real"""
+    # Gerar dados sintéticos simples
+    timestamp = int(current_time)
+    temp = 22.5 + (random.random() * 3 - 1.5)  # 21-24°C
+    power = 100.0 + (random.random() * 10 - 5)  # 95-105W
+    battery = 95.0 - (timestamp % 100) / 100.0  # Lentamente diminuindo
     
-    # Padrão para detectar telemetria na saída do QEMU
-    pattern = re.compile(r'\[SAT_TELEMETRY_BEGIN\](.*?)\[SAT_TELEMETRY_END\]', re.DOTALL)
+    thermal_data = {
+        "external": temp + 10.0,  # Simulação de sensor externo
+        "internal": temp,
+        "battery": temp - 2.0,  # Bateria geralmente mais fria
+        "solar_panels": temp + 15.0,  # Painéis solares mais quentes
+        "processor": temp + 5.0  # Processador mais quente
+    }
+    sink.add("thermal", "temperatures.json", thermal_data)
     
-    # Gerar telemetria simulada se não detectarmos a verdadeira
-    last_telemetry_time = time.time()
-    generate_synthetic_telemetry = True
+    # Dados de bateria
+    battery_data = {
+        "level": battery,
+        "voltage": 3.7 + (battery / 100.0) * 0.7,  # 3.7V-4.4V
+        "current": 0.1 + (power / 100.0) * 0.5,  # 0.1A-0.6A
+        "temperature": temp - 2.0  # Igual ao sensor de bateria
+    }
+    sink.add("power", "battery.json", battery_data)
     
-    import os
-    # Abrir stdin em modo non-blocking
-    import fcntl
-    fd = sys.stdin.fileno()
-    fl = fcntl.fcntl(fd, fcntl.F_GETFL)
-    fcntl.fcntl(fd, fcntl.F_SETFL, fl | os.O_NONBLOCK)
+    # Dados de consumo de energia
+    consumption_data = {
+        "total_watts": power,
+        "subsystems": {
+            "comm": power * 0.2,  # 20% do total
+            "adcs": power * 0.3,  # 30% do total
+            "payload": power * 0.3,  # 30% do total
+            "thermal": power * 0.1,  # 10% do total
+            "obc": power * 0.1  # 10% do total
+        }
+    }
+    sink.add("power", "consumption.json", consumption_data)
+    sink.flush()
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Processa a saída do QEMU e envia a telemetria para a Ground Station")
+    parser.add_argument("--sink", choices=["ssh", "socket", "local"], default="ssh",
+                        help="destino dos logs: ssh persistente, TCP (segment_log.py serve) ou diretório local")
+    parser.add_argument("--logs-dir", default=None, help="diretório de logs para --sink local")
+    parser.add_argument("--batch-window", type=float, default=0.0,
+                        help="segundos para agrupar registros num lote (0 = um lote por pacote)")
+    parser.add_argument("--qemu", metavar="KERNEL", default=None,
+                        help="iniciar o qemu-system-arm com este binário em vez de ler a entrada padrão")
+    parser.add_argument("--qemu-verbose", action="store_true", help="passar -d guest_errors,unimp ao QEMU")
+    parser.add_argument("--echo", action="store_true", help="repetir a saída do QEMU no terminal")
+    parser.add_argument("--capture", metavar="ARQUIVO", default=None,
+                        help="gravar o hex de cada pacote numa captura (GS/dashboard/capture.py)")
+    return parser.parse_args()
+
+def open_capture(path):
+    """Abre uma captura dos pacotes do QEMU; retorna (escritor, tipo de registro)"""
+    if str(GS_DASHBOARD_DIR) not in sys.path:
+        sys.path.append(str(GS_DASHBOARD_DIR))
+    import capture
+    return capture.CaptureWriter(path), capture.KIND_QEMU_HEX
+
+def main():
+    args = parse_args()
+    sink = BatchingSink(create_sink(args.sink, args.logs_dir), window=args.batch_window)
+    reader = QemuOutputReader(args.qemu, verbose=args.qemu_verbose, echo=args.echo)
+    capture, capture_kind = open_capture(args.capture) if args.capture else (None, None)
+
+    print("Iniciando processador de saída do QEMU para telemetria real...")
+    print(f"Lendo {reader.description}, enviando logs para {sink.sink.description}")
     
-    buffer = ""
+    # Gerar telemetria simulada se não detectarmos a verdadeira
+    synthetic_deadline = time.monotonic() + SYNTHETIC_INTERVAL
     
-    while True:
-        try:
-            # Verificar se é necessário gerar telemetria sintética
-            current_time = time.time()
-            if generate_synthetic_telemetry and (current_time - last_telemetry_time) >= 5:
-                print("Gerando telemetria sintética já que não foi detectada telemetria real...")
-                
-                # Gerar dados sintéticos simples
-                timestamp = int(current_time)
-                temp = 22.5 + (random.random() * 3 - 1.5)  # 21-24°C
-                power = 100.0 + (random.random() * 10 - 5)  # 95-105W
-                battery = 95.0 - (timestamp % 100) / 100.0  # Lentamente diminuindo
-                adcs_status = True
-                
-                thermal_data = {
-                    "external": temp + 10.0,  # Simulação de sensor externo
-                    "internal": temp,
-                    "battery": temp - 2.0,  # Bateria geralmente mais fria
-                    "solar_panels": temp + 15.0,  # Painéis solares mais quentes
-                    "processor": temp + 5.0  # Processador mais quente
-                }
-                write_log_to_gs("thermal", "temperatures.json", thermal_data)
-                
-                # Dados de bateria
-                battery_data = {
-                    "level": battery,
-                    "voltage": 3.7 + (battery / 100.0) * 0.7,  # 3.7V-4.4V
-                    "current": 0.1 + (power / 100.0) * 0.5,  # 0.1A-0.6A
-                    "temperature": temp - 2.0  # Igual ao sensor de bateria
-                }
-                write_log_to_gs("power", "battery.json", battery_data)
-                
-                # Dados de consumo de energia
-                consumption_data = {
-                    "total_watts": power,
-                    "subsystems": {
-                        "comm": power * 0.2,  # 20% do total
-                        "adcs": power * 0.3,  # 30% do total
-                        "payload": power * 0.3,  # 30% do total
-                        "thermal": power * 0.1,  # 10% do total
-                        "obc": power * 0.1  # 10% do total
-                    }
-                }
-                write_log_to_gs("power", "consumption.json", consumption_data)
-                
-                last_telemetry_time = current_time
-            
-            # Tente ler da entrada padrão de forma não bloqueante
+    try:
+        while not reader.closed:
             try:
-                chunk = sys.stdin.read(4096)
-                if not chunk:
-                    time.sleep(0.1)  # Evita consumo excessivo de CPU
-                    continue
-                buffer += chunk
-            except (IOError, BlockingIOError):
-                # Não há dados disponíveis no momento, então esperamos um pouco
-                time.sleep(0.1)
-                continue
+                # Espera por dados até o próximo prazo (telemetria sintética ou lote pendente)
+                batch_due = sink.time_until_due()
+                timeout = wait_timeout(synthetic_deadline,
+                                       time.monotonic() + batch_due if batch_due is not None else None)
+                hex_frames = reader.poll(timeout)
+                if hex_frames:
+                    if capture is not None:
+                        received = time.time()
+                        for frame in hex_frames:
+                            capture.record(capture_kind, frame, when=received)
+                    print(f"Telemetria detectada: {len(hex_frames)} pacote(s), "
+                          f"{hex_frames[-1][:20].decode('ascii', 'replace')}...")
+                    # Todos os pacotes de uma leitura são decodificados juntos
+                    if process_telemetry_frames(hex_frames, sink):
+                        synthetic_deadline = None  # Desabilita telemetria sintética ao detectar real
                 
-            # Procurar por telemetria no buffer
-            match = pattern.search(buffer)
-            if match:
-                hex_data = match.group(1).strip()
-                print(f"Telemetria detectada: {hex_data[:20]}...")
-                process_telemetry_data(hex_data)
-                generate_synthetic_telemetry = False  # Desabilita telemetria sintética ao detectar real
-                last_telemetry_time = time.time()
-                # Remove a telemetria processada do buffer
-                buffer = buffer[match.end():]
-            
-            # Se o buffer ficar muito grande, mantemos apenas a parte final
-            if len(buffer) > 10000:
-                buffer = buffer[-5000:]
+                if synthetic_deadline is not None and time.monotonic() >= synthetic_deadline:
+                    print("Gerando telemetria sintética já que não foi detectada telemetria real...")
+                    send_synthetic_telemetry(sink, time.time())
+                    synthetic_deadline = time.monotonic() + SYNTHETIC_INTERVAL
                 
-        except KeyboardInterrupt:
-            print("\nProcessador de telemetria encerrado pelo usuário.")
-            break
-        except Exception as e:
-            print(f"Erro no processador de telemetria: {e}")
-            time.sleep(1)  # Evita spam de erros
+                # Enviar o lote pendente se a janela de agrupamento expirou
+                sink.flush()
+            except KeyboardInterrupt:
+                print("\nProcessador de telemetria encerrado pelo usuário.")
+                break
+            except Exception as e:
+                print(f"Erro no processador de telemetria: {e}")
+                time.sleep(1)  # Evita spam de erros
+        if reader.closed:
+            print("Saída do QEMU encerrada.")
+    finally:
+        reader.close()
+        sink.close()
+        if capture is not None:
+            capture.close()
+            print(f"Captura: {capture.stats()}")
+        print(f"Pacotes: {reader.scanner.frames} ({reader.scanner.dropped} descartados), "
+              f"{reader.bytes_read} bytes lidos")
+        print(f"Resumo dos lotes: {sink.stats()}")
 
 if __name__ == "__main__":
     main()
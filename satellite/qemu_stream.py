@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+# Leitura orientada a eventos da saída do QEMU
+# /home/istec/projeto_final/satellite/qemu_stream.py
+#
+# O firmware imprime cada pacote como
+#   [SAT_TELEMETRY_BEGIN]<hex>[SAT_TELEMETRY_END]
+# misturado com o restante da saída do QEMU. MarkerScanner trabalha sobre
+# bytes e só percorre os dados novos de cada leitura; QemuOutputReader espera
+# os dados com selectors (sem sleep) e pode iniciar o próprio qemu-system-arm.
+
+import os
+import selectors
+import subprocess
+import sys
+import time
+
+BEGIN_MARKER = b"[SAT_TELEMETRY_BEGIN]"
+END_MARKER = b"[SAT_TELEMETRY_END]"
+
+# Um TelemetryPacket tem 20 bytes (40 em hex); o limite só protege contra um
+# marcador de início sem fim
+MAX_FRAME_BYTES = 4096
+
+QEMU_MACHINE = "lm3s6965evb"
+QEMU_CPU = "cortex-m3"
+
+
+class MarkerScanner:
+    """Extrai os pacotes delimitados pelos marcadores de um stream de bytes.
+
+    O buffer guarda apenas o pacote ainda incompleto (ou um possível início de
+    marcador no final da leitura), e cada busca recomeça de onde a anterior
+    parou, então o custo por leitura é proporcional aos dados novos.
+    """
+
+    def __init__(self, max_frame=MAX_FRAME_BYTES):
+        self.max_frame = max_frame
+        self._buffer = bytearray()
+        # Início do pacote atual (após BEGIN_MARKER) ou None fora de um pacote
+        self._frame_start = None
+        # Posição a partir da qual o próximo marcador ainda não foi procurado
+        self._scan_pos = 0
+        self.frames = 0
+        self.dropped = 0
+
+    def feed(self, data):
+        """Processa uma leitura e retorna a lista de pacotes (hex, em bytes)"""
+        buf = self._buffer
+        buf += data
+        frames = []
+        while True:
+            if self._frame_start is None:
+                start = buf.find(BEGIN_MARKER, self._scan_pos)
+                if start < 0:
+                    # Sem pacote aberto: basta manter um possível marcador partido
+                    keep = len(BEGIN_MARKER) - 1
+                    if len(buf) > keep:
+                        del buf[:len(buf) - keep]
+                    self._scan_pos = 0
+                    break
+                self._frame_start = start + len(BEGIN_MARKER)
+                self._scan_pos = self._frame_start
+            end = buf.find(END_MARKER, self._scan_pos)
+            if end < 0:
+                if len(buf) - self._frame_start > self.max_frame:
+                    # Marcador de fim perdido: descarta o pacote e procura o próximo início
+                    self.dropped += 1
+                    self._scan_pos = self._frame_start
+                    self._frame_start = None
+                    continue
+                self._scan_pos = max(self._frame_start, len(buf) - len(END_MARKER) + 1)
+                break
+            restart = buf.rfind(BEGIN_MARKER, self._frame_start, end)
+            if restart >= 0:
+                # Um novo início antes do fim: o pacote anterior perdeu o seu marcador de fim
+                self.dropped += 1
+                self._frame_start = restart + len(BEGIN_MARKER)
+            frames.append(bytes(buf[self._frame_start:end]).strip())
+            self.frames += 1
+            self._scan_pos = end + len(END_MARKER)
+            self._frame_start = None
+
+        # Com um pacote aberto, só os seus bytes continuam no buffer
+        if self._frame_start:
+            del buf[:self._frame_start]
+            self._scan_pos -= self._frame_start
+            self._frame_start = 0
+        return frames
+
+
+def qemu_command(kernel, verbose=False):
+    """Linha de comando do qemu-system-arm, a mesma usada por run_qemu.sh"""
+    command = ["qemu-system-arm", "-M", QEMU_MACHINE, "-cpu", QEMU_CPU, "-nographic",
+               "-kernel", str(kernel), "-serial", "tcp::5678,server,nowait"]
+    if verbose:
+        command += ["-d", "guest_errors,unimp"]
+    return command + ["-semihosting", "-monitor", "stdio"]
+
+
+class QemuOutputReader:
+    """Lê a saída do QEMU (stdin ou um qemu-system-arm próprio) por eventos.
+
+    `poll(timeout)` espera até haver dados ou o timeout expirar e retorna os
+    pacotes completos recebidos; a latência depende só da chegada dos dados.
+    """
+
+    def __init__(self, kernel=None, verbose=False, echo=False):
+        self.echo = echo
+        self.process = None
+        if kernel is not None:
+            # stdin fica aberto para o monitor do QEMU não receber EOF
+            self.process = subprocess.Popen(qemu_command(kernel, verbose), stdin=subprocess.PIPE,
+                                            stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+            self.fd = self.process.stdout.fileno()
+            self.description = f"qemu-system-arm (pid {self.process.pid})"
+        else:
+            self.fd = sys.stdin.fileno()
+            self.description = "entrada padrão"
+        self.scanner = MarkerScanner()
+        self.closed = False
+        self.bytes_read = 0
+        self._selector = selectors.DefaultSelector()
+        self._selector.register(self.fd, selectors.EVENT_READ)
+
+    def poll(self, timeout=None):
+        """Espera por dados até `timeout` segundos; retorna os pacotes completos"""
+        if self.closed or not self._selector.select(timeout):
+            return []
+        data = os.read(self.fd, 65536)
+        if not data:
+            self.closed = True
+            self._selector.unregister(self.fd)
+            return []
+        self.bytes_read += len(data)
+        if self.echo:
+            sys.stdout.buffer.write(data)
+            sys.stdout.flush()
+        return self.scanner.feed(data)
+
+    def close(self):
+        self._selector.close()
+        if self.process is not None and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait()
+
+
+def wait_timeout(*deadlines):
+    """Tempo até o prazo mais próximo (instantes de time.monotonic ou None)"""
+    pending = [d for d in deadlines if d is not None]
+    if not pending:
+        return None
+    return max(0.0, min(pending) - time.monotonic())
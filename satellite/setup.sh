@@ -6,7 +6,7 @@ sudo apt update && sudo apt upgrade -y
 
 # Install required packages
 echo "Installing development tools and QEMU..."
-sudo apt install -y build-essential git cmake gcc-arm-none-eabi qemu-system-arm
+sudo apt install -y build-essential git cmake gcc-arm-none-eabi qemu-system-arm python3-numpy
 
 # Clone FreeRTOS
 echo "Cloning FreeRTOS repository..."